@@ -0,0 +1,375 @@
+"""Query benchmark for Haven's Helper.
+
+Times the SQL behind every command in main.py against a helpers.db (usually
+one made by datagen.py), records the EXPLAIN QUERY PLAN of each statement,
+and compares the run with an earlier one to catch regressions.
+
+    python datagen.py bench.db --scale large
+    python bench.py bench.db --json before.json
+    ... change main.py ...
+    python bench.py bench.db --json after.json --compare before.json
+
+Statements that write are run inside a transaction that is rolled back, so
+the database is left as it was (main.py's own migrations still run on import,
+exactly as when the bot starts). Exit status is 1 when --compare finds a
+regression.
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+
+# ---------- sample parameters ----------
+def _probe(db, guild_id: int | None) -> dict:
+    """Picks realistic arguments from the data: the busiest helper, a typical one, a popular game."""
+    if guild_id is None:
+        row = db.execute("SELECT guild_id FROM thanks GROUP BY guild_id ORDER BY COUNT(*) DESC LIMIT 1").fetchone()
+        guild_id = row[0] if row else 0
+    heavy = db.execute(
+        "SELECT thanked_user_id FROM thanks WHERE guild_id = ? GROUP BY thanked_user_id ORDER BY COUNT(*) DESC LIMIT 1",
+        (guild_id,)
+    ).fetchone()
+    helpers = db.execute("SELECT COUNT(DISTINCT user_id) FROM helpers WHERE guild_id = ?", (guild_id,)).fetchone()[0]
+    typical = db.execute(
+        "SELECT user_id FROM helpers WHERE guild_id = ? GROUP BY user_id ORDER BY COUNT(*) DESC LIMIT 1 OFFSET ?",
+        (guild_id, helpers // 2)
+    ).fetchone()
+    popular = db.execute(
+        "SELECT g.id, g.game_name FROM games g JOIN helpers h ON h.game_id = g.id "
+        "WHERE g.guild_id = ? GROUP BY g.id ORDER BY COUNT(*) DESC LIMIT 1",
+        (guild_id,)
+    ).fetchone()
+    unhelped = db.execute("SELECT id, game_name FROM games WHERE guild_id = ? AND has_helpers = 0 LIMIT 1",
+                          (guild_id,)).fetchone()
+    latest = db.execute("SELECT MAX(timestamp) FROM thanks WHERE guild_id = ?", (guild_id,)).fetchone()[0]
+    last_month = (datetime.strptime(latest, "%Y-%m-%d %H:%M:%S").replace(day=1) - timedelta(days=1)
+                  if latest else datetime.now(timezone.utc))
+    if not (heavy and typical and popular):
+        raise SystemExit("The database needs games, helpers and thanks; generate one with datagen.py.")
+    heavy_id = heavy[0]
+    return {
+        "guild_id": guild_id,
+        "heavy_id": heavy_id,
+        "heavy_name": db.execute("SELECT user_name FROM users WHERE id = ?", (heavy_id,)).fetchone()[0],
+        "typical_id": typical[0],
+        "game_id": popular[0],
+        "game_name": popular[1],
+        "free_game_id": (unhelped or popular)[0],
+        "month": last_month.month,
+        "year": last_month.year,
+    }
+
+
+# ---------- cases ----------
+def build_cases(main, p: dict) -> dict:
+    """name -> (callable, writes). Inline SQL mirrors the handler named in the case."""
+    db = main.conn
+    guild = p["guild_id"]
+
+    def q(sql, *params):
+        args = params[0] if len(params) == 1 and isinstance(params[0], dict) else params
+        return lambda: db.execute(sql, args).fetchall()
+
+    year_ago = (datetime.now(timezone.utc) - timedelta(days=364)).strftime("%Y-%m-%d")
+
+    cases = {
+        "autocomplete": (q("SELECT game_name FROM games WHERE guild_id = ? AND game_name LIKE ? ORDER BY game_name COLLATE NOCASE LIMIT 25",
+                           guild, "%Raid%"), False),
+        "showgame.lookup": (q("SELECT id, game_name, description, guide_url FROM games WHERE guild_id = ? AND game_name = ? COLLATE NOCASE",
+                              guild, p["game_name"]), False),
+        "showgame.helpers": (q("""SELECT DISTINCT u.user_name, u.status
+                                  FROM helpers h
+                                  JOIN users u ON u.id = h.user_id
+                                  WHERE h.game_id = ?
+                                  ORDER BY u.user_name COLLATE NOCASE""", p["game_id"]), False),
+        "paged.title": (q("SELECT user_name FROM users WHERE id = ?", p["heavy_id"]), False),
+        "tophelper": (q("""SELECT u.user_name, COUNT(DISTINCT h.game_id) as game_count
+                           FROM helpers h
+                           JOIN users u ON u.id = h.user_id
+                           WHERE h.guild_id = ?
+                           GROUP BY h.user_id
+                           ORDER BY game_count DESC
+                           LIMIT 10""", guild), False),
+        "gamesbyletter": (q("""SELECT g.game_name,
+                                      g.has_guide,
+                                      (SELECT COUNT(DISTINCT h.user_id) FROM helpers h WHERE h.game_id = g.id) AS helper_count
+                               FROM games g
+                               WHERE g.guild_id = ? AND g.has_helpers = 1
+                                 AND UPPER(SUBSTR(g.game_name,1,1)) = ?
+                               ORDER BY g.game_name COLLATE NOCASE""", guild, "R"), False),
+        "mostthanked.all": (q("""SELECT u.user_name, COUNT(*) as thank_count
+                                 FROM thanks t
+                                 JOIN users u ON u.id = t.thanked_user_id
+                                 WHERE t.guild_id = ?
+                                 GROUP BY t.thanked_user_id
+                                 ORDER BY thank_count DESC
+                                 LIMIT 10""", guild), False),
+        "mostthanked.month": (q("""SELECT u.user_name, COUNT(*) as thank_count
+                                   FROM thanks t
+                                   JOIN users u ON u.id = t.thanked_user_id
+                                   WHERE t.guild_id = ?
+                                     AND strftime('%m', timestamp) = ? AND strftime('%Y', timestamp) = ?
+                                   GROUP BY t.thanked_user_id
+                                   ORDER BY thank_count DESC
+                                   LIMIT 10""", guild, f"{p['month']:02d}", str(p["year"])), False),
+        "mostthankedfull": (q("""SELECT u.user_name, COUNT(*) as thank_count
+                                 FROM thanks t
+                                 JOIN users u ON u.id = t.thanked_user_id
+                                 WHERE t.guild_id = ?
+                                 GROUP BY t.thanked_user_id
+                                 ORDER BY thank_count DESC""", guild), False),
+        "showfeedback": (q("""SELECT u.user_name, t.game, t.message, t.timestamp
+                              FROM thanks t
+                              JOIN users u ON u.id = t.thanking_user_id
+                              WHERE t.guild_id = ? AND t.thanked_user_id = ?
+                              ORDER BY t.timestamp DESC
+                              LIMIT 10""", guild, p["heavy_id"]), False),
+        "milestones.totals": (q("SELECT total, milestone FROM thanks_totals WHERE guild_id = ? AND user_id = ?",
+                                guild, p["heavy_id"]), False),
+        "removegame.is_helper": (q("SELECT 1 FROM helpers WHERE game_id = ? AND user_id = ?",
+                                   p["game_id"], p["typical_id"]), False),
+        "removegame.others": (q("SELECT COUNT(DISTINCT user_id) FROM helpers WHERE game_id = ? AND user_id <> ?",
+                                p["game_id"], p["typical_id"]), False),
+        "thankstrend.guild": (lambda: main._query_thanks_trend(guild, year_ago), False),
+        "thankstrend.user": (lambda: main._query_thanks_trend(guild, year_ago, user_id=p["heavy_id"]), False),
+        "thankstrend.game": (lambda: main._query_thanks_trend(guild, year_ago, game_id=p["game_id"]), False),
+        "thankstrend.leaders": (lambda: main._query_trend_leaders(guild, year_ago), False),
+        "usage.report": (q("""SELECT command, SUM(calls), SUM(errors), SUM(total_ms), MAX(max_ms)
+                               FROM command_usage_hourly WHERE guild_id = ? AND hour >= ?
+                               GROUP BY command ORDER BY SUM(total_ms) DESC LIMIT 25""", guild, year_ago), False),
+        "findhelper": (q(main.SQL_FIND_HELPERS, {"game_id": p["game_id"], "platform": "PC", "limit": 10}), False),
+        "resolve_game.name": (lambda: main._resolve_game(guild, p["game_name"].upper(), db), False),
+        "resolve_game.key": (lambda: main._resolve_game(guild, main.game_key(p["game_name"]), db), False),
+        "top_thanked": (lambda: main._query_top_thanked(guild, 10), False),
+        "export.games": (lambda: sum(1 for _ in main._export_rows(db, guild, "games")), False),
+        "export.helpers": (lambda: sum(1 for _ in main._export_rows(db, guild, "helpers")), False),
+    }
+
+    # Leaderboard helpers for each _thanks_where range, first page and a deep page
+    ranges = {"all": (None, None), "last30": (None, None), "month": (p["month"], p["year"])}
+    for scope, (month, year) in ranges.items():
+        total = main._count_distinct_thanked(guild, scope, month, year)
+        deep = max(0, (total // 2) // 10 * 10)
+        cases[f"count_distinct_thanked.{scope}"] = (
+            lambda s=scope, m=month, y=year: main._count_distinct_thanked(guild, s, m, y), False)
+        cases[f"top_thanked_paginated.{scope}.first"] = (
+            lambda s=scope, m=month, y=year: main._query_top_thanked_paginated(guild, 10, 0, s, m, y), False)
+        cases[f"top_thanked_paginated.{scope}.deep"] = (
+            lambda s=scope, m=month, y=year, o=deep: main._query_top_thanked_paginated(guild, 10, o, s, m, y), False)
+
+    # Every registered paged listing (/showme, /notHelped, /gamestohelpfull, ...)
+    # /searchfeedback pages a saved search; "help" is in most synthetic messages (worst case)
+    search_id = str(main._save_feedback_search(guild, "help", main._feedback_match(guild, "help")))
+    for key, paged in main.PAGED_QUERIES.items():
+        scope = search_id if key == "fs" else p["heavy_id"] if "{name}" in paged.title else ""
+        total = paged.count(guild, scope)
+        deep = (total // paged.per_page // 2) * paged.per_page
+        cases[f"paged.{key}.count"] = (lambda pq=paged, s=scope: pq.count(guild, s), False)
+        for label, offset in (("first", 0), ("deep", deep)):
+            cases[f"paged.{key}.{label}"] = (
+                lambda pq=paged, s=scope, o=offset: db.execute(
+                    pq.page_sql, {"guild": guild, "scope": s, "limit": pq.per_page, "offset": o}).fetchall(), False)
+
+    for group in range(len(main.GAME_GROUPS)):
+        cases[f"gameswithhelp.group{group}"] = (lambda g=group: main._games_with_help_embed(guild, g), False)
+
+    # Writes: executed, then rolled back
+    def w(sql, *params, many=False):
+        # A single dict (named parameters) or an executemany row list is passed through as-is
+        args = params[0] if many or (len(params) == 1 and isinstance(params[0], dict)) else params
+        return lambda: (db.executemany if many else db.execute)(sql, args).rowcount
+
+    cases.update({
+        "addme.register": (w(main.SQL_REGISTER_HELPER, {
+            "user_id": p["typical_id"], "user_name": "bench", "game_id": p["free_game_id"]}), True),
+        "platform.register": (w(main.SQL_REGISTER_PLATFORM, {
+            "user_id": p["typical_id"], "user_name": "bench", "game_id": p["free_game_id"], "platform": "PC"}), True),
+        "addgame.insert": (w("INSERT INTO games (guild_id, game_name, description, guide_url) VALUES (?, ?, ?, ?)",
+                             guild, "Bench Game", "bench", None), True),
+        "givethanks.insert": (w("""INSERT INTO thanks (guild_id, thanked_user_id, thanked_user_name, thanking_user_id,
+                                                       thanking_user_name, game, message)
+                                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                                guild, p["heavy_id"], p["heavy_name"], p["typical_id"], "bench", p["game_name"], "bench"), True),
+        "setstatus.upsert": (w("""INSERT INTO users (id, user_name, status) VALUES (?, ?, ?)
+                                  ON CONFLICT(id) DO UPDATE SET status = excluded.status, updated_at = CURRENT_TIMESTAMP""",
+                               p["typical_id"], "bench", "amber"), True),
+        "updateurl": (w("UPDATE games SET guide_url = ? WHERE guild_id = ? AND game_name = ?",
+                        "https://bench.example", guild, p["game_name"]), True),
+        "updatedescription": (w("UPDATE games SET description = ? WHERE guild_id = ? AND game_name = ?",
+                                "bench", guild, p["game_name"]), True),
+        "renamegame": (w("UPDATE games SET game_name = ? WHERE guild_id = ? AND game_name = ?",
+                         "Bench Renamed", guild, p["game_name"]), True),
+        "removeme": (w("DELETE FROM helpers WHERE user_id = ? AND game_id = ?", p["typical_id"], p["game_id"]), True),
+        "removegame.helpers": (w("DELETE FROM helpers WHERE game_id = ?", p["game_id"]), True),
+        "deleteuser": (w("DELETE FROM helpers WHERE guild_id = ? AND user_id = ?", guild, p["typical_id"]), True),
+        "deleteusermanual": (w("""DELETE FROM helpers WHERE guild_id = ?
+                                  AND (user_name = ? OR user_id IN (SELECT id FROM users WHERE user_name = ?))""",
+                               guild, p["heavy_name"], p["heavy_name"]), True),
+        "namesync.flush": (w("UPDATE users SET user_name = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                             [("bench", p["heavy_id"]), ("bench", p["typical_id"])], many=True), True),
+    })
+    return cases
+
+
+# ---------- measurement ----------
+def _plan(db, sql: str) -> list[str]:
+    rows = db.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+    depth = {0: 0}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, 0) + 1
+        lines.append("  " * (depth[node_id] - 1) + detail)
+    return lines
+
+
+def _full_scans(plan: list[str]) -> int:
+    # "SCAN t USING COVERING INDEX" still walks the whole index, but it is the table scans that hurt
+    return sum(1 for line in plan if line.strip().startswith("SCAN") and "INDEX" not in line)
+
+
+def measure(db, fn, writes: bool, repeat: int) -> dict:
+    statements = []
+    tracer = lambda sql: statements.append(sql)  # expanded SQL, bound values inlined
+    db.set_trace_callback(tracer)
+    try:
+        result = fn()
+    finally:
+        db.set_trace_callback(None)
+        if writes:
+            db.rollback()
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        if writes:
+            db.rollback()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    seen = []
+    for sql in statements:
+        head = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ""
+        if head in ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE") and sql not in seen:
+            seen.append(sql)
+    plan = [line for sql in seen for line in _plan(db, sql)]
+    timings.sort()
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        "min_ms": round(timings[0], 3),
+        "result": result if isinstance(result, int) else len(result) if hasattr(result, "__len__") else None,
+        "statements": len(seen),
+        "full_scans": _full_scans(plan),
+        "plan": plan,
+    }
+
+
+def run(main, repeat: int, only: list[str], guild_id: int | None = None) -> dict:
+    db = main.conn
+    db.commit()  # start from a clean transaction state after main.py's migrations
+    main.roll_up_thanks(db)  # rollups are derived data; bring them up to date as the bot's rollup_task would
+    probe = _probe(db, guild_id)
+    cases = build_cases(main, probe)
+    selected = [name for name in cases if not only or any(name.startswith(prefix) for prefix in only)]
+    results = {}
+    for name in selected:
+        fn, writes = cases[name]
+        results[name] = measure(db, fn, writes, repeat)
+        print(f"{name:<40} {results[name]['median_ms']:>10.3f} ms", file=sys.stderr)
+    counts = {t: db.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in ("games", "helpers", "users", "thanks")}
+    counts.update({f"guild {t}": db.execute(f"SELECT COUNT(*) FROM {t} WHERE guild_id = ?", (probe["guild_id"],)).fetchone()[0]
+                   for t in ("games", "helpers", "thanks")})
+    return {
+        "meta": {
+            "when": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+            "sqlite": sqlite3.sqlite_version,
+            "python": platform.python_version(),
+            "repeat": repeat,
+            "rows": counts,
+            "probe": probe,
+        },
+        "cases": results,
+    }
+
+
+# ---------- reporting ----------
+def print_report(report: dict):
+    rows = report["meta"]["rows"]
+    print(f"\nSQLite {report['meta']['sqlite']}, " + ", ".join(f"{n:,} {t}" for t, n in rows.items()))
+    print(f"{'case':<40} {'median':>10} {'p95':>10} {'result':>9} {'scans':>6}")
+    print("-" * 79)
+    for name, r in report["cases"].items():
+        rows_txt = "" if r["result"] is None else f"{r['result']:,}"
+        print(f"{name:<40} {r['median_ms']:>10.3f} {r['p95_ms']:>10.3f} {rows_txt:>9} {r['full_scans'] or '':>6}")
+    print("(times in ms; scans = table scans in the query plan)")
+
+
+def compare(report: dict, baseline: dict, threshold: float, min_delta_ms: float, partial: bool = False) -> list[str]:
+    """Returns the regressed case names and prints every difference worth a look."""
+    if baseline["meta"]["rows"] != report["meta"]["rows"]:
+        print(f"\n! Row counts differ from the baseline ({baseline['meta']['rows']}); timings may not be comparable.")
+
+    regressions = []
+    print(f"\nCompared with baseline from {baseline['meta']['when']} (threshold +{threshold:.0%}, min {min_delta_ms} ms):")
+    for name, r in report["cases"].items():
+        old = baseline["cases"].get(name)
+        if old is None:
+            print(f"  new       {name}")
+            continue
+        delta = r["median_ms"] - old["median_ms"]
+        ratio = r["median_ms"] / old["median_ms"] if old["median_ms"] else float("inf")
+        if ratio > 1 + threshold and delta > min_delta_ms:
+            regressions.append(name)
+            print(f"  SLOWER    {name}: {old['median_ms']:.3f} -> {r['median_ms']:.3f} ms (x{ratio:.2f})")
+        elif ratio < 1 - threshold and -delta > min_delta_ms:
+            print(f"  faster    {name}: {old['median_ms']:.3f} -> {r['median_ms']:.3f} ms (x{ratio:.2f})")
+        if r["plan"] != old["plan"]:
+            print(f"  plan      {name}:")
+            print("\n".join(f"      - {line}" for line in old["plan"]))
+            print("\n".join(f"      + {line}" for line in r["plan"]))
+    for name in [] if partial else baseline["cases"]:
+        if name not in report["cases"]:
+            print(f"  missing   {name}")
+    if not regressions:
+        print("  no regressions")
+    return regressions
+
+
+def main_cli(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark main.py's SQL against a helpers.db.")
+    parser.add_argument("db", help="Database to benchmark (see datagen.py)")
+    parser.add_argument("cases", nargs="*", help="Only run cases starting with these prefixes")
+    parser.add_argument("--guild", type=int, help="Guild to benchmark (default: the one with the most thanks)")
+    parser.add_argument("--repeat", type=int, default=15, help="Timed runs per case (after one warm-up)")
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--compare", help="Earlier --json results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Relative slowdown that counts as a regression")
+    parser.add_argument("--min-delta", type=float, default=0.2, help="Ignore slowdowns smaller than this many ms")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        raise SystemExit(f"{args.db} does not exist; create it with datagen.py first.")
+    os.environ["HELPERS_DB"] = args.db
+    import main
+
+    report = run(main, args.repeat, args.cases, args.guild)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.threshold, args.min_delta, partial=bool(args.cases)):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli(sys.argv[1:]))
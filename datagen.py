@@ -0,0 +1,170 @@
+"""Synthetic helpers.db generator for performance work.
+
+Builds a database with main.py's own schema (tables, triggers, indexes) at a
+chosen scale. The data is skewed the way the real community is: thanks
+follow a Zipf-like distribution over helpers, activity grows month over
+month, and a minority of games attract most helpers. With --guilds the rows
+are spread over several guilds of falling size (guild 1 is the biggest).
+
+    python datagen.py bench-large.db --scale large
+    python datagen.py custom.db --games 5000 --users 2000 --thanks 200000 --seed 7
+
+The same --seed always produces the same database, so benchmark runs on
+regenerated files stay comparable.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+SCALES = {
+    #          games   users    thanks
+    "small":  (1_000,  2_000,    50_000),
+    "medium": (10_000, 5_000,   300_000),
+    "large":  (50_000, 10_000, 1_000_000),
+}
+
+BATCH = 50_000
+PLATFORMS = [None, None, "Xbox", "PC", "PlayStation"]   # most /addme rows have no platform
+STATUSES = ["green"] * 6 + ["amber"] * 3 + ["red"]
+WORDS = ["Black", "Ops", "Zombies", "Legends", "Quest", "Souls", "Hunter", "Raid", "Origins",
+         "Dungeon", "Galaxy", "Frontier", "Shadow", "Empire", "Chronicles", "Arena", "Rift"]
+
+
+def _game_name(i: int, rng: random.Random) -> str:
+    return f"{' '.join(rng.sample(WORDS, k=rng.randint(1, 3)))} {i}"
+
+
+def _weighted_index(rng: random.Random, n: int, s: float = 1.1) -> int:
+    """Zipf-ish rank in [0, n): rank k is chosen with weight ~ 1 / (k+1)^s."""
+    while True:
+        k = int(rng.paretovariate(s)) - 1
+        if k < n:
+            return k
+
+
+def _batched(rows, size: int = BATCH):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def generate(db, games: int, users: int, thanks: int, seed: int = 1, months: int = 24, guilds: int = 1, progress=None):
+    """Fills an empty database created by main.py's schema setup. Guild ids are 1..guilds."""
+    rng = random.Random(seed)
+    user_ids = [str(300_000_000_000_000_000 + u) for u in range(users)]
+
+    def pick_guild():
+        return _weighted_index(rng, guilds, 1.0) + 1 if guilds > 1 else 1
+
+    db.executemany(
+        "INSERT OR IGNORE INTO games (guild_id, game_name, description, guide_url) VALUES (?, ?, ?, ?)",
+        ((pick_guild(), _game_name(i, rng),
+          f"Help with {rng.choice(WORDS).lower()} runs" if rng.random() < 0.6 else None,
+          f"https://guides.example/{i}" if rng.random() < 0.15 else None) for i in range(games))
+    )
+    game_guild = [r[0] for r in db.execute("SELECT guild_id FROM games ORDER BY id")]
+    games = len(game_guild)
+    db.commit()
+    if progress:
+        progress("games", games)
+
+    # Helpers: every user helps with 1-20 games, popular games get picked far more often
+    def helper_rows():
+        for uid in user_ids:
+            name = f"helper_{uid[-6:]}"
+            for _ in range(rng.randint(1, 20)):
+                game = _weighted_index(rng, games, 1.05)
+                yield (game_guild[game], uid, name, game + 1, rng.choice(PLATFORMS))
+    written = 0
+    for batch in _batched(helper_rows()):
+        db.executemany(
+            "INSERT INTO helpers (guild_id, user_id, user_name, game_id, platform) VALUES (?, ?, ?, ?, ?) ON CONFLICT DO NOTHING",
+            batch
+        )
+        written += len(batch)
+    db.executemany("UPDATE users SET status = ? WHERE id = ?", ((rng.choice(STATUSES), uid) for uid in user_ids))
+    db.commit()
+    if progress:
+        progress("helpers", written)
+
+    # Thanks: skewed over recipients, growing month over month up to now
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    month_weights = [1.0 + 0.08 * m for m in range(months)]
+    total_weight = sum(month_weights)
+    guild_games: dict[int, list[str]] = {}
+    for guild_id, name in db.execute("SELECT guild_id, game_name FROM games ORDER BY id"):
+        guild_games.setdefault(guild_id, []).append(name)
+
+    def thanks_rows():
+        for m, weight in enumerate(month_weights):
+            count = int(thanks * weight / total_weight)
+            start = now - timedelta(days=30 * (months - m))
+            for _ in range(count):
+                guild_id = pick_guild()
+                names = guild_games.get(guild_id)
+                thanked = user_ids[_weighted_index(rng, users)]
+                thanking = user_ids[rng.randrange(users)]
+                ts = start + timedelta(seconds=rng.randrange(30 * 86400))
+                game = names[_weighted_index(rng, len(names), 1.05)] if names and rng.random() < 0.7 else None
+                message = f"thanks for the {rng.choice(WORDS).lower()} help" if rng.random() < 0.5 else None
+                yield (guild_id, thanked, f"helper_{thanked[-6:]}", thanking, f"helper_{thanking[-6:]}",
+                       game, message, ts.strftime("%Y-%m-%d %H:%M:%S"))
+    written = 0
+    for batch in _batched(thanks_rows()):
+        db.executemany(
+            """INSERT INTO thanks (guild_id, thanked_user_id, thanked_user_name, thanking_user_id, thanking_user_name,
+                                   game, message, timestamp)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            batch
+        )
+        db.commit()
+        written += len(batch)
+        if progress:
+            progress("thanks", written)
+    db.execute("ANALYZE")
+    db.commit()
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic helpers.db at a given scale.")
+    parser.add_argument("path", help="Database file to create (must not exist)")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--games", type=int)
+    parser.add_argument("--users", type=int)
+    parser.add_argument("--thanks", type=int)
+    parser.add_argument("--months", type=int, default=24, help="How far back the thanks history goes")
+    parser.add_argument("--guilds", type=int, default=1, help="Spread the data over this many guilds")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    if os.path.exists(args.path):
+        raise SystemExit(f"{args.path} already exists; generate into a new file.")
+    games, users, thanks = SCALES[args.scale]
+    games = args.games or games
+    users = args.users or users
+    thanks = args.thanks or thanks
+
+    os.environ["HELPERS_DB"] = args.path
+    import main  # creates the schema in the new file
+
+    started = time.perf_counter()
+
+    def progress(stage, n):
+        print(f"\r{stage}: {n:,} rows ({time.perf_counter() - started:.1f}s)", end="", file=sys.stderr, flush=True)
+
+    generate(main.conn, games, users, thanks, seed=args.seed, months=args.months, guilds=args.guilds, progress=progress)
+    print(file=sys.stderr)
+    size_mb = os.path.getsize(args.path) / (1024 * 1024)
+    print(f"Wrote {args.path}: {games:,} games, {users:,} users, {thanks:,} thanks ({size_mb:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main_cli(sys.argv[1:])
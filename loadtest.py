@@ -0,0 +1,543 @@
+"""Offline load test for Haven's Helper.
+
+Replays synthetic interactions against the real command handlers in main.py,
+using fake Interaction / response / followup objects and a synthetic SQLite
+database, so no Discord connection is needed. Each command runs as its own
+phase at a fixed arrival rate; the report gives throughput, latency
+percentiles and event-loop lag per command.
+
+    python loadtest.py                       # every scenario, 20 req/s for 5 s each
+    python loadtest.py --rate 50 --duration 10 show_game give_thanks
+    python loadtest.py --db big.db --json baseline.json
+    python loadtest.py --processes 4 give_thanks most_thanked_table
+
+Without --db a temporary database is created and seeded with datagen.py
+(see --games, --users, --thanks).
+
+--processes N is a fake gateway for the sharded mode: N processes, each
+importing main.py as one shard (SHARD_COUNT / SHARD_IDS) and serving its own
+guild, hit the same database file at once. It reports lock errors like any
+other error and checks that a cache filled in this process is invalidated by
+the other processes' writes (PRAGMA data_version). An existing --db is used as-is, so point it at a copy.
+
+--guild-members N skips the command phases and replays a large guild's startup
+(GUILD_CREATE, then GUILD_MEMBERS_CHUNK payloads if the profile chunks) into
+the bot's real discord.py connection state, once per INTENTS_PROFILE, each in a
+fresh process, and reports the resident memory it added and how long the guild
+took to become ready (gateway round trips excluded).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+
+# ---------- fake discord objects ----------
+class FakePermissions:
+    administrator = True
+    manage_guild = True
+
+
+class FakeUser:
+    def __init__(self, user_id: int, name: str):
+        self.id = user_id
+        self.name = name
+        self.display_name = name
+        self.mention = f"<@{user_id}>"
+        self.bot = False
+        self.guild_permissions = FakePermissions()
+
+    def __str__(self):
+        return self.name
+
+
+class FakeRole:
+    def __init__(self, role_id: int):
+        self.id = role_id
+        self.mention = f"<@&{role_id}>"
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int = 1):
+        self.id = guild_id
+        self.name = "Load Test Guild"
+        self.filesize_limit = 25 * 1024 * 1024
+        self.me = None          # no member object: channel permission checks pass
+        self.system_channel = None
+        self.text_channels = []
+
+    def get_member(self, user_id):
+        return None  # keeps the leaderboard renderer off the network
+
+    async def fetch_member(self, user_id):
+        raise LookupError("offline")
+
+    def get_role(self, role_id):
+        return FakeRole(role_id)
+
+
+class FakeMessage:
+    def __init__(self, content=None, **kwargs):
+        self.id = random.getrandbits(48)
+        self.content = content
+        self.kwargs = kwargs
+
+    async def edit(self, **kwargs):
+        self.kwargs.update(kwargs)
+        return self
+
+
+class FakeChannel:
+    def __init__(self, channel_id: int = 1):
+        self.id = channel_id
+        self.sent = 0
+
+    async def send(self, content=None, **kwargs):
+        self.sent += 1
+        return FakeMessage(content, **kwargs)
+
+
+class FakeResponse:
+    def __init__(self, interaction):
+        self._interaction = interaction
+        self._done = False
+
+    def is_done(self) -> bool:
+        return self._done
+
+    def _finish(self):
+        if self._done:
+            raise RuntimeError("interaction already responded to")
+        self._done = True
+
+    async def send_message(self, content=None, **kwargs):
+        self._finish()
+        self._interaction._original = FakeMessage(content, **kwargs)
+
+    async def defer(self, **kwargs):
+        self._finish()
+        self._interaction._original = FakeMessage(None)
+
+    async def edit_message(self, **kwargs):
+        self._finish()
+
+    async def send_modal(self, modal):
+        self._finish()
+
+
+class FakeFollowup:
+    def __init__(self):
+        self.sent = 0
+
+    async def send(self, content=None, **kwargs):
+        self.sent += 1
+        return FakeMessage(content, **kwargs)
+
+
+class FakeInteraction:
+    def __init__(self, user: FakeUser, guild: FakeGuild, channel: FakeChannel, data: dict | None = None):
+        self.user = user
+        self.guild = guild
+        self.guild_id = guild.id
+        self.channel = channel
+        self.channel_id = channel.id
+        self.data = data or {}
+        self.extras = {}
+        self.command = None
+        self.created_at = datetime.now(timezone.utc)
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup()
+        self._original = None
+
+    async def original_response(self):
+        return self._original
+
+    async def edit_original_response(self, **kwargs):
+        return self._original
+
+
+# ---------- scenarios ----------
+def build_scenarios(main, rng: random.Random, guild_id: int = 1) -> dict:
+    guild = FakeGuild(guild_id)
+    channel = FakeChannel()
+    run_id = int(time.time())
+    # Sample real rows so the same scenarios work against any --db
+    users = main.conn.execute("SELECT id, user_name FROM users").fetchall() or [("100000", "user100000")]
+    games = [r[0] for r in main.conn.execute("SELECT game_name FROM games WHERE guild_id = ?", (guild.id,))] or ["Game 00000"]
+
+    def any_user() -> FakeUser:
+        uid, name = rng.choice(users)
+        return FakeUser(int(uid), name)
+
+    def any_game() -> str:
+        return rng.choice(games)
+
+    def inter(user=None, data=None) -> FakeInteraction:
+        return FakeInteraction(user or any_user(), guild, channel, data)
+
+    async def add_game(i):
+        await main.add_game.callback(inter(), f"Load Game {run_id}-{i}", "load test", None)
+
+    async def add_me(i):
+        await main.add_me.callback(inter(), any_game())
+
+    async def remove_me(i):
+        await main.remove_me.callback(inter(), any_game())
+
+    async def process_platform(i):
+        await main.process_platform(inter(), any_game(), rng.choice(["Xbox", "PC", "PlayStation"]))
+
+    async def set_status(i):
+        await main.set_status.callback(inter(), rng.choice(["green", "amber", "red"]))
+
+    async def update_url(i):
+        await main.update_url.callback(inter(), any_game(), f"https://guides.example/load/{i}")
+
+    async def show_game(i):
+        await main.show_game.callback(inter(), any_game())
+
+    async def find_helper(i):
+        await main.find_helper.callback(inter(), any_game(), rng.choice([None, "Xbox", "PC", "PlayStation"]))
+
+    async def show_me(i):
+        await main.show_me.callback(inter())
+
+    async def show_user(i):
+        await main.show_user.callback(inter(), any_user())
+
+    async def show_user_description(i):
+        await main.show_user_description.callback(inter(), any_user())
+
+    async def page_click(i):
+        button = main.PageButton("gh", "", rng.randrange(max(1, len(games) // 20)), "n")
+        await button.callback(inter())
+
+    async def not_helped(i):
+        await main.not_helped.callback(inter())
+
+    async def games_with_help(i):
+        await main.games_with_help.callback(inter())
+
+    async def games_by_letter(i):
+        await main.games_by_letter.callback(inter(), "G")
+
+    async def games_with_guides(i):
+        await main.games_with_guides.callback(inter())
+
+    async def games_to_help_full(i):
+        await main.games_to_help_full.callback(inter())
+
+    async def top_helper(i):
+        await main.top_helper.callback(inter())
+
+    async def give_thanks(i):
+        giver, thanked = any_user(), any_user()
+        while thanked.id == giver.id:
+            thanked = any_user()
+        await main._process_give_thanks(inter(giver), thanked, any_game(), "load test thanks")
+
+    async def announce_milestones(i):
+        await main.announce_milestones()
+
+    async def most_thanked(i):
+        await main.most_thanked.callback(inter(), None, None)
+
+    async def thanks_trend(i):
+        await main.thanks_trend.callback(inter(), rng.choice(["day", "week", "month"]), 365, None, None)
+
+    async def most_thanked_table(i):
+        await main.most_thanked_table.callback(inter(), None, None)
+
+    async def show_feedback(i):
+        await main.show_feedback.callback(inter(), any_user())
+
+    async def autocomplete(i):
+        await main._game_autocomplete(inter(), f"{rng.randrange(100):02d}")
+
+    async def health_check(i):
+        await main.health_check.callback(inter())
+
+    scenarios = {fn.__name__: fn for fn in [
+        autocomplete, show_game, find_helper, show_me, show_user, show_user_description, page_click,
+        not_helped, games_with_help, games_by_letter, games_with_guides, games_to_help_full,
+        top_helper, most_thanked, most_thanked_table, thanks_trend, show_feedback, health_check,
+        add_game, add_me, remove_me, process_platform, set_status, update_url, give_thanks,
+        announce_milestones,
+    ]}
+    return scenarios
+
+
+# ---------- driver ----------
+def _pct(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = min(len(values) - 1, max(0, round(p / 100 * (len(values) - 1))))
+    return values[k]
+
+
+async def _sample_lag(samples: list[float], stop: asyncio.Event, interval: float = 0.005):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        t0 = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - t0 - interval))
+
+
+async def run_phase(name: str, fn, rate: float, duration: float) -> dict:
+    latencies: list[float] = []
+    errors: list[str] = []
+    lag: list[float] = []
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(_sample_lag(lag, stop))
+
+    async def one(i):
+        t0 = time.perf_counter()
+        try:
+            await fn(i)
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+        finally:
+            latencies.append(time.perf_counter() - t0)
+
+    # Open-loop arrivals: requests start on schedule whether or not earlier ones finished
+    pending = []
+    started = time.perf_counter()
+    i = 0
+    while True:
+        due = started + i / rate
+        now = time.perf_counter()
+        if due - started >= duration:
+            break
+        if due > now:
+            await asyncio.sleep(due - now)
+        pending.append(asyncio.create_task(one(i)))
+        i += 1
+    await asyncio.gather(*pending)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await sampler
+
+    return {
+        "command": name,
+        "calls": len(latencies),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": _pct(latencies, 50) * 1000,
+        "p95_ms": _pct(latencies, 95) * 1000,
+        "p99_ms": _pct(latencies, 99) * 1000,
+        "max_ms": max(latencies, default=0.0) * 1000,
+        "lag_p50_ms": _pct(lag, 50) * 1000,
+        "lag_p99_ms": _pct(lag, 99) * 1000,
+        "lag_max_ms": max(lag, default=0.0) * 1000,
+    }
+
+
+def print_report(results: list[dict]):
+    header = f"{'command':<22}{'calls':>7}{'err':>5}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}{'lag p99':>10}{'lag max':>10}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['command']:<22}{r['calls']:>7}{r['errors']:>5}{r['throughput']:>9.1f}"
+              f"{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}{r['max_ms']:>9.2f}"
+              f"{r['lag_p99_ms']:>10.2f}{r['lag_max_ms']:>10.2f}")
+    print("(latencies and event-loop lag in ms)")
+    for r in results:
+        if r["first_error"]:
+            print(f"! {r['command']}: {r['errors']} error(s), first: {r['first_error']}")
+
+
+async def main_async(args, seed: bool) -> list[dict]:
+    import main  # imported here so HELPERS_DB is already set
+    import datagen
+
+    if seed:
+        datagen.generate(main.conn, args.games, args.users, args.thanks, seed=args.seed, months=12)
+    main.roll_up_thanks(main.conn)  # what the primary's rollup_task keeps current for /thankstrend
+    scenarios = build_scenarios(main, random.Random(args.seed), args.guild)
+
+    unknown = [name for name in args.commands if name not in scenarios]
+    if unknown:
+        raise SystemExit(f"Unknown scenario(s): {', '.join(unknown)}. Available: {', '.join(scenarios)}")
+
+    main.loop_watchdog.start()   # the bot's own blocking detector, stacks go to BLOCKING_LOG
+    results = []
+    for name in args.commands or scenarios:
+        results.append(await run_phase(name, scenarios[name], args.rate, args.duration))
+    print(f"watchdog: {main.loop_watchdog.report()} (stacks in {main.BLOCKING_LOG})")
+    return results
+
+
+def run_processes(args) -> list[dict]:
+    """Runs the scenarios in args.processes shard processes against args.db at the same time."""
+    import subprocess
+    import main
+
+    # Fill a cache entry here; the other processes' writes must invalidate it
+    key = (1, "all", 0)
+    asyncio.run(main._most_thanked_page(FakeGuild(1), "all", 0))
+    primed = main.leaderboard_cache.get(key) is not None
+
+    workdir = tempfile.mkdtemp()
+    children = []
+    for shard in range(args.processes):
+        out = os.path.join(workdir, f"shard{shard}.json")
+        cmd = [sys.executable, os.path.abspath(__file__), *args.commands, "--db", args.db,
+               "--rate", str(args.rate), "--duration", str(args.duration),
+               "--guild", str(shard + 1), "--seed", str(args.seed + shard), "--json", out]
+        env = {**os.environ, "SHARD_COUNT": str(args.processes), "SHARD_IDS": str(shard)}
+        children.append((shard, out, subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL)))
+
+    results = []
+    for shard, out, child in children:
+        if child.wait() != 0:
+            raise SystemExit(f"shard process {shard} failed with exit code {child.returncode}")
+        with open(out, encoding="utf-8") as f:
+            for r in json.load(f)["results"]:
+                results.append({**r, "command": f"s{shard} {r['command']}"})
+
+    invalidated = main.leaderboard_cache.get(key) is None
+    print(f"cache coherence across processes: {'ok' if primed and invalidated else 'FAILED'}")
+    return results
+
+
+# ---------- large-guild startup (INTENTS_PROFILE comparison) ----------
+def _rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def _member_payload(i: int) -> dict:
+    return {"user": {"id": str(400_000_000_000_000_000 + i), "username": f"member{i}", "discriminator": "0",
+                     "global_name": f"Member {i}", "avatar": None},
+            "roles": [], "joined_at": "2024-01-01T00:00:00+00:00", "nick": None, "deaf": False, "mute": False, "flags": 0}
+
+
+def simulate_guild(members: int) -> dict:
+    """Runs in a child process with INTENTS_PROFILE set; returns its numbers."""
+    import gc
+    import main
+    state = main.bot._connection
+    guild_id = 1
+    chunks = 0
+    pending = []
+
+    async def chunker(gid, query="", limit=0, presences=False, *, shard_id=None, nonce=None):
+        # What the gateway answers to REQUEST_GUILD_MEMBERS, later: chunks of up to 1000 members
+        async def answer():
+            nonlocal chunks
+            count = (members + 999) // 1000
+            for index in range(count):
+                state.parse_guild_members_chunk({
+                    "guild_id": str(gid), "nonce": nonce, "chunk_index": index, "chunk_count": count,
+                    "members": [_member_payload(i) for i in range(index * 1000, min(members, (index + 1) * 1000))],
+                })
+                chunks += 1
+                await asyncio.sleep(0)
+        pending.append(asyncio.get_running_loop().create_task(answer()))
+
+    async def start():
+        state.loop = asyncio.get_running_loop()
+        state.chunker = chunker
+        # Large guilds only carry the bot (and voice members) in GUILD_CREATE without presences
+        guild = state._get_create_guild({
+            "id": str(guild_id), "name": "Big Guild", "member_count": members, "large": True,
+            "roles": [], "channels": [], "emojis": [], "stickers": [], "features": [],
+            "members": [_member_payload(0)], "owner_id": "1",
+        })
+        if state._guild_needs_chunking(guild):
+            await state.chunk_guild(guild)
+        return guild
+
+    gc.collect()
+    before = _rss_mb()
+    t0 = time.perf_counter()
+    guild = asyncio.run(start())
+    ready_ms = (time.perf_counter() - t0) * 1000
+    gc.collect()
+    return {"profile": main.INTENTS_PROFILE, "intents": main.intents.value, "members": members,
+            "cached": len(guild.members), "chunks": chunks, "rss_mb": _rss_mb() - before, "ready_ms": ready_ms}
+
+
+def run_guild_simulation(members: int) -> list[dict]:
+    import subprocess
+    results = []
+    for profile in ("full", "lean", "minimal"):
+        env = {**os.environ, "INTENTS_PROFILE": profile}
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), "--simulate-guild", str(members)],
+                             env=env, capture_output=True, text=True, check=True).stdout
+        results.append(json.loads(out.strip().splitlines()[-1]))
+    print(f"{'profile':<10}{'intents':>10}{'cached':>9}{'chunks':>8}{'RSS MB':>9}{'ready ms':>10}")
+    for r in results:
+        print(f"{r['profile']:<10}{r['intents']:>10}{r['cached']:>9}{r['chunks']:>8}{r['rss_mb']:>9.1f}{r['ready_ms']:>10.0f}")
+    print(f"(one guild of {members:,} members; RSS added by the startup, ready time excludes gateway round trips)")
+    return results
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("commands", nargs="*", help="Scenarios to run (default: all)")
+    parser.add_argument("--rate", type=float, default=20.0, help="Requests per second per phase")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per phase")
+    parser.add_argument("--db", help="Existing database to run against (default: seeded temp file)")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--thanks", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--guild", type=int, default=1, help="Guild id the fake interactions come from")
+    parser.add_argument("--processes", type=int, default=1, help="Run as this many shard processes (fake gateway)")
+    parser.add_argument("--json", help="Also write the results to this file")
+    parser.add_argument("--guild-members", type=int, help="Compare INTENTS_PROFILEs on a guild of this many members instead")
+    parser.add_argument("--simulate-guild", type=int, help=argparse.SUPPRESS)   # child of --guild-members
+    args = parser.parse_args(argv)
+
+    tmpdir = None
+    if not args.db:
+        tmpdir = tempfile.TemporaryDirectory()
+        args.db = os.path.join(tmpdir.name, "helpers.db")
+        seed = True
+    else:
+        seed = False
+    os.environ["HELPERS_DB"] = args.db
+    # Measure the handlers, not the write limiter; export WRITE_LIMIT_* to load-test with it on
+    os.environ.setdefault("WRITE_LIMIT_USER", "1000000/1")
+    os.environ.setdefault("WRITE_LIMIT_GUILD", "1000000/1")
+    os.environ.setdefault("BLOCKING_LOG", os.path.join(tempfile.gettempdir(), "loadtest-blocking.log"))
+
+    if args.simulate_guild:
+        print(json.dumps(simulate_guild(args.simulate_guild)))
+        return
+    if args.guild_members:
+        results = run_guild_simulation(args.guild_members)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump({"args": vars(args), "results": results}, f, indent=2)
+        if tmpdir:
+            tmpdir.cleanup()
+        return
+
+    if args.processes > 1:
+        if seed:
+            import main
+            import datagen
+            datagen.generate(main.conn, args.games, args.users, args.thanks, seed=args.seed, months=12,
+                             guilds=args.processes)
+        results = run_processes(args)
+    else:
+        results = asyncio.run(main_async(args, seed))
+    print_report(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+    if tmpdir:
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main_cli(sys.argv[1:])
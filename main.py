@@ -1,5 +1,5 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import ButtonStyle
 from discord.ui import Button, View
 from discord import AllowedMentions
@@ -12,6 +12,8 @@ from datetime import datetime, timedelta, timezone
 import calendar
 
 import io, asyncio, aiohttp, math
+import argparse, collections, cProfile, csv, functools, glob, gzip, json, logging.handlers, marshal, re, shutil, sys, tempfile, threading, traceback, unicodedata
+from typing import Literal
 from PIL import Image, ImageDraw, ImageFont
 
 load_dotenv()
@@ -20,15 +22,82 @@ load_dotenv()
 start_time = time.time()
 
 # Bot configuration
-intents = discord.Intents.default()
-intents.message_content = True  # Required for reading message content
-intents.members = True          # Required for accessing member data
-bot = commands.Bot(command_prefix="?", intents=intents)
+# INTENTS_PROFILE picks what the gateway sends. Every command is a slash command or
+# context menu, so message content is never needed:
+#   lean (default)  guilds + members, no member cache and no chunking at startup; lookups go
+#                   through member_cache and name changes are read from the raw member updates
+#   minimal         guilds only, no automatic name sync
+#   full            the old setup: message content, members, every member cached at startup
+INTENTS_PROFILE = os.getenv("INTENTS_PROFILE", "lean")
+if INTENTS_PROFILE == "full":
+    intents = discord.Intents.default()
+    intents.message_content = True
+    intents.members = True
+    member_cache_flags = discord.MemberCacheFlags.from_intents(intents)
+elif INTENTS_PROFILE in ("lean", "minimal"):
+    intents = discord.Intents.none()
+    intents.guilds = True
+    intents.members = INTENTS_PROFILE == "lean"
+    member_cache_flags = discord.MemberCacheFlags.none()
+    # The raw member updates come from discord.py's parser table, which is not public API
+    # (tested with discord.py 2.7; tests/test_intents.py fails if it goes away). Without
+    # it, cache members as they join or change so the public on_member_update still fires.
+    if intents.members and not hasattr(discord.state.ConnectionState, "parse_guild_member_update"):
+        member_cache_flags = discord.MemberCacheFlags.from_intents(intents)
+else:
+    raise SystemExit(f"Unknown INTENTS_PROFILE {INTENTS_PROFILE!r}; use lean, minimal or full.")
+
+class GuildOnlyTree(app_commands.CommandTree):
+    # All data is partitioned per guild (see guild_id below), so commands only run inside a server
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        interaction.extras["started_at"] = time.perf_counter()   # for usage_log
+        if interaction.guild_id is not None:
+            return True
+        if interaction.type is discord.InteractionType.application_command:
+            await interaction.response.send_message("Haven's Helper commands only work inside a server.", ephemeral=True)
+        return False
+
+    async def on_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        usage_log.record(interaction, ok=False)
+        await super().on_error(interaction, error)
+
+# Sharding: SHARD_COUNT=auto (or a number) runs an AutoShardedBot; SHARD_IDS limits this
+# process to some of the shards, which is how `python main.py shards` splits them across
+# processes. Unset runs the plain single-connection bot.
+SHARD_COUNT = os.getenv("SHARD_COUNT", "")
+SHARD_IDS = [int(s) for s in os.getenv("SHARD_IDS", "").split(",") if s.strip()] or None
+# One process owns the once-per-bot jobs (command sync, backups, adopting old rows)
+IS_PRIMARY = SHARD_IDS is None or 0 in SHARD_IDS
+
+if SHARD_COUNT:
+    bot = commands.AutoShardedBot(
+        command_prefix="?", intents=intents, tree_cls=GuildOnlyTree,
+        member_cache_flags=member_cache_flags, chunk_guilds_at_startup=INTENTS_PROFILE == "full",
+        shard_count=None if SHARD_COUNT == "auto" else int(SHARD_COUNT), shard_ids=SHARD_IDS,
+    )
+else:
+    bot = commands.Bot(
+        command_prefix="?", intents=intents, tree_cls=GuildOnlyTree,
+        member_cache_flags=member_cache_flags, chunk_guilds_at_startup=INTENTS_PROFILE == "full",
+    )
 
 
 # SQLite Database setup
-conn = sqlite3.connect('helpers.db')
+DB_PATH = os.getenv('HELPERS_DB', 'helpers.db')
+# Shard processes share this file; WAL lets them read concurrently and the
+# 30s busy timeout queues their writes instead of failing with "database is locked"
+conn = sqlite3.connect(DB_PATH, timeout=30)
 c = conn.cursor()
+# Incremental auto-vacuum lets maintenance_task hand free pages back to the OS in
+# small steps. A new file takes the setting directly; an existing one needs one full
+# VACUUM to switch, done once by the primary process.
+if c.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+    c.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    if IS_PRIMARY and c.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchone():
+        print("Switching the database to incremental auto-vacuum (one-off VACUUM)...")
+        c.execute("VACUUM")
+# WAL: readers (backups, exports) no longer block the bot's writes and vice versa
+c.execute("PRAGMA journal_mode=WAL")
 
 # Create tables for games and helpers if they don't exist
 c.execute('''CREATE TABLE IF NOT EXISTS games (
@@ -73,103 +142,798 @@ c.execute('''CREATE TABLE IF NOT EXISTS thanks (
                 timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )''')
             
-# Create indexes for faster queries
-c.execute('CREATE INDEX IF NOT EXISTS idx_game_name ON games(game_name)')
-c.execute('CREATE INDEX IF NOT EXISTS idx_user_id ON helpers(user_id)')
+# Create indexes for faster queries (the per-guild ones are created below)
 c.execute('CREATE INDEX IF NOT EXISTS idx_game_id ON helpers(game_id)')
-c.execute('CREATE INDEX IF NOT EXISTS idx_thanked_user_id ON thanks(thanked_user_id)')
-c.execute('CREATE INDEX IF NOT EXISTS idx_thanking_user_id ON thanks(thanking_user_id)')
-c.execute('CREATE INDEX IF NOT EXISTS idx_timestamp ON thanks(timestamp)')
+
+# Maintained 'has guide' / 'has helpers' flags so the listing commands can read
+# partial indexes instead of scanning games + helpers on every call
+c.execute("PRAGMA table_info(games)")
+columns = [col[1] for col in c.fetchall()]
+if 'has_guide' not in columns:
+    c.execute("ALTER TABLE games ADD COLUMN has_guide INTEGER NOT NULL DEFAULT 0")
+    c.execute("UPDATE games SET has_guide = (guide_url IS NOT NULL AND TRIM(guide_url) <> '')")
+if 'has_helpers' not in columns:
+    c.execute("ALTER TABLE games ADD COLUMN has_helpers INTEGER NOT NULL DEFAULT 0")
+    c.execute("UPDATE games SET has_helpers = EXISTS(SELECT 1 FROM helpers h WHERE h.game_id = games.id)")
+
+# Per-guild partitioning: every row belongs to one guild and every index leads
+# on guild_id, so a guild's queries only touch that guild's rows. Rows written
+# before this existed get HOME_GUILD_ID, or 0 until on_ready adopts them.
+HOME_GUILD_ID = int(os.getenv("HOME_GUILD_ID", "0"))
+
+c.execute("PRAGMA table_info(games)")
+columns = [col[1] for col in c.fetchall()]
+if 'guild_id' not in columns:
+    # game_name was UNIQUE across the whole table; rebuild so each guild has its own catalog.
+    # Dropping the old table also drops its indexes and triggers, which are recreated below.
+    c.execute('''CREATE TABLE games_new (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    guild_id INTEGER NOT NULL DEFAULT 0,
+                    game_name TEXT,
+                    description TEXT,
+                    guide_url TEXT,
+                    has_guide INTEGER NOT NULL DEFAULT 0,
+                    has_helpers INTEGER NOT NULL DEFAULT 0,
+                    UNIQUE (guild_id, game_name)
+                )''')
+    c.execute('''INSERT INTO games_new (id, guild_id, game_name, description, guide_url, has_guide, has_helpers)
+                 SELECT id, ?, game_name, description, guide_url, has_guide, has_helpers FROM games''',
+              (HOME_GUILD_ID,))
+    c.execute("DROP TABLE games")
+    c.execute("ALTER TABLE games_new RENAME TO games")
+
+for table in ("helpers", "thanks", "logs"):
+    c.execute(f"PRAGMA table_info({table})")
+    if 'guild_id' not in [col[1] for col in c.fetchall()]:
+        c.execute(f"ALTER TABLE {table} ADD COLUMN guild_id INTEGER NOT NULL DEFAULT 0")
+        if table == "helpers":
+            c.execute("UPDATE helpers SET guild_id = IFNULL((SELECT guild_id FROM games WHERE id = helpers.game_id), 0)")
+        elif HOME_GUILD_ID:
+            c.execute(f"UPDATE {table} SET guild_id = ?", (HOME_GUILD_ID,))
+
+# The single-column indexes are superseded by the guild-leading ones
+for old_index in ("idx_game_name", "idx_user_id", "idx_thanked_user_id", "idx_thanking_user_id", "idx_timestamp"):
+    c.execute(f"DROP INDEX IF EXISTS {old_index}")
+c.execute('CREATE INDEX IF NOT EXISTS idx_games_guild_name ON games(guild_id, game_name COLLATE NOCASE)')
+c.execute('CREATE INDEX IF NOT EXISTS idx_helpers_guild_user ON helpers(guild_id, user_id)')
+# (thanked, timestamp) also serves /showfeedback's "latest 10" without a sort
+c.execute('CREATE INDEX IF NOT EXISTS idx_thanks_guild_thanked ON thanks(guild_id, thanked_user_id, timestamp)')
+c.execute('CREATE INDEX IF NOT EXISTS idx_thanks_guild_thanking ON thanks(guild_id, thanking_user_id)')
+c.execute('CREATE INDEX IF NOT EXISTS idx_thanks_guild_time ON thanks(guild_id, timestamp)')
+
+# Triggers keep the flags correct whichever code path writes games/helpers
+c.execute('''CREATE TRIGGER IF NOT EXISTS trg_games_guide_ins AFTER INSERT ON games
+             BEGIN
+                 UPDATE games SET has_guide = (NEW.guide_url IS NOT NULL AND TRIM(NEW.guide_url) <> '')
+                 WHERE id = NEW.id;
+             END''')
+c.execute('''CREATE TRIGGER IF NOT EXISTS trg_games_guide_upd AFTER UPDATE OF guide_url ON games
+             BEGIN
+                 UPDATE games SET has_guide = (NEW.guide_url IS NOT NULL AND TRIM(NEW.guide_url) <> '')
+                 WHERE id = NEW.id;
+             END''')
+c.execute('''CREATE TRIGGER IF NOT EXISTS trg_helpers_ins AFTER INSERT ON helpers
+             BEGIN
+                 UPDATE games SET has_helpers = 1 WHERE id = NEW.game_id AND has_helpers = 0;
+             END''')
+c.execute('''CREATE TRIGGER IF NOT EXISTS trg_helpers_del AFTER DELETE ON helpers
+             BEGIN
+                 UPDATE games SET has_helpers = 0
+                 WHERE id = OLD.game_id
+                   AND NOT EXISTS (SELECT 1 FROM helpers WHERE game_id = OLD.game_id);
+             END''')
+c.execute('''CREATE TRIGGER IF NOT EXISTS trg_helpers_move AFTER UPDATE OF game_id ON helpers
+             BEGIN
+                 UPDATE games SET has_helpers = 1 WHERE id = NEW.game_id AND has_helpers = 0;
+                 UPDATE games SET has_helpers = 0
+                 WHERE id = OLD.game_id
+                   AND NOT EXISTS (SELECT 1 FROM helpers WHERE game_id = OLD.game_id);
+             END''')
+
+# Partial indexes matching the WHERE/ORDER BY of /nothelped, /gameswithguides and
+# the games-with-helpers listings (each query is a plain ordered index scan)
+c.execute('''CREATE INDEX IF NOT EXISTS idx_games_not_helped ON games(guild_id, game_name COLLATE NOCASE)
+             WHERE has_helpers = 0 AND has_guide = 0''')
+c.execute('CREATE INDEX IF NOT EXISTS idx_games_with_guide ON games(guild_id, game_name COLLATE NOCASE) WHERE has_guide = 1')
+c.execute('CREATE INDEX IF NOT EXISTS idx_games_with_helpers ON games(guild_id, game_name COLLATE NOCASE) WHERE has_helpers = 1')
+
+# One helpers row per (user, game, platform). Drop any duplicates that built up
+# before enforcing it; IFNULL so the platform-less /addme rows count as one key.
+c.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_helpers_unique'")
+if not c.fetchone():
+    c.execute('''DELETE FROM helpers WHERE id NOT IN (
+                     SELECT MIN(id) FROM helpers GROUP BY user_id, game_id, IFNULL(platform, '')
+                 )''')
+    c.execute("CREATE UNIQUE INDEX idx_helpers_unique ON helpers(user_id, game_id, IFNULL(platform, ''))")
+
+# Normalized users: the current name and status live in one row that listings
+# join to. helpers.user_name / thanks.*_user_name stay as write-time snapshots.
+c.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users'")
+users_is_new = c.fetchone() is None
+c.execute('''CREATE TABLE IF NOT EXISTS users (
+                id TEXT PRIMARY KEY,
+                user_name TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'green' CHECK(status IN ('green', 'amber', 'red')),
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )''')
+if users_is_new:
+    # Latest helpers row wins (bare columns follow MAX(id)), then anyone only seen in thanks
+    c.execute('''INSERT INTO users (id, user_name, status)
+                 SELECT user_id, user_name, COALESCE(status, 'green')
+                 FROM (SELECT user_id, user_name, status, MAX(id) FROM helpers
+                       WHERE user_name IS NOT NULL GROUP BY user_id)''')
+    c.execute('''INSERT OR IGNORE INTO users (id, user_name)
+                 SELECT user_id, user_name
+                 FROM (SELECT user_id, user_name, MAX(id) FROM (
+                           SELECT id, thanked_user_id AS user_id, thanked_user_name AS user_name FROM thanks
+                           UNION ALL
+                           SELECT id, thanking_user_id, thanking_user_name FROM thanks
+                       ) GROUP BY user_id)''')
+
+# Every helpers/thanks insert refreshes the users row, so callers stay single-statement
+c.execute('''CREATE TRIGGER IF NOT EXISTS trg_helpers_user AFTER INSERT ON helpers
+             WHEN NEW.user_name IS NOT NULL
+             BEGIN
+                 INSERT INTO users (id, user_name) VALUES (NEW.user_id, NEW.user_name)
+                 ON CONFLICT(id) DO UPDATE SET user_name = excluded.user_name, updated_at = CURRENT_TIMESTAMP
+                 WHERE users.user_name IS NOT excluded.user_name;
+             END''')
+c.execute('''CREATE TRIGGER IF NOT EXISTS trg_thanks_users AFTER INSERT ON thanks
+             BEGIN
+                 INSERT INTO users (id, user_name) VALUES (NEW.thanked_user_id, NEW.thanked_user_name)
+                 ON CONFLICT(id) DO UPDATE SET user_name = excluded.user_name, updated_at = CURRENT_TIMESTAMP
+                 WHERE users.user_name IS NOT excluded.user_name;
+                 INSERT INTO users (id, user_name) VALUES (NEW.thanking_user_id, NEW.thanking_user_name)
+                 ON CONFLICT(id) DO UPDATE SET user_name = excluded.user_name, updated_at = CURRENT_TIMESTAMP
+                 WHERE users.user_name IS NOT excluded.user_name;
+             END''')
+c.execute('CREATE INDEX IF NOT EXISTS idx_users_user_name ON users(user_name)')
+
+# Thanks milestones ("count:role name", separated by ';') and the role pinged to award them
+THANKS_MILESTONES = {
+    int(count): name.strip()
+    for count, _, name in (
+        item.partition(":") for item in os.getenv(
+            "THANKS_MILESTONES", "15:The Pathfinder 🗺️;50:Haven's Guardian 🛡️;100:The Apex Hunter 🏹"
+        ).split(";") if item.strip()
+    )
+}
+MOD_ROLE_ID = int(os.getenv("MOD_ROLE_ID", "1314735241360834640"))
+
+# Running thanks count per (guild, helper), kept by triggers so milestone checks
+# read one row instead of counting the helper's thanks. `milestone` is the
+# highest threshold already announced.
+c.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'thanks_totals'")
+totals_is_new = c.fetchone() is None
+c.execute('''CREATE TABLE IF NOT EXISTS thanks_totals (
+                guild_id INTEGER NOT NULL,
+                user_id TEXT NOT NULL,
+                total INTEGER NOT NULL DEFAULT 0,
+                milestone INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (guild_id, user_id)
+            ) WITHOUT ROWID''')
+if totals_is_new:
+    c.execute('''INSERT INTO thanks_totals (guild_id, user_id, total)
+                 SELECT guild_id, thanked_user_id, COUNT(*) FROM thanks GROUP BY guild_id, thanked_user_id''')
+    # Milestones reached before this table existed were announced the old way
+    for threshold in sorted(THANKS_MILESTONES):
+        c.execute("UPDATE thanks_totals SET milestone = ? WHERE total >= ?", (threshold, threshold))
+c.execute('''CREATE TRIGGER IF NOT EXISTS trg_thanks_totals_ins AFTER INSERT ON thanks
+             BEGIN
+                 INSERT INTO thanks_totals (guild_id, user_id, total) VALUES (NEW.guild_id, NEW.thanked_user_id, 1)
+                 ON CONFLICT(guild_id, user_id) DO UPDATE SET total = total + 1;
+             END''')
+c.execute('''CREATE TRIGGER IF NOT EXISTS trg_thanks_totals_del AFTER DELETE ON thanks
+             BEGIN
+                 UPDATE thanks_totals SET total = total - 1
+                 WHERE guild_id = OLD.guild_id AND user_id = OLD.thanked_user_id;
+             END''')
+# Adopting pre-guild rows (see _adopt_unassigned_rows) moves thanks between guilds;
+# the announced milestone moves along so old milestones aren't announced again
+c.execute('''CREATE TRIGGER IF NOT EXISTS trg_thanks_totals_move AFTER UPDATE OF guild_id, thanked_user_id ON thanks
+             BEGIN
+                 UPDATE thanks_totals SET total = total - 1
+                 WHERE guild_id = OLD.guild_id AND user_id = OLD.thanked_user_id;
+                 INSERT INTO thanks_totals (guild_id, user_id, total, milestone)
+                 VALUES (NEW.guild_id, NEW.thanked_user_id, 1,
+                         IFNULL((SELECT milestone FROM thanks_totals
+                                 WHERE guild_id = OLD.guild_id AND user_id = OLD.thanked_user_id), 0))
+                 ON CONFLICT(guild_id, user_id) DO UPDATE
+                 SET total = total + 1, milestone = MAX(milestone, excluded.milestone);
+             END''')
+
+# Game lookup keys: every command that takes a game name resolves it through
+# _resolve_game, which falls back to these when the exact name misses. A key is
+# the name casefolded with accents, punctuation and spaces removed. Each game also
+# gets the key of the part after a colon ("black ops 4" finds "Call of Duty: Black
+# Ops 4"), its name's initials ("codbo4", and "bo4" for that part) and admins can add aliases.
+def _fold(text: str) -> str:
+    return "".join(ch for ch in unicodedata.normalize("NFKD", text.casefold()) if not unicodedata.combining(ch))
+
+def game_key(name: str) -> str:
+    return "".join(ch for ch in _fold(name) if ch.isalnum())
+
+def _game_subtitle(name: str) -> str | None:
+    """The part after the last colon or dash: "Black Ops 4" in "Call of Duty: Black Ops 4"."""
+    part = re.split(r"\s*[:\u2013\u2014-]\s+", name)[-1]
+    return part if part != name else None
+
+def _game_abbreviations(name: str) -> set[str]:
+    subtitle = _game_subtitle(name)
+    keys = {game_key(subtitle)} if subtitle else set()
+    for part in {name, subtitle or name}:
+        words = re.findall(r"[^\W_]+", re.sub(r"['\u2019]", "", _fold(part)))
+        if len(words) >= 2:
+            # Numbers and roman numerals stay whole: "Dark Souls III" -> "dsiii"
+            keys.add("".join(w if w.isdigit() or set(w) <= set("ivx") else w[0] for w in words))
+    return keys
+
+# kind: 'name' (the game's own name), 'alias' (added by an admin, or a name from
+# before a rename or merge) or 'abbrev' (initials or a subtitle's key). A name key
+# replaces any other kind on the same key, an alias replaces an abbreviation,
+# abbreviations never replace.
+c.execute('''CREATE TABLE IF NOT EXISTS game_aliases (
+                guild_id INTEGER NOT NULL,
+                alias_key TEXT NOT NULL,
+                game_id INTEGER NOT NULL REFERENCES games(id),
+                alias TEXT NOT NULL,
+                kind TEXT NOT NULL CHECK(kind IN ('name', 'alias', 'abbrev')),
+                PRIMARY KEY (guild_id, alias_key)
+            ) WITHOUT ROWID''')
+c.execute('CREATE INDEX IF NOT EXISTS idx_game_aliases_game ON game_aliases(game_id)')
+c.execute('''CREATE TRIGGER IF NOT EXISTS trg_games_aliases_del AFTER DELETE ON games
+             BEGIN
+                 DELETE FROM game_aliases WHERE game_id = OLD.id;
+             END''')
+
+SQL_PUT_GAME_KEY = '''
+    INSERT INTO game_aliases (guild_id, alias_key, game_id, alias, kind) VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(guild_id, alias_key) DO UPDATE SET game_id = excluded.game_id, alias = excluded.alias, kind = excluded.kind
+    WHERE (excluded.kind = 'name' AND game_aliases.kind <> 'name')
+       OR (excluded.kind = 'alias' AND game_aliases.kind = 'abbrev')
+'''
+
+def _index_game_names(db: sqlite3.Connection, games) -> None:
+    """Writes the name and abbreviation keys for (guild_id, game_id, game_name) rows."""
+    rows = []
+    for guild_id, game_id, name in games:
+        rows.append((guild_id, game_key(name), game_id, name, "name"))
+        rows.extend((guild_id, key, game_id, name, "abbrev") for key in _game_abbreviations(name))
+    db.executemany(SQL_PUT_GAME_KEY, [row for row in rows if row[1]])
+
+# Games written without keys (before this table existed, or by datagen / by hand)
+_index_game_names(conn, conn.execute(
+    '''SELECT guild_id, id, game_name FROM games g
+       WHERE game_name IS NOT NULL
+         AND NOT EXISTS (SELECT 1 FROM game_aliases a WHERE a.game_id = g.id AND a.kind = 'name')'''
+))
+def _index_subtitles(db: sqlite3.Connection) -> None:
+    """Indexes games whose subtitle has no key yet (indexed before subtitles got one)."""
+    _index_game_names(db, [
+        (guild_id, game_id, name) for guild_id, game_id, name in db.execute(
+            """SELECT guild_id, id, game_name FROM games
+               WHERE game_name LIKE '%: %' OR game_name LIKE '%- %' OR game_name LIKE '%– %' OR game_name LIKE '%— %'"""
+        ).fetchall()
+        if _game_subtitle(name) and not db.execute(
+            "SELECT 1 FROM game_aliases WHERE guild_id = ? AND alias_key = ?", (guild_id, game_key(_game_subtitle(name)))
+        ).fetchone()
+    ])
+
+_index_subtitles(conn)
+
+# /findhelper availability index: helpers.status mirrors users.status (kept by the
+# triggers below) so one index on (game_id, status, platform) finds a game's
+# available helpers without touching anyone who is red.
+c.execute("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_users_status'")
+if not c.fetchone():
+    c.execute("UPDATE helpers SET status = IFNULL((SELECT status FROM users WHERE id = helpers.user_id), 'green')")
+c.execute('''CREATE TRIGGER IF NOT EXISTS trg_users_status AFTER UPDATE OF status ON users
+             BEGIN
+                 UPDATE helpers SET status = NEW.status WHERE user_id = NEW.id AND status <> NEW.status;
+             END''')
+c.execute('''CREATE TRIGGER IF NOT EXISTS trg_helpers_status AFTER INSERT ON helpers
+             BEGIN
+                 UPDATE helpers SET status = (SELECT status FROM users WHERE id = NEW.user_id)
+                 WHERE id = NEW.id AND EXISTS (SELECT 1 FROM users WHERE id = NEW.user_id AND status <> NEW.status);
+             END''')
+c.execute('CREATE INDEX IF NOT EXISTS idx_helpers_available ON helpers(game_id, status, platform, user_id)')
+
+# Per-game version for showgame_cache: bumped by triggers whenever anything /showgame
+# displays changes (the game's own fields, its helpers, their names or status), by
+# whichever code path or process writes it. Status reaches helpers via trg_users_status.
+c.execute("PRAGMA table_info(games)")
+if 'version' not in [col[1] for col in c.fetchall()]:
+    c.execute("ALTER TABLE games ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+c.execute('''CREATE TRIGGER IF NOT EXISTS trg_games_version AFTER UPDATE OF game_name, description, guide_url ON games
+             BEGIN
+                 UPDATE games SET version = version + 1 WHERE id = NEW.id;
+             END''')
+c.execute('''CREATE TRIGGER IF NOT EXISTS trg_helpers_version_ins AFTER INSERT ON helpers
+             BEGIN
+                 UPDATE games SET version = version + 1 WHERE id = NEW.game_id;
+             END''')
+c.execute('''CREATE TRIGGER IF NOT EXISTS trg_helpers_version_del AFTER DELETE ON helpers
+             BEGIN
+                 UPDATE games SET version = version + 1 WHERE id = OLD.game_id;
+             END''')
+c.execute('''CREATE TRIGGER IF NOT EXISTS trg_helpers_version_upd AFTER UPDATE OF game_id, user_id, status ON helpers
+             BEGIN
+                 UPDATE games SET version = version + 1 WHERE id IN (OLD.game_id, NEW.game_id);
+             END''')
+c.execute('''CREATE TRIGGER IF NOT EXISTS trg_users_version AFTER UPDATE OF user_name ON users
+             WHEN OLD.user_name IS NOT NEW.user_name
+             BEGIN
+                 UPDATE games SET version = version + 1 WHERE id IN (SELECT game_id FROM helpers WHERE user_id = NEW.id);
+             END''')
+
+# Per-guild version for leaderboard_cache, bumped by triggers on the thanks a
+# leaderboard counts and the names it shows. Commits that touch neither (usage
+# rows, helpers, games) leave cached leaderboard pages valid.
+c.execute('''CREATE TABLE IF NOT EXISTS thanks_versions (
+                guild_id INTEGER PRIMARY KEY,
+                version INTEGER NOT NULL
+            )''')
+c.execute('CREATE INDEX IF NOT EXISTS idx_thanks_totals_user ON thanks_totals(user_id)')
+for name, event, guilds in [
+    ("ins", "INSERT", ["NEW.guild_id"]),
+    ("del", "DELETE", ["OLD.guild_id"]),
+    ("upd", "UPDATE OF guild_id, thanked_user_id, timestamp", ["OLD.guild_id", "NEW.guild_id"]),
+]:
+    c.execute(f'''CREATE TRIGGER IF NOT EXISTS trg_thanks_versions_{name} AFTER {event} ON thanks
+                  BEGIN
+                      INSERT INTO thanks_versions (guild_id, version) VALUES {", ".join(f"({g}, 1)" for g in guilds)}
+                      ON CONFLICT(guild_id) DO UPDATE SET version = version + 1;
+                  END''')
+c.execute('''CREATE TRIGGER IF NOT EXISTS trg_users_thanks_version AFTER UPDATE OF user_name ON users
+             WHEN OLD.user_name IS NOT NEW.user_name
+             BEGIN
+                 UPDATE thanks_versions SET version = version + 1
+                 WHERE guild_id IN (SELECT guild_id FROM thanks_totals WHERE user_id = NEW.id);
+             END''')
+
+# Recent thanks per helper, refreshed by helper_score_task rather than counted per /findhelper call
+c.execute('''CREATE TABLE IF NOT EXISTS helper_scores (
+                guild_id INTEGER NOT NULL,
+                user_id TEXT NOT NULL,
+                recent_thanks INTEGER NOT NULL,
+                PRIMARY KEY (guild_id, user_id)
+            ) WITHOUT ROWID''')
+
+# Daily thanks rollups for /thankstrend, filled incrementally by rollup_task. A
+# year of a guild's trend is at most 365 rows of thanks_daily, whatever the
+# thanks volume. rollup_state holds the highest thanks.id already rolled up.
+c.execute('''CREATE TABLE IF NOT EXISTS thanks_daily (
+                guild_id INTEGER NOT NULL,
+                day TEXT NOT NULL,
+                thanks INTEGER NOT NULL,
+                PRIMARY KEY (guild_id, day)
+            ) WITHOUT ROWID''')
+c.execute('''CREATE TABLE IF NOT EXISTS thanks_daily_users (
+                guild_id INTEGER NOT NULL,
+                day TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                thanks INTEGER NOT NULL,
+                PRIMARY KEY (guild_id, day, user_id)
+            ) WITHOUT ROWID''')
+c.execute('CREATE INDEX IF NOT EXISTS idx_thanks_daily_users_user ON thanks_daily_users(guild_id, user_id, day)')
+# Games are kept by id, so a rename or merge keeps one history; a name that matches
+# no game is kept as typed under game_id 0.
+c.execute("PRAGMA table_info(thanks_daily_games)")
+columns = [col[1] for col in c.fetchall()]
+rebuild_thanks_rollups = bool(columns) and 'game_id' not in columns
+if rebuild_thanks_rollups:
+    c.execute("DROP TABLE thanks_daily_games")   # keyed by name; rebuilt from thanks below
+c.execute('''CREATE TABLE IF NOT EXISTS thanks_daily_games (
+                guild_id INTEGER NOT NULL,
+                day TEXT NOT NULL,
+                game_id INTEGER NOT NULL,
+                game TEXT NOT NULL,         -- '' unless game_id is 0
+                thanks INTEGER NOT NULL,
+                PRIMARY KEY (guild_id, day, game_id, game)
+            ) WITHOUT ROWID''')
+c.execute('CREATE INDEX IF NOT EXISTS idx_thanks_daily_games_game ON thanks_daily_games(guild_id, game_id, game, day)')
+c.execute('''CREATE TABLE IF NOT EXISTS rollup_state (
+                name TEXT PRIMARY KEY,
+                last_id INTEGER NOT NULL
+            )''')
+if rebuild_thanks_rollups:
+    # All three tables are filled by the same pass, so they start over together
+    c.execute("DELETE FROM thanks_daily")
+    c.execute("DELETE FROM thanks_daily_users")
+    c.execute("DELETE FROM rollup_state WHERE name = 'thanks'")
+# A removed game's thanks stay in the trends under its last name
+c.execute('''CREATE TRIGGER IF NOT EXISTS trg_games_daily_del AFTER DELETE ON games
+             BEGIN
+                 INSERT INTO thanks_daily_games (guild_id, day, game_id, game, thanks)
+                 SELECT guild_id, day, 0, OLD.game_name, thanks FROM thanks_daily_games WHERE game_id = OLD.id
+                 ON CONFLICT(guild_id, day, game_id, game) DO UPDATE SET thanks = thanks + excluded.thanks;
+                 DELETE FROM thanks_daily_games WHERE game_id = OLD.id;
+             END''')
+
+# Command usage: one raw row per invocation (written in batches by usage_log),
+# rolled up per hour by rollup_task and pruned once rolled up and old enough.
+# Separate from logs, which is the audit trail and is never pruned.
+c.execute('''CREATE TABLE IF NOT EXISTS command_usage (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                guild_id INTEGER NOT NULL,
+                command TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                duration_ms REAL NOT NULL,
+                ok INTEGER NOT NULL,
+                ran_at TEXT NOT NULL
+            )''')
+c.execute('''CREATE TABLE IF NOT EXISTS command_usage_hourly (
+                guild_id INTEGER NOT NULL,
+                hour TEXT NOT NULL,
+                command TEXT NOT NULL,
+                calls INTEGER NOT NULL,
+                errors INTEGER NOT NULL,
+                total_ms REAL NOT NULL,
+                max_ms REAL NOT NULL,
+                PRIMARY KEY (guild_id, hour, command)
+            ) WITHOUT ROWID''')
+
+# Full-text index over what people were thanked for (/searchfeedback). External content:
+# the text lives only in thanks, the triggers keep the index in step. guild_id is indexed
+# as a token so a search intersects with the guild's postings instead of filtering after.
+fts_is_new = not c.execute("SELECT 1 FROM sqlite_master WHERE name = 'thanks_fts'").fetchone()
+c.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS thanks_fts USING fts5(
+                guild_id, game, message,
+                content='thanks', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )''')
+c.execute('''CREATE TRIGGER IF NOT EXISTS trg_thanks_fts_ins AFTER INSERT ON thanks
+             BEGIN
+                 INSERT INTO thanks_fts (rowid, guild_id, game, message) VALUES (new.id, new.guild_id, new.game, new.message);
+             END''')
+c.execute('''CREATE TRIGGER IF NOT EXISTS trg_thanks_fts_del AFTER DELETE ON thanks
+             BEGIN
+                 INSERT INTO thanks_fts (thanks_fts, rowid, guild_id, game, message)
+                 VALUES ('delete', old.id, old.guild_id, old.game, old.message);
+             END''')
+c.execute('''CREATE TRIGGER IF NOT EXISTS trg_thanks_fts_upd AFTER UPDATE OF guild_id, game, message ON thanks
+             BEGIN
+                 INSERT INTO thanks_fts (thanks_fts, rowid, guild_id, game, message)
+                 VALUES ('delete', old.id, old.guild_id, old.game, old.message);
+                 INSERT INTO thanks_fts (rowid, guild_id, game, message) VALUES (new.id, new.guild_id, new.game, new.message);
+             END''')
+if fts_is_new and c.execute("SELECT 1 FROM thanks LIMIT 1").fetchone():
+    print("Building the feedback search index...")
+    c.execute("INSERT INTO thanks_fts (thanks_fts) VALUES ('rebuild')")
+# One row per distinct search, so the paginator's buttons can carry a numeric id.
+# Searches not repeated for FEEDBACK_SEARCH_KEEP_DAYS are pruned by rollup_task.
+c.execute('''CREATE TABLE IF NOT EXISTS feedback_searches (
+                id INTEGER PRIMARY KEY,
+                guild_id INTEGER NOT NULL,
+                query TEXT NOT NULL,
+                match_expr TEXT NOT NULL,
+                searched_at TEXT,
+                UNIQUE (guild_id, query)
+            )''')
+c.execute("PRAGMA table_info(feedback_searches)")
+if 'searched_at' not in [col[1] for col in c.fetchall()]:
+    c.execute("ALTER TABLE feedback_searches ADD COLUMN searched_at TEXT")
+    c.execute("UPDATE feedback_searches SET searched_at = datetime('now')")
 
 conn.commit()
 
+def _resolve_game(guild_id: int, name: str, db: sqlite3.Connection = conn,
+                  with_version: bool = False) -> tuple | None:
+    """Finds a guild's game by name, case-insensitively, then by lookup key (see game_key).
+
+    Returns (game id, canonical name) or None; with_version appends games.version,
+    so cache lookups keyed on it need no second query. Both branches are primary-key /
+    index lookups; UNION ALL with LIMIT 1 skips the second when the first hits.
+    """
+    version = ", version" if with_version else ""
+    return db.execute(
+        f'''SELECT id, game_name{version} FROM games WHERE guild_id = :guild_id AND game_name = :name COLLATE NOCASE
+           UNION ALL
+           SELECT g.id, g.game_name{version} FROM game_aliases a JOIN games g ON g.id = a.game_id
+           WHERE a.guild_id = :guild_id AND a.alias_key = :key
+           LIMIT 1''',
+        {"guild_id": guild_id, "name": name, "key": game_key(name)}
+    ).fetchone()
+
+# Single-statement helper registration for a resolved game: skips users already
+# listed for it and relies on idx_helpers_unique for concurrent clicks.
+# Returns a row only when something was inserted.
+SQL_REGISTER_HELPER = '''
+    INSERT INTO helpers (guild_id, user_id, user_name, game_id)
+    SELECT g.guild_id, :user_id, :user_name, g.id FROM games g
+    WHERE g.id = :game_id
+      AND NOT EXISTS (SELECT 1 FROM helpers h WHERE h.user_id = :user_id AND h.game_id = g.id)
+    ON CONFLICT DO NOTHING
+    RETURNING id
+'''
+SQL_REGISTER_PLATFORM = '''
+    INSERT INTO helpers (guild_id, user_id, user_name, game_id, platform)
+    SELECT g.guild_id, :user_id, :user_name, g.id, :platform FROM games g
+    WHERE g.id = :game_id
+    ON CONFLICT DO NOTHING
+    RETURNING id
+'''
+# Batch versions for /addmemany and /removememany: :game_ids is a JSON array, so
+# a whole list is one statement (and one transaction), and RETURNING tells which
+# games actually changed.
+SQL_REGISTER_HELPERS = '''
+    INSERT INTO helpers (guild_id, user_id, user_name, game_id)
+    SELECT g.guild_id, :user_id, :user_name, g.id FROM json_each(:game_ids) j JOIN games g ON g.id = j.value
+    WHERE g.guild_id = :guild_id
+      AND NOT EXISTS (SELECT 1 FROM helpers h WHERE h.user_id = :user_id AND h.game_id = g.id)
+    ON CONFLICT DO NOTHING
+    RETURNING game_id
+'''
+SQL_UNREGISTER_HELPERS = '''
+    DELETE FROM helpers
+    WHERE user_id = :user_id AND guild_id = :guild_id AND game_id IN (SELECT value FROM json_each(:game_ids))
+    RETURNING game_id
+'''
+
+def _adopt_unassigned_rows(guild_id: int) -> int:
+    """Moves rows from before per-guild partitioning (guild_id 0) into guild_id."""
+    moved = 0
+    # A game the guild has since re-added under the same name stays behind (OR IGNORE)
+    moved += conn.execute("UPDATE OR IGNORE games SET guild_id = ? WHERE guild_id = 0", (guild_id,)).rowcount
+    moved += conn.execute(
+        "UPDATE helpers SET guild_id = (SELECT guild_id FROM games WHERE id = helpers.game_id) WHERE guild_id = 0"
+    ).rowcount
+    # Lookup keys the guild already has win (OR IGNORE); the leftovers are re-created at the next start
+    conn.execute(
+        "UPDATE OR IGNORE game_aliases SET guild_id = (SELECT guild_id FROM games WHERE id = game_aliases.game_id) WHERE guild_id = 0"
+    )
+    thanks_moved = conn.execute("UPDATE thanks SET guild_id = ? WHERE guild_id = 0", (guild_id,)).rowcount
+    moved += thanks_moved + conn.execute("UPDATE logs SET guild_id = ? WHERE guild_id = 0", (guild_id,)).rowcount
+    if thanks_moved:
+        # Thanks rollups already counted those thanks under guild 0; rebuild them from scratch.
+        # Only the thanks mark goes: the usage rollup is unaffected and must not run twice.
+        for table in ("thanks_daily", "thanks_daily_users", "thanks_daily_games"):
+            conn.execute(f"DELETE FROM {table}")
+        conn.execute("DELETE FROM rollup_state WHERE name = 'thanks'")
+    conn.commit()
+    return moved
+
+# ---------- Cache invalidation across connections and shard processes ----------
+def db_generation() -> tuple[int, int]:
+    """Changes whenever anything commits to the database.
+
+    PRAGMA data_version moves when another connection commits (another shard
+    process, an import worker thread); total_changes covers this connection's
+    own writes. Both are cheap enough to check on every cache read.
+    """
+    return conn.execute("PRAGMA data_version").fetchone()[0], conn.total_changes
+
+
+class GenerationCache:
+    """Small LRU whose entries go stale as soon as their version changes.
+
+    By default the version is db_generation(), so any commit invalidates every
+    entry. `version(key)` can be something finer, e.g. a row's own counter, so
+    writes only invalidate the entries they affect.
+    """
+
+    def __init__(self, size: int, ttl: float, version=None):
+        self.size = size
+        self.ttl = ttl              # also bounds staleness for time-based views like "last 30 days"
+        self.version = version or (lambda key: db_generation())
+        self.items: dict = {}       # key -> (version, stored_at, value), oldest first
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0              # misses on an entry whose version had moved on
+        self.evictions = 0
+
+    def get(self, key, version=None):
+        """`version` is the key's current version, if the caller already read it."""
+        entry = self.items.pop(key, None)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry[0] != (self.version(key) if version is None else version) or time.monotonic() - entry[1] > self.ttl:
+            self.misses += 1
+            self.stale += 1
+            return None
+        self.items[key] = entry     # re-insert as most recently used
+        self.hits += 1
+        return entry[2]
+
+    def put(self, key, value, version=None):
+        """`version` read before the value was built, if the caller has it (no window for a missed write)."""
+        self.items[key] = (self.version(key) if version is None else version, time.monotonic(), value)
+        while len(self.items) > self.size:
+            del self.items[next(iter(self.items))]
+            self.evictions += 1
+
+    def stats(self) -> str:
+        lookups = self.hits + self.misses
+        rate = f"{self.hits / lookups:.0%}" if lookups else "n/a"
+        return (f"{rate} hits ({self.hits}/{lookups}), {self.stale} invalidated, "
+                f"{self.evictions} evicted, {len(self.items)}/{self.size} entries")
+
+
+class TokenBuckets:
+    """Token buckets keyed by id: bursts of up to `capacity`, refilled at capacity / `per` seconds.
+
+    Kept in memory only. Past `size` keys the least recently used bucket is dropped;
+    it has been idle the longest, so it has almost always refilled anyway.
+    """
+
+    def __init__(self, capacity: int, per: float, size: int = 10_000):
+        self.capacity = capacity
+        self.rate = capacity / per
+        self.size = size
+        self.buckets: dict = {}     # key -> (tokens, updated_at), least recently used first
+
+    def _tokens(self, key, now: float) -> float:
+        tokens, updated_at = self.buckets.get(key, (self.capacity, now))
+        return min(self.capacity, tokens + (now - updated_at) * self.rate)
+
+    def wait(self, key, now: float) -> float:
+        """Seconds until `key` has a token (0 if it has one now)."""
+        tokens = self._tokens(key, now)
+        return 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+
+    def take(self, key, now: float):
+        tokens = self._tokens(key, now) - 1
+        self.buckets.pop(key, None)
+        self.buckets[key] = (tokens, now)
+        while len(self.buckets) > self.size:
+            del self.buckets[next(iter(self.buckets))]
+
+
+def _parse_rate(value: str) -> tuple[int, float]:
+    """'10/60' -> 10 writes per 60 seconds."""
+    count, _, seconds = value.partition("/")
+    return int(count), float(seconds or 60)
+
+
+# Write budgets for the commands that insert rows (see write_limited), as "count/seconds"
+user_write_buckets = TokenBuckets(*_parse_rate(os.getenv("WRITE_LIMIT_USER", "10/60")))
+guild_write_buckets = TokenBuckets(*_parse_rate(os.getenv("WRITE_LIMIT_GUILD", "300/60")), size=1_000)
+
+
+def write_limited(func):
+    """Throttles a write handler per user and per guild.
+
+    Works on slash command callbacks and on the shared helpers behind buttons and
+    modals, as long as the interaction is the first argument. A rejected request
+    gets an ephemeral reply and never reaches the database.
+    """
+    @functools.wraps(func)
+    async def wrapper(interaction: discord.Interaction, *args, **kwargs):
+        now = time.monotonic()
+        wait = max(user_write_buckets.wait(interaction.user.id, now),
+                   guild_write_buckets.wait(interaction.guild_id, now))
+        if wait:
+            await interaction.response.send_message(
+                f"You're doing that too fast. Try again in {math.ceil(wait)}s.", ephemeral=True
+            )
+            return
+        user_write_buckets.take(interaction.user.id, now)
+        guild_write_buckets.take(interaction.guild_id, now)
+        return await func(interaction, *args, **kwargs)
+    return wrapper
+
+
 # Sync slash commands with Discord
 @bot.event
 async def on_ready():
     # Register the bot's slash commands globally (across all servers) or for specific guilds
-    await bot.tree.sync()  # Global sync
-    print(f"Logged in as {bot.user}!")
+    if IS_PRIMARY:
+        await bot.tree.sync()  # Global sync
+        # Data from the single-server days belongs to the home guild; with one guild that's unambiguous
+        # (a shard process only sees its own shards' guilds, so sharded runs need HOME_GUILD_ID)
+        home = HOME_GUILD_ID or (bot.guilds[0].id if len(bot.guilds) == 1 and not SHARD_COUNT else 0)
+        if home:
+            moved = _adopt_unassigned_rows(home)
+            if moved:
+                print(f"Assigned {moved} existing row(s) to guild {home}.")
+        elif conn.execute("SELECT 1 FROM games WHERE guild_id = 0 LIMIT 1").fetchone():
+            print("Unassigned rows from before per-guild data exist; set HOME_GUILD_ID to assign them.")
+        if not backup_task.is_running():
+            backup_task.start()
+        if not helper_score_task.is_running():
+            helper_score_task.start()
+        if not rollup_task.is_running():
+            rollup_task.start()
+        if not maintenance_task.is_running():
+            maintenance_task.start()
+    # Every process announces the milestones from its own shards' thanks
+    if not milestone_task.is_running():
+        _queue_pending_milestones()
+        milestone_task.start()
+    loop_watchdog.start()
+    shards = f" (shards {', '.join(map(str, sorted(bot.shards)))} of {bot.shard_count})" if SHARD_COUNT else ""
+    print(f"Logged in as {bot.user}{shards}!")
 
 async def _game_autocomplete(interaction: discord.Interaction, current: str):
     # Case-insensitive partial match; return up to 25
     rows = conn.execute(
-        "SELECT game_name FROM games WHERE game_name LIKE ? ORDER BY game_name COLLATE NOCASE LIMIT 25",
-        (f"%{current}%",)
+        "SELECT game_name FROM games WHERE guild_id = ? AND game_name LIKE ? ORDER BY game_name COLLATE NOCASE LIMIT 25",
+        (interaction.guild_id, f"%{current}%")
     ).fetchall()
+    usage_log.record(interaction, ok=True, prefix="autocomplete:")
     return [app_commands.Choice(name=r[0], value=r[0]) for r in rows]
 
 # ---------- Simple paginator (Prev/Next) ----------
-class PaginatorView(discord.ui.View):
-    def __init__(self, pages: list[str], title: str):
-        super().__init__(timeout=300)
-        self.pages = pages or ["*(no results)*"]
-        self.title = title
-        self.index = 0
-        self.message = None
-
-        self.prev_btn = self.PrevButton(self)
-        self.next_btn = self.NextButton(self)
-        self.add_item(self.prev_btn)
-        self.add_item(self.next_btn)
-
-    def _footer(self) -> str:
-        total = len(self.pages)
-        pos = self.index + 1
-        edge = " • START" if self.index == 0 else (" • END" if self.index == total - 1 else "")
-        return f"\n\n_Page {pos}/{total}{edge}_"
-
-    def _content(self) -> str:
-        return f"**{self.title}**\n{self.pages[self.index]}{self._footer()}"
-
-    def _sync_buttons(self):
-        total = len(self.pages)
-        self.prev_btn.disabled = (self.index == 0 or total <= 1)
-        self.next_btn.disabled = (self.index >= total - 1 or total <= 1)
-
-    async def send(self, interaction: discord.Interaction, *, ephemeral: bool = False):
-        self._sync_buttons()  # set disabled states before first render
-        await interaction.response.send_message(self._content(), view=self, ephemeral=ephemeral)
-        self.message = await interaction.original_response()
-
-    async def update(self, interaction: discord.Interaction):
-        self._sync_buttons()
-        if interaction.response.is_done():
-            await interaction.edit_original_response(content=self._content(), view=self)
-        else:
-            await interaction.response.edit_message(content=self._content(), view=self)
-
-    class PrevButton(discord.ui.Button):
-        def __init__(self, parent: "PaginatorView"):
-            super().__init__(label="Prev", style=discord.ButtonStyle.secondary)
-            self.parent = parent
+# Pages are never held in memory: a PagedQuery knows how to count and fetch one
+# page, and the buttons carry (query key, scope, page) in their custom_id. The
+# buttons are persistent DynamicItems, so they keep working after a restart.
+class PagedQuery:
+    def __init__(self, key: str, title: str, count_sql: str, page_sql: str, line, per_page: int = 10,
+                 name_sql: str = "SELECT user_name FROM users WHERE id = ?"):
+        self.key = key
+        self.title = title          # may use {name} (looked up from the scope by name_sql)
+        self.count_sql = count_sql  # named params: :guild, :scope
+        self.page_sql = page_sql    # named params: :guild, :scope, :limit, :offset
+        self.line = line            # row -> display line
+        self.per_page = per_page
+        self.name_sql = name_sql
+
+    def count(self, guild_id: int, scope: str = "") -> int:
+        return int(conn.execute(self.count_sql, {"guild": guild_id, "scope": scope}).fetchone()[0])
+
+    def render(self, guild_id: int, scope: str, page: int) -> tuple[str, "PaginatorView"]:
+        total = max(1, math.ceil(self.count(guild_id, scope) / self.per_page))
+        page = max(0, min(page, total - 1))   # data may have shrunk since the buttons were sent
+        rows = conn.execute(
+            self.page_sql,
+            {"guild": guild_id, "scope": scope, "limit": self.per_page, "offset": page * self.per_page}
+        ).fetchall()
+        body = "\n".join(self.line(r) for r in rows) or "*(no results)*"
+
+        title = self.title
+        if "{name}" in title:
+            row = conn.execute(self.name_sql, (scope,)).fetchone()
+            title = title.format(name=row[0] if row else "this user")
+
+        edge = " • START" if page == 0 else (" • END" if page == total - 1 else "")
+        content = f"**{title}**\n{body}\n\n_Page {page + 1}/{total}{edge}_"
+        return content, PaginatorView(self, scope, page, total)
+
+
+PAGED_QUERIES: dict[str, PagedQuery] = {}
+
+def _register_paged(query: PagedQuery) -> PagedQuery:
+    PAGED_QUERIES[query.key] = query
+    return query
 
-        async def callback(self, interaction: discord.Interaction):
-            if self.parent.index <= 0:
-                # Gracefully inform instead of throwing an interaction error.
-                await interaction.response.send_message("You're already at the **start** of the list.", ephemeral=True)
-                return
-            self.parent.index -= 1
-            await self.parent.update(interaction)
-
-    class NextButton(discord.ui.Button):
-        def __init__(self, parent: "PaginatorView"):
-            super().__init__(label="Next", style=discord.ButtonStyle.secondary)
-            self.parent = parent
 
-        async def callback(self, interaction: discord.Interaction):
-            if self.parent.index >= len(self.parent.pages) - 1:
-                await interaction.response.send_message("You're already at the **end** of the list.", ephemeral=True)
-                return
-            self.parent.index += 1
-            await self.parent.update(interaction)
+class PaginatorView(discord.ui.View):
+    def __init__(self, query: PagedQuery, scope: str, page: int, total: int):
+        super().__init__(timeout=None)
+        self.add_item(PageButton(query.key, scope, max(page - 1, 0), "p", disabled=(page <= 0)))
+        self.add_item(PageButton(query.key, scope, min(page + 1, total - 1), "n", disabled=(page >= total - 1)))
+
+
+class PageButton(discord.ui.DynamicItem[discord.ui.Button],
+                 template=r"pg:(?P<key>[a-z]+):(?P<scope>\d*):(?P<page>\d+):(?P<dir>[pn])"):
+    def __init__(self, key: str, scope: str, page: int, direction: str, disabled: bool = False):
+        super().__init__(discord.ui.Button(
+            label="Prev" if direction == "p" else "Next",
+            style=discord.ButtonStyle.secondary,
+            custom_id=f"pg:{key}:{scope}:{page}:{direction}",
+            disabled=disabled,
+        ))
+        self.key = key
+        self.scope = scope
+        self.page = page
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(match["key"], match["scope"], int(match["page"]), match["dir"])
+
+    async def callback(self, interaction: discord.Interaction):
+        query = PAGED_QUERIES.get(self.key)
+        if query is None:
+            await interaction.response.send_message("This list is no longer available.", ephemeral=True)
+            return
+        content, view = query.render(interaction.guild_id, self.scope, self.page)
+        await interaction.response.edit_message(content=content, view=view)
 
 
-def _make_pages(lines: list[str], per_page: int = 10) -> list[str]:
-    pages = []
-    for i in range(0, len(lines), per_page):
-        page = "\n".join(lines[i:i+per_page])
-        pages.append(page if page.strip() else "*(empty)*")
-    return pages
+async def send_paged(interaction: discord.Interaction, key: str, scope: str = "", *, ephemeral: bool = False):
+    content, view = PAGED_QUERIES[key].render(interaction.guild_id, scope, 0)
+    await interaction.response.send_message(content, view=view, ephemeral=ephemeral)
 
 
 # ---------- Confirm delete game ----------
@@ -210,29 +974,31 @@ class ConfirmForgetView(discord.ui.View):
 
 # Add a game
 @bot.tree.command(name="addgame", description="Adds a new game with optional description and guide URL.")
+@write_limited
 async def add_game(interaction: discord.Interaction, game_name: str, description: str = None, guide_url: str = None):
     try:
         # 1) Insert game
         c.execute(
-            "INSERT INTO games (game_name, description, guide_url) VALUES (?, ?, ?)",
-            (game_name, description, guide_url)
+            "INSERT INTO games (guild_id, game_name, description, guide_url) VALUES (?, ?, ?, ?)",
+            (interaction.guild_id, game_name, description, guide_url)
         )
         game_id = c.lastrowid            # <-- Get it right here
+        _index_game_names(conn, [(interaction.guild_id, game_id, game_name)])
         conn.commit()
 
         # 2) Auto-add creator as helper (uses the correct game_id)
         user_id = str(interaction.user.id)
         user_name = str(interaction.user)
         c.execute(
-            "INSERT INTO helpers (user_id, user_name, game_id) VALUES (?, ?, ?)",
-            (user_id, user_name, game_id)
+            "INSERT INTO helpers (guild_id, user_id, user_name, game_id) VALUES (?, ?, ?, ?) ON CONFLICT DO NOTHING",
+            (interaction.guild_id, user_id, user_name, game_id)
         )
         conn.commit()
 
         # 3) Log last (so lastrowid changes don’t matter)
         c.execute(
-            "INSERT INTO logs (user, command, game_name) VALUES (?, ?, ?)",
-            (str(interaction.user), "addgame", game_name)
+            "INSERT INTO logs (guild_id, user, command, game_name) VALUES (?, ?, ?, ?)",
+            (interaction.guild_id, str(interaction.user), "addgame", game_name)
         )
         conn.commit()
 
@@ -255,14 +1021,16 @@ class DescriptionChoiceView(View):
 
     @discord.ui.button(label="Replace", style=ButtonStyle.primary)
     async def replace(self, interaction: discord.Interaction, button: Button):
-        c.execute("UPDATE games SET description = ? WHERE game_name = ?", (self.new_description, self.game_name))
+        c.execute("UPDATE games SET description = ? WHERE guild_id = ? AND game_name = ?",
+                  (self.new_description, interaction.guild_id, self.game_name))
         conn.commit()
         await interaction.response.edit_message(content=f"✅ Description for '{self.game_name}' replaced.", view=None)
 
     @discord.ui.button(label="Append", style=ButtonStyle.success)
     async def append(self, interaction: discord.Interaction, button: Button):
         combined = f"{self.existing_description}; {interaction.user.name}: {self.new_description}"
-        c.execute("UPDATE games SET description = ? WHERE game_name = ?", (combined, self.game_name))
+        c.execute("UPDATE games SET description = ? WHERE guild_id = ? AND game_name = ?",
+                  (combined, interaction.guild_id, self.game_name))
         conn.commit()
         await interaction.response.edit_message(content=f"✅ Description for '{self.game_name}' appended.", view=None)
 
@@ -273,13 +1041,13 @@ class DescriptionChoiceView(View):
 
 @bot.tree.command(name="updatedescription", description="Updates the description for an existing game.")
 async def update_description(interaction: discord.Interaction, game_name: str, description: str):
-    c.execute("SELECT description FROM games WHERE game_name = ?", (game_name,))
-    result = c.fetchone()
-    if not result:
+    game = _resolve_game(interaction.guild_id, game_name)
+    if not game:
         await interaction.response.send_message(f"Game '{game_name}' not found.")
         return
 
-    existing_description = result[0]
+    game_id, game_name = game
+    existing_description = conn.execute("SELECT description FROM games WHERE id = ?", (game_id,)).fetchone()[0]
     if existing_description:
         view = DescriptionChoiceView(game_name, description, existing_description)
         await interaction.response.send_message(
@@ -287,7 +1055,8 @@ async def update_description(interaction: discord.Interaction, game_name: str, d
             view=view
         )
     else:
-        c.execute("UPDATE games SET description = ? WHERE game_name = ?", (description, game_name))
+        c.execute("UPDATE games SET description = ? WHERE guild_id = ? AND game_name = ?",
+                  (description, interaction.guild_id, game_name))
         conn.commit()
         await interaction.response.send_message(f"Description for '{game_name}' has been updated.")
 
@@ -295,10 +1064,11 @@ async def update_description(interaction: discord.Interaction, game_name: str, d
 # Update game URL
 @bot.tree.command(name="updateurl", description="Updates or adds a guide URL for a game.")
 async def update_url(interaction: discord.Interaction, game_name: str, guide_url: str):
-    c.execute("UPDATE games SET guide_url = ? WHERE game_name = ?", (guide_url, game_name))
-    if c.rowcount > 0:
+    game = _resolve_game(interaction.guild_id, game_name)
+    if game:
+        c.execute("UPDATE games SET guide_url = ? WHERE id = ?", (guide_url, game[0]))
         conn.commit()
-        await interaction.response.send_message(f"Guide URL for '{game_name}' updated.")
+        await interaction.response.send_message(f"Guide URL for '{game[1]}' updated.")
     else:
         await interaction.response.send_message(f"Game '{game_name}' not found.")
 
@@ -309,11 +1079,8 @@ TIDE44_ID = 420996360699904000  # override user id
 @bot.tree.command(name="removegame", description="Remove a game if you are a helper for it (or Tide44).")
 @app_commands.autocomplete(game_name=_game_autocomplete)
 async def remove_game(interaction: discord.Interaction, game_name: str):
-    # Find game case-insensitively and fetch canonical name
-    game = conn.execute(
-        "SELECT id, game_name FROM games WHERE game_name = ? COLLATE NOCASE",
-        (game_name,)
-    ).fetchone()
+    # Find game case-insensitively (or by alias) and fetch canonical name
+    game = _resolve_game(interaction.guild_id, game_name)
 
     if not game:
         await interaction.response.send_message(f"Game '{game_name}' not found.")
@@ -366,10 +1133,20 @@ async def remove_game(interaction: discord.Interaction, game_name: str):
 # Rename a game
 @bot.tree.command(name="renamegame", description="Renames a game if there's an error or update needed.")
 async def rename_game(interaction: discord.Interaction, old_name: str, new_name: str):
-    c.execute("UPDATE games SET game_name = ? WHERE game_name = ?", (new_name, old_name))
-    if c.rowcount > 0:
+    game = _resolve_game(interaction.guild_id, old_name)
+    if game:
+        game_id, old_name = game
+        try:
+            c.execute("UPDATE games SET game_name = ? WHERE id = ?", (new_name, game_id))
+        except sqlite3.IntegrityError:
+            await interaction.response.send_message(f"Game '{new_name}' is already in the list.")
+            return
+        # The old name keeps working as an alias
+        c.execute("UPDATE game_aliases SET kind = 'alias' WHERE game_id = ? AND kind = 'name'", (game_id,))
+        _index_game_names(conn, [(interaction.guild_id, game_id, new_name)])
         conn.commit()
-        c.execute("INSERT INTO logs (user, command, game_name) VALUES (?, ?, ?)", (str(interaction.user), "renamegame", f"{old_name} -> {new_name}"))
+        c.execute("INSERT INTO logs (guild_id, user, command, game_name) VALUES (?, ?, ?, ?)",
+                  (interaction.guild_id, str(interaction.user), "renamegame", f"{old_name} -> {new_name}"))
         conn.commit()
         await interaction.response.send_message(f"Game '{old_name}' has been renamed to '{new_name}'.")
     else:
@@ -379,21 +1156,19 @@ async def rename_game(interaction: discord.Interaction, old_name: str, new_name:
 @bot.tree.command(name="addme", description="Register yourself as a helper for a specific game.")
 @app_commands.autocomplete(game_name=_game_autocomplete)
 async def add_me(interaction: discord.Interaction, game_name: str):
+    game = _resolve_game(interaction.guild_id, game_name)
+    if not game:
+        await interaction.response.send_message(f"Game '{game_name}' not found.")
+        return
+    game_id, game_name = game
     user_id = str(interaction.user.id)
     user_name = str(interaction.user)
-    c.execute("SELECT id FROM games WHERE game_name = ?", (game_name,))
-    game = c.fetchone()
-    if game:
-        game_id = game[0]
-        c.execute("SELECT * FROM helpers WHERE user_id = ? AND game_id = ?", (user_id, game_id))
-        if not c.fetchone():
-            c.execute("INSERT INTO helpers (user_id, user_name, game_id) VALUES (?, ?, ?)", (user_id, user_name, game_id))
-            conn.commit()
-            await interaction.response.send_message(f"{interaction.user.mention}, you are now a helper for '{game_name}'.")
-        else:
-            await interaction.response.send_message(f"{interaction.user.mention}, you're already listed as a helper for '{game_name}'.")
+    added = conn.execute(SQL_REGISTER_HELPER, {"user_id": user_id, "user_name": user_name, "game_id": game_id}).fetchone()
+    conn.commit()
+    if added:
+        await interaction.response.send_message(f"{interaction.user.mention}, you are now a helper for '{game_name}'.")
     else:
-        await interaction.response.send_message(f"Game '{game_name}' not found.")
+        await interaction.response.send_message(f"{interaction.user.mention}, you're already listed as a helper for '{game_name}'.")
     
 # Define the custom platform view with button callbacks
 class PlatformView(View):
@@ -414,22 +1189,23 @@ class PlatformView(View):
         await process_platform(interaction, self.game_name, "PlayStation")
 
 # Process the platform selection
+@write_limited
 async def process_platform(interaction: discord.Interaction, game_name: str, platform: str):
+    game = _resolve_game(interaction.guild_id, game_name)
+    if not game:
+        await interaction.response.send_message(f"Game `{game_name}` not found.", ephemeral=True)
+        return
+    game_id, game_name = game
     user_id = str(interaction.user.id)  # Correctly accesses the user from interaction
     user_name = str(interaction.user)
-    c.execute("SELECT id FROM games WHERE game_name = ?", (game_name,))
-    game = c.fetchone()
-    if game:
-        game_id = game[0]
-        c.execute("SELECT * FROM helpers WHERE user_id = ? AND game_id = ? AND platform = ?", (user_id, game_id, platform))
-        if not c.fetchone():
-            c.execute("INSERT INTO helpers (user_id, user_name, game_id, platform) VALUES (?, ?, ?, ?)", (user_id, user_name, game_id, platform))
-            conn.commit()
-            await interaction.response.send_message(f"{interaction.user.mention}, you have been added as a helper for `{game_name}` on `{platform}`.", ephemeral=True)
-        else:
-            await interaction.response.send_message(f"{interaction.user.mention}, you are already a helper for `{game_name}` on `{platform}`.", ephemeral=True)
+    added = conn.execute(SQL_REGISTER_PLATFORM, {
+        "user_id": user_id, "user_name": user_name, "game_id": game_id, "platform": platform,
+    }).fetchone()
+    conn.commit()
+    if added:
+        await interaction.response.send_message(f"{interaction.user.mention}, you have been added as a helper for `{game_name}` on `{platform}`.", ephemeral=True)
     else:
-        await interaction.response.send_message(f"Game `{game_name}` not found.", ephemeral=True)
+        await interaction.response.send_message(f"{interaction.user.mention}, you are already a helper for `{game_name}` on `{platform}`.", ephemeral=True)
 
 
 
@@ -438,157 +1214,266 @@ async def process_platform(interaction: discord.Interaction, game_name: str, pla
 @app_commands.autocomplete(game_name=_game_autocomplete)
 async def remove_me(interaction: discord.Interaction, game_name: str):
     user_id = str(interaction.user.id)
-    c.execute("SELECT id FROM games WHERE game_name = ?", (game_name,))
-    game = c.fetchone()
+    game = _resolve_game(interaction.guild_id, game_name)
     if game:
-        game_id = game[0]
+        game_id, game_name = game
         c.execute("DELETE FROM helpers WHERE user_id = ? AND game_id = ?", (user_id, game_id))
         conn.commit()
         await interaction.response.send_message(f"{interaction.user.mention}, you have been removed as a helper for '{game_name}'.")
     else:
         await interaction.response.send_message(f"Game '{game_name}' not found.")
 
+# ---------- Several games at once (/addmemany, /removememany) ----------
+# Either pick from a list of up to 25 games matching a search (Discord's select
+# menu limit) or paste a list into a modal. Every name is resolved like /addme's,
+# then the whole batch is written in one statement with a single summary reply.
+BATCH_SUMMARY_NAMES = 40   # names listed per line of the summary before "and N more"
+
+def _split_game_list(text: str) -> list[str]:
+    """One game per line (or separated by ';'); blanks and repeats are dropped.
+
+    Commas are left alone because game names contain them (Warhammer 40,000).
+    """
+    names, seen = [], set()
+    for name in re.split(r"[\n;]", text):
+        name = name.strip()
+        if name and name.casefold() not in seen:
+            seen.add(name.casefold())
+            names.append(name)
+    return names
+
+def _resolve_games(guild_id: int, names: list[str]) -> tuple[dict[int, str], list[str]]:
+    """Resolves each name; returns ({game id: canonical name}, names not found)."""
+    games, unknown = {}, []
+    for name in names:
+        game = _resolve_game(guild_id, name)
+        if game:
+            games.setdefault(game[0], game[1])
+        else:
+            unknown.append(name)
+    return games, unknown
+
+def _batch_summary_line(label: str, names: list[str]) -> str:
+    shown = ", ".join(f"'{n}'" for n in names[:BATCH_SUMMARY_NAMES])
+    if len(names) > BATCH_SUMMARY_NAMES:
+        shown += f" and {len(names) - BATCH_SUMMARY_NAMES} more"
+    return f"{label} ({len(names)}): {shown}"
+
+@write_limited
+async def _process_games_batch(interaction: discord.Interaction, mode: str, games: dict[int, str], unknown: list[str]):
+    """Adds or removes the user as a helper for every game in one transaction."""
+    changed = set()
+    if games:
+        sql = SQL_REGISTER_HELPERS if mode == "add" else SQL_UNREGISTER_HELPERS
+        changed = {r[0] for r in conn.execute(sql, {
+            "guild_id": interaction.guild_id, "user_id": str(interaction.user.id),
+            "user_name": str(interaction.user), "game_ids": json.dumps(list(games)),
+        })}
+        conn.commit()
+
+    done = [name for gid, name in games.items() if gid in changed]
+    unchanged = [name for gid, name in games.items() if gid not in changed]
+    labels = ("✅ Added", "☑️ Already listed") if mode == "add" else ("✅ Removed", "☑️ Weren't listed")
+    lines = [_batch_summary_line(label, names) for label, names in zip(labels, (done, unchanged)) if names]
+    if unknown:
+        lines.append(_batch_summary_line("❓ Not found", unknown))
+    if not lines:
+        lines.append("No game names given.")
+    message = "\n".join(lines)
+    if len(message) > 2000:
+        message = message[:1999] + "…"
+    await interaction.response.send_message(message, ephemeral=True)
+
+class BatchGamesModal(discord.ui.Modal):
+    games = discord.ui.TextInput(
+        label="Games (one per line)", style=discord.TextStyle.paragraph, max_length=4000,
+        placeholder="Black Ops 4\nbo3\nElden Ring"
+    )
+
+    def __init__(self, mode: str):
+        super().__init__(title="Add yourself to games" if mode == "add" else "Remove yourself from games")
+        self.mode = mode
+
+    async def on_submit(self, interaction: discord.Interaction):
+        games, unknown = _resolve_games(interaction.guild_id, _split_game_list(str(self.games)))
+        await _process_games_batch(interaction, self.mode, games, unknown)
+
+class BatchGamesView(View):
+    def __init__(self, mode: str, games: list[tuple[int, str]]):
+        super().__init__(timeout=300)
+        self.mode = mode
+        self.names = dict(games)
+        self.select = discord.ui.Select(
+            placeholder="Pick the games", min_values=1, max_values=len(games),
+            options=[discord.SelectOption(label=name[:100], value=str(gid)) for gid, name in games]
+        )
+        self.select.callback = self.on_select
+        self.add_item(self.select)
+
+    async def on_select(self, interaction: discord.Interaction):
+        games = {int(v): self.names[int(v)] for v in self.select.values}
+        await _process_games_batch(interaction, self.mode, games, [])
+
+    @discord.ui.button(label="Paste a list instead", style=ButtonStyle.secondary)
+    async def paste_button(self, interaction: discord.Interaction, button: Button):
+        await interaction.response.send_modal(BatchGamesModal(self.mode))
+
+async def _start_games_batch(interaction: discord.Interaction, mode: str, search: str | None):
+    if not search:
+        await interaction.response.send_modal(BatchGamesModal(mode))
+        return
+    if mode == "add":
+        # Same source as the game autocomplete
+        rows = conn.execute(
+            "SELECT id, game_name FROM games WHERE guild_id = ? AND game_name LIKE ? ORDER BY game_name COLLATE NOCASE LIMIT 25",
+            (interaction.guild_id, f"%{search}%")
+        ).fetchall()
+    else:
+        # Only the games the user is helping with
+        rows = conn.execute(
+            """SELECT DISTINCT g.id, g.game_name FROM helpers h JOIN games g ON g.id = h.game_id
+               WHERE h.user_id = ? AND h.guild_id = ? AND g.game_name LIKE ?
+               ORDER BY g.game_name COLLATE NOCASE LIMIT 25""",
+            (str(interaction.user.id), interaction.guild_id, f"%{search}%")
+        ).fetchall()
+    if not rows:
+        await interaction.response.send_message(f"No games match '{search}'.", ephemeral=True)
+        return
+    verb = "add yourself to" if mode == "add" else "remove yourself from"
+    await interaction.response.send_message(
+        f"Pick the games to {verb} ({len(rows)} matching '{search}'), or paste a list instead:",
+        view=BatchGamesView(mode, [tuple(r) for r in rows]), ephemeral=True
+    )
+
+@bot.tree.command(name="addmemany", description="Register yourself as a helper for several games at once.")
+@app_commands.describe(search="Pick from the games matching this; leave empty to paste a list")
+@app_commands.autocomplete(search=_game_autocomplete)
+async def add_me_many(interaction: discord.Interaction, search: str = None):
+    await _start_games_batch(interaction, "add", search)
+
+@bot.tree.command(name="removememany", description="Removes yourself as a helper for several games at once.")
+@app_commands.describe(search="Pick from your games matching this; leave empty to paste a list")
+@app_commands.autocomplete(search=_game_autocomplete)
+async def remove_me_many(interaction: discord.Interaction, search: str = None):
+    await _start_games_batch(interaction, "remove", search)
+
 # Set helper status
 @bot.tree.command(name="setstatus", description="Sets your availability status (Green/Amber/Red).")
 async def set_status(interaction: discord.Interaction, status: str):
     user_id = str(interaction.user.id)
     if status.lower() in ["green", "amber", "red"]:
-        c.execute("UPDATE helpers SET status = ? WHERE user_id = ?", (status.lower(), user_id))
+        c.execute(
+            """INSERT INTO users (id, user_name, status) VALUES (?, ?, ?)
+               ON CONFLICT(id) DO UPDATE SET status = excluded.status, updated_at = CURRENT_TIMESTAMP""",
+            (user_id, str(interaction.user), status.lower())
+        )
         conn.commit()
         await interaction.response.send_message(f"{interaction.user.mention}, your status has been set to '{status}'.")
     else:
         await interaction.response.send_message("Invalid status. Please use 'green', 'amber', or 'red'.")
 
 
+# Paged listings (see PagedQuery). Scope is the user id for the per-user lists.
+def _status_emoji(s: str | None) -> str:
+    return STATUS_EMOJI.get((s or "").lower(), "")
+
+_USER_GAMES_SQL = """
+    SELECT g.game_name, g.description, u.status
+    FROM games g
+    LEFT JOIN users u ON u.id = :scope
+    WHERE g.id IN (SELECT game_id FROM helpers WHERE guild_id = :guild AND user_id = :scope)
+    ORDER BY g.game_name COLLATE NOCASE
+    LIMIT :limit OFFSET :offset
+"""
+_USER_GAMES_COUNT_SQL = "SELECT COUNT(DISTINCT game_id) FROM helpers WHERE guild_id = :guild AND user_id = :scope"
+
+def _desc_line(row) -> str:
+    name, desc, status = row
+    desc_txt = desc.strip() if (desc and str(desc).strip()) else "No description"
+    return f"**{name}** {_status_emoji(status)}\n{desc_txt}"
+
+_register_paged(PagedQuery(
+    "ug", "Games {name} helps with", _USER_GAMES_COUNT_SQL, _USER_GAMES_SQL,
+    line=lambda r: f"{r[0]} {_status_emoji(r[2])}".rstrip(), per_page=10,
+))
+_register_paged(PagedQuery(
+    "ugd", "Games {name} helps with (incl. descriptions)", _USER_GAMES_COUNT_SQL, _USER_GAMES_SQL,
+    line=_desc_line, per_page=6,  # fewer per page since entries are longer
+))
+# The three listings below read the partial indexes on the maintained flags
+_register_paged(PagedQuery(
+    "nh", "Games with no helpers and no guide",
+    "SELECT COUNT(*) FROM games WHERE guild_id = :guild AND has_helpers = 0 AND has_guide = 0",
+    """SELECT game_name, description FROM games
+       WHERE guild_id = :guild AND has_helpers = 0 AND has_guide = 0
+       ORDER BY game_name COLLATE NOCASE
+       LIMIT :limit OFFSET :offset""",
+    line=lambda r: f"{r[0]} - {r[1] if r[1] else 'No description'}", per_page=10,
+))
+_register_paged(PagedQuery(
+    "gh", "Games with Helpers (📘 = has guide)",
+    "SELECT COUNT(*) FROM games WHERE guild_id = :guild AND has_helpers = 1",
+    """SELECT game_name, has_guide FROM games
+       WHERE guild_id = :guild AND has_helpers = 1
+       ORDER BY game_name COLLATE NOCASE
+       LIMIT :limit OFFSET :offset""",
+    line=lambda r: f"{r[0]}{' 📘' if r[1] else ''}", per_page=20,
+))
+_register_paged(PagedQuery(
+    "gg", "Games with Guides (👥 = has helpers)",
+    "SELECT COUNT(*) FROM games WHERE guild_id = :guild AND has_guide = 1",
+    """SELECT game_name, has_helpers FROM games
+       WHERE guild_id = :guild AND has_guide = 1
+       ORDER BY game_name COLLATE NOCASE
+       LIMIT :limit OFFSET :offset""",
+    line=lambda r: f"{r[0]}{' 👥' if r[1] else ''}", per_page=20,
+))
+
+
 # Show games user helps with
 @bot.tree.command(name="showme", description="Displays what games you are helping with (paginated).")
 async def show_me(interaction: discord.Interaction):
     user_id = str(interaction.user.id)
-    rows = conn.execute("""
-        SELECT g.game_name, h.status
-        FROM games g
-        JOIN helpers h ON g.id = h.game_id
-        WHERE h.user_id = ?
-        ORDER BY g.game_name COLLATE NOCASE
-    """, (user_id,)).fetchall()
-
-    if not rows:
+    if not PAGED_QUERIES["ug"].count(interaction.guild_id, user_id):
         await interaction.response.send_message("You are not helping with any games yet.")
         return
-
-    def s_emoji(s: str | None) -> str:
-        if not s: return ""
-        s = s.lower()
-        return "🟢" if s == "green" else "🟡" if s in ("amber", "yellow") else "🔴" if s == "red" else ""
-
-    lines = [f"{name} {s_emoji(status)}".rstrip() for (name, status) in rows]
-    pages = _make_pages(lines, per_page=10)
-    view = PaginatorView(pages, title=f"Games {interaction.user.display_name} helps with")
-    await view.send(interaction)
+    await send_paged(interaction, "ug", user_id)
 
 
 @bot.tree.command(name="showmedescription", description="Displays your games with descriptions (paginated).")
 async def show_me_description(interaction: discord.Interaction):
     user_id = str(interaction.user.id)
-    rows = conn.execute("""
-        SELECT g.game_name, g.description, h.status
-        FROM games g
-        JOIN helpers h ON g.id = h.game_id
-        WHERE h.user_id = ?
-        ORDER BY g.game_name COLLATE NOCASE
-    """, (user_id,)).fetchall()
-
-    if not rows:
+    if not PAGED_QUERIES["ugd"].count(interaction.guild_id, user_id):
         await interaction.response.send_message("You are not helping with any games yet.")
         return
-
-    def s_emoji(s: str | None) -> str:
-        if not s: return ""
-        s = s.lower()
-        return "🟢" if s == "green" else "🟡" if s in ("amber", "yellow") else "🔴" if s == "red" else ""
-
-    lines = []
-    for (name, desc, status) in rows:
-        desc_txt = (desc or "").strip() or "No description"
-        lines.append(f"**{name}** {s_emoji(status)}\n{desc_txt}")
-
-    pages = _make_pages(lines, per_page=6)  # fewer per page since entries are longer
-    view = PaginatorView(pages, title=f"Games {interaction.user.display_name} helps with (incl. descriptions)")
-    await view.send(interaction)
+    await send_paged(interaction, "ugd", user_id)
 
 
 # Show games a user helps with
 @bot.tree.command(name="showuser", description="Displays what games a specific user is helping with (paginated).")
 async def show_user(interaction: discord.Interaction, user: discord.Member):
     user_id = str(user.id)
-    rows = conn.execute("""
-        SELECT g.game_name, h.status
-        FROM games g
-        JOIN helpers h ON g.id = h.game_id
-        WHERE h.user_id = ?
-        ORDER BY g.game_name COLLATE NOCASE
-    """, (user_id,)).fetchall()
-
-    if not rows:
+    if not PAGED_QUERIES["ug"].count(interaction.guild_id, user_id):
         await interaction.response.send_message(f"{user.mention} is not helping with any games.")
         return
-
-    # status bubbles
-    def s_emoji(s: str | None) -> str:
-        if not s: return ""
-        s = s.lower()
-        return "🟢" if s == "green" else "🟡" if s in ("amber", "yellow") else "🔴" if s == "red" else ""
-
-    lines = [f"{name} {s_emoji(status)}".rstrip() for (name, status) in rows]
-    pages = _make_pages(lines, per_page=10)
-    view = PaginatorView(pages, title=f"Games {user.display_name} helps with")
-    await view.send(interaction)
+    await send_paged(interaction, "ug", user_id)
 
 
 @bot.tree.command(name="showuserdescription", description="Like showuser, but includes the game description (paginated).")
 async def show_user_description(interaction: discord.Interaction, user: discord.Member):
     user_id = str(user.id)
-    rows = conn.execute("""
-        SELECT g.game_name, g.description, h.status
-        FROM games g
-        JOIN helpers h ON g.id = h.game_id
-        WHERE h.user_id = ?
-        ORDER BY g.game_name COLLATE NOCASE
-    """, (user_id,)).fetchall()
-
-    if not rows:
+    if not PAGED_QUERIES["ugd"].count(interaction.guild_id, user_id):
         await interaction.response.send_message(f"{user.mention} is not helping with any games.")
         return
-
-    def s_emoji(s: str | None) -> str:
-        if not s: return ""
-        s = s.lower()
-        return "🟢" if s == "green" else "🟡" if s in ("amber", "yellow") else "🔴" if s == "red" else ""
-
-    lines = []
-    for (name, desc, status) in rows:
-        desc_txt = desc.strip() if (desc and str(desc).strip()) else "No description"
-        lines.append(f"**{name}** {s_emoji(status)}\n{desc_txt}")
-
-    pages = _make_pages(lines, per_page=6)  # fewer per page since these are longer
-    view = PaginatorView(pages, title=f"Games {user.display_name} helps with (incl. descriptions)")
-    await view.send(interaction)
+    await send_paged(interaction, "ugd", user_id)
 
 
 
 # Show games with no helpers
 @bot.tree.command(name="nothelped", description="Displays games that have no helpers and no guides.")
 async def not_helped(interaction: discord.Interaction):
-    c.execute('''
-        SELECT game_name, description
-        FROM games
-        WHERE id NOT IN (SELECT DISTINCT game_id FROM helpers)
-        AND (guide_url IS NULL OR guide_url = '')
-    ''')
-    games = c.fetchall()
-    if games:
-        game_list = "\n".join([f"{game[0]} - {game[1] if game[1] else 'No description'}" for game in games])
-        await interaction.response.send_message(f"Games with no helpers and no guide:\n{game_list}")
+    if PAGED_QUERIES["nh"].count(interaction.guild_id):
+        await send_paged(interaction, "nh")
     else:
         await interaction.response.send_message("All games either have helpers or guides.")
 
@@ -596,12 +1481,14 @@ async def not_helped(interaction: discord.Interaction):
 @bot.tree.command(name="tophelper", description="Shows a leaderboard of users helping with the most games.")
 async def top_helper(interaction: discord.Interaction):
     c.execute('''
-        SELECT h.user_name, COUNT(h.game_id) as game_count
+        SELECT u.user_name, COUNT(DISTINCT h.game_id) as game_count
         FROM helpers h
+        JOIN users u ON u.id = h.user_id
+        WHERE h.guild_id = ?
         GROUP BY h.user_id
         ORDER BY game_count DESC
         LIMIT 10
-    ''')
+    ''', (interaction.guild_id,))
     helpers = c.fetchall()
     if helpers:
         leaderboard = "\n".join([f"{idx + 1}. {helper[0]} - {helper[1]} games" for idx, helper in enumerate(helpers)])
@@ -609,124 +1496,84 @@ async def top_helper(interaction: discord.Interaction):
     else:
         await interaction.response.send_message("No helpers registered yet.")
 
-# --- Small helper to safely send long lists -----------------------
-async def _send_long(interaction: discord.Interaction, header: str, lines: list[str]):
-    if not lines:
-        await interaction.response.send_message(header)
-        return
-    message_limit = 1900
-    current = header + "\n"
-    first = True
-    for line in lines:
-        if len(current) + len(line) + 1 > message_limit:
-            if first:
-                await interaction.response.send_message(current.rstrip())
-                first = False
-            else:
-                await interaction.followup.send(current.rstrip())
-            current = ""
-        current += line + "\n"
-    if current:
-        if first:
-            await interaction.response.send_message(current.rstrip())
-        else:
-            await interaction.followup.send(current.rstrip())
-
-
 # 1) gameswithhelp — only games that have ≥1 helper; add 📘 if they also have a guide
 @bot.tree.command(name="gamestohelpfull", description="Displays the full list of games with helpers.")
 async def games_to_help_full(interaction: discord.Interaction):
-    sql = """
-    SELECT g.game_name, g.guide_url
-    FROM games g
-    WHERE EXISTS (SELECT 1 FROM helpers h WHERE h.game_id = g.id)
-    ORDER BY g.game_name COLLATE NOCASE;
-    """
-    rows = conn.execute(sql).fetchall()
-
-    if not rows:
+    if not PAGED_QUERIES["gh"].count(interaction.guild_id):
         await interaction.response.send_message("No games currently have helpers.")
         return
+    await send_paged(interaction, "gh")
 
-    lines = [f"{name}{' 📘' if (guide_url and str(guide_url).strip()) else ''}"
-             for (name, guide_url) in rows]
-    await _send_long(interaction, "**Games with Helpers** (📘 = has guide)", lines)
-
-
-class GamesWithHelpView(discord.ui.View):
-    def __init__(self, sections: dict[str, list[str]]):
-        super().__init__(timeout=300)
-        self.sections = sections
-        self.keys = list(sections.keys())
-
-        # Add buttons dynamically by letter group
-        for idx, key in enumerate(self.keys):
-            self.add_item(self.GroupButton(label=key, key=key, row=idx // 3))
-
-    class GroupButton(discord.ui.Button):
-        def __init__(self, label: str, key: str, row: int = 0):
-            super().__init__(label=label, style=discord.ButtonStyle.primary, row=row)
-            self.key = key
 
-        async def callback(self, interaction: discord.Interaction):
-            games = self.view.sections[self.key]
-            display = "\n".join(games) if games else "_No games in this range._"
-            embed = discord.Embed(
-                title=f"Games with Helpers — {self.key}",
-                description=display[:3800],
-                color=0x2b2d31
-            )
-            if interaction.response.is_done():
-                await interaction.edit_original_response(embed=embed, view=self.view)
-            else:
-                await interaction.response.edit_message(embed=embed, view=self.view)
+GAME_GROUPS = ["A–E", "F–J", "K–O", "P–T", "U–Z", "0–9"]
 
+# Same bucketing as the letter buttons: digits, then ≤E, ≤J, ≤O, ≤T, everything else
+_GROUP_SQL = """
+    CASE WHEN UPPER(SUBSTR(g.game_name, 1, 1)) GLOB '[0-9]' THEN 5
+         WHEN UPPER(SUBSTR(g.game_name, 1, 1)) <= 'E' THEN 0
+         WHEN UPPER(SUBSTR(g.game_name, 1, 1)) <= 'J' THEN 1
+         WHEN UPPER(SUBSTR(g.game_name, 1, 1)) <= 'O' THEN 2
+         WHEN UPPER(SUBSTR(g.game_name, 1, 1)) <= 'T' THEN 3
+         ELSE 4 END
+"""
 
-@bot.tree.command(name="gameswithhelp", description="Browse games with helpers by letter range.")
-async def games_with_help(interaction: discord.Interaction):
-    rows = conn.execute("""
+def _games_with_help_embed(guild_id: int, group: int) -> discord.Embed:
+    # Only the clicked range is fetched; nothing is kept between clicks
+    rows = conn.execute(f"""
         SELECT g.game_name,
-               CASE WHEN g.guide_url IS NOT NULL AND g.guide_url != '' THEN 1 ELSE 0 END AS has_guide,
-               COUNT(h.user_id) AS helper_count
+               g.has_guide,
+               (SELECT COUNT(DISTINCT h.user_id) FROM helpers h WHERE h.game_id = g.id) AS helper_count
         FROM games g
-        LEFT JOIN helpers h ON g.id = h.game_id
-        GROUP BY g.id
-        HAVING helper_count > 0
+        WHERE g.guild_id = ? AND g.has_helpers = 1
+          AND {_GROUP_SQL} = ?
         ORDER BY g.game_name COLLATE NOCASE
-    """).fetchall()
-
-    if not rows:
-        await interaction.response.send_message("No games currently have helpers.")
-        return
+    """, (guild_id, group)).fetchall()
 
     def marker(has_guide): return "📘" if has_guide else ""
+    display = "\n".join(f"{name} 👥{helpers}{marker(has_guide)}" for name, has_guide, helpers in rows)
+    return discord.Embed(
+        title=f"Games with Helpers — {GAME_GROUPS[group]}",
+        description=(display or "_No games in this range._")[:3800],
+        color=0x2b2d31
+    )
 
-    # Build groups
-    groups = {"A–E": [], "F–J": [], "K–O": [], "P–T": [], "U–Z": [], "0–9": []}
-    for name, has_guide, helpers in rows:
-        entry = f"{name} 👥{helpers}{marker(has_guide)}"
-        first = name[0].upper()
-        if first.isdigit():
-            groups["0–9"].append(entry)
-        elif first <= "E":
-            groups["A–E"].append(entry)
-        elif first <= "J":
-            groups["F–J"].append(entry)
-        elif first <= "O":
-            groups["K–O"].append(entry)
-        elif first <= "T":
-            groups["P–T"].append(entry)
+
+class GamesWithHelpView(discord.ui.View):
+    def __init__(self):
+        super().__init__(timeout=None)
+        # Add buttons by letter group
+        for idx in range(len(GAME_GROUPS)):
+            self.add_item(GameGroupButton(idx))
+
+
+class GameGroupButton(discord.ui.DynamicItem[discord.ui.Button], template=r"gwh:(?P<group>\d)"):
+    def __init__(self, group: int):
+        super().__init__(discord.ui.Button(
+            label=GAME_GROUPS[group],
+            style=discord.ButtonStyle.primary,
+            custom_id=f"gwh:{group}",
+            row=group // 3,
+        ))
+        self.group = group
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(min(int(match["group"]), len(GAME_GROUPS) - 1))
+
+    async def callback(self, interaction: discord.Interaction):
+        embed = _games_with_help_embed(interaction.guild_id, self.group)
+        if interaction.response.is_done():
+            await interaction.edit_original_response(embed=embed, view=GamesWithHelpView())
         else:
-            groups["U–Z"].append(entry)
+            await interaction.response.edit_message(embed=embed, view=GamesWithHelpView())
 
-    view = GamesWithHelpView(groups)
-    first_key = "A–E"
-    embed = discord.Embed(
-        title=f"Games with Helpers — {first_key}",
-        description="\n".join(groups[first_key]) or "_No games in this range._",
-        color=0x2b2d31
-    )
-    await interaction.response.send_message(embed=embed, view=view)
+
+@bot.tree.command(name="gameswithhelp", description="Browse games with helpers by letter range.")
+async def games_with_help(interaction: discord.Interaction):
+    if not PAGED_QUERIES["gh"].count(interaction.guild_id):
+        await interaction.response.send_message("No games currently have helpers.")
+        return
+    await interaction.response.send_message(embed=_games_with_help_embed(interaction.guild_id, 0), view=GamesWithHelpView())
 
 @bot.tree.command(name="gamesbyletter", description="Shows games with helpers starting with a specific letter.")
 @app_commands.describe(letter="The letter to filter games by (A–Z or 0–9).")
@@ -738,15 +1585,13 @@ async def games_by_letter(interaction: discord.Interaction, letter: str):
 
     rows = conn.execute("""
         SELECT g.game_name,
-               CASE WHEN g.guide_url IS NOT NULL AND g.guide_url != '' THEN 1 ELSE 0 END AS has_guide,
-               COUNT(h.user_id) AS helper_count
+               g.has_guide,
+               (SELECT COUNT(DISTINCT h.user_id) FROM helpers h WHERE h.game_id = g.id) AS helper_count
         FROM games g
-        LEFT JOIN helpers h ON g.id = h.game_id
-        WHERE UPPER(SUBSTR(g.game_name,1,1)) = ?
-        GROUP BY g.id
-        HAVING helper_count > 0
+        WHERE g.guild_id = ? AND g.has_helpers = 1
+          AND UPPER(SUBSTR(g.game_name,1,1)) = ?
         ORDER BY g.game_name COLLATE NOCASE
-    """, (letter,)).fetchall()
+    """, (interaction.guild_id, letter)).fetchall()
 
     if not rows:
         await interaction.response.send_message(f"No games found starting with **{letter}** that have helpers.")
@@ -767,40 +1612,36 @@ async def games_by_letter(interaction: discord.Interaction, letter: str):
 # 2) gameswithguides — only games that have a guide; add 👥 if they also have a helper
 @bot.tree.command(name="gameswithguides", description="Lists all games that have guides (adds 👥 if helpers also exist).")
 async def games_with_guides(interaction: discord.Interaction):
-    sql = """
-    SELECT g.game_name,
-           EXISTS(SELECT 1 FROM helpers h WHERE h.game_id = g.id) AS has_helper
-    FROM games g
-    WHERE g.guide_url IS NOT NULL AND TRIM(g.guide_url) <> ''
-    ORDER BY g.game_name COLLATE NOCASE;
-    """
-    rows = conn.execute(sql).fetchall()
-
-    if not rows:
+    if not PAGED_QUERIES["gg"].count(interaction.guild_id):
         await interaction.response.send_message("No games currently have guides.")
         return
-
-    lines = [f"{name}{' 👥' if has_helper else ''}" for (name, has_helper) in rows]
-    await _send_long(interaction, "**Games with Guides** (👥 = has helpers)", lines)
+    await send_paged(interaction, "gg")
 
 
 # 3) showgame — case-insensitive, tidy sections (hide Guide if none; hide Helpers if none)
 STATUS_EMOJI = {"green": "🟢", "amber": "🟡", "yellow": "🟡", "red": "🔴"}
 
-@bot.tree.command(name="showgame", description="Show details for a game (case-insensitive).")
-@app_commands.autocomplete(game_name=_game_autocomplete)
-async def show_game(interaction: discord.Interaction, game_name: str):
-    game = conn.execute(
-        "SELECT id, game_name, description, guide_url FROM games WHERE game_name = ? COLLATE NOCASE",
-        (game_name,)
-    ).fetchone()
-    if not game:
-        await interaction.response.send_message(f"Couldn't find a game named **{game_name}**.", ephemeral=True)
-        return
+# Rendered /showgame replies by game id; games.version (trigger-maintained) invalidates
+# exactly the games a write touched, in this process or another shard's
+SHOWGAME_CACHE_SIZE = int(os.getenv("SHOWGAME_CACHE_SIZE", "512"))
+
+def _game_version(game_id: int):
+    row = conn.execute("SELECT version FROM games WHERE id = ?", (game_id,)).fetchone()
+    return row[0] if row else None
 
-    game_id, proper_name, description, guide_url = game
+showgame_cache = GenerationCache(size=SHOWGAME_CACHE_SIZE, ttl=3600, version=_game_version)
+
+def _render_show_game(game_id: int) -> str:
+    proper_name, description, guide_url = conn.execute(
+        "SELECT game_name, description, guide_url FROM games WHERE id = ?", (game_id,)
+    ).fetchone()
     helpers = conn.execute(
-        "SELECT user_name, status FROM helpers WHERE game_id = ? ORDER BY user_name COLLATE NOCASE",
+        """SELECT u.user_name, u.status
+           FROM helpers h
+           JOIN users u ON u.id = h.user_id
+           WHERE h.game_id = ?
+           GROUP BY u.id
+           ORDER BY u.user_name COLLATE NOCASE""",
         (game_id,)
     ).fetchall()
 
@@ -813,8 +1654,99 @@ async def show_game(interaction: discord.Interaction, game_name: str):
         STATUS_EMOJI = {"green": "🟢", "amber": "🟡", "yellow": "🟡", "red": "🔴"}
         hl = [f"{u} {STATUS_EMOJI.get((s or '').lower(), '')}".strip() for (u, s) in helpers]
         parts.append("**Helpers:**\n" + "\n".join(hl))
+    return "\n".join(parts)
+
+@bot.tree.command(name="showgame", description="Show details for a game (case-insensitive).")
+@app_commands.autocomplete(game_name=_game_autocomplete)
+async def show_game(interaction: discord.Interaction, game_name: str):
+    game = _resolve_game(interaction.guild_id, game_name, with_version=True)
+    if not game:
+        await interaction.response.send_message(f"Couldn't find a game named **{game_name}**.", ephemeral=True)
+        return
+
+    game_id, _, version = game
+    content = showgame_cache.get(game_id, version)
+    if content is None:
+        content = _render_show_game(game_id)
+        showgame_cache.put(game_id, content, version)
+    await interaction.response.send_message(content)
+
+
+# findhelper — available helpers for a game, best match first
+HELPER_SCORE_DAYS = int(os.getenv("HELPER_SCORE_DAYS", "30"))
+
+# Reads idx_helpers_available for the game's green/amber rows only, then one
+# primary-key probe each into users and helper_scores
+SQL_FIND_HELPERS = '''
+    SELECT u.user_name, h.status, GROUP_CONCAT(h.platform, ', ') AS platforms,
+           IFNULL(MAX(h.platform = :platform), 0) AS platform_match,
+           IFNULL(s.recent_thanks, 0) AS recent
+    FROM helpers h
+    JOIN users u ON u.id = h.user_id
+    LEFT JOIN helper_scores s ON s.guild_id = h.guild_id AND s.user_id = h.user_id
+    WHERE h.game_id = :game_id AND h.status IN ('green', 'amber')
+    GROUP BY h.user_id
+    ORDER BY h.status = 'green' DESC, platform_match DESC, recent DESC, u.user_name COLLATE NOCASE
+    LIMIT :limit
+'''
+
+@bot.tree.command(name="findhelper", description="Find the best available helpers for a game.")
+@app_commands.autocomplete(game_name=_game_autocomplete)
+async def find_helper(interaction: discord.Interaction, game_name: str,
+                      platform: Literal["Xbox", "PC", "PlayStation"] = None):
+    game = _resolve_game(interaction.guild_id, game_name)
+    if not game:
+        await interaction.response.send_message(f"Couldn't find a game named **{game_name}**.", ephemeral=True)
+        return
+
+    game_id, proper_name = game
+    rows = conn.execute(SQL_FIND_HELPERS, {"game_id": game_id, "platform": platform, "limit": 10}).fetchall()
+    if not rows:
+        await interaction.response.send_message(f"No helpers are available for **{proper_name}** right now.", ephemeral=True)
+        return
 
-    await interaction.response.send_message("\n".join(parts))
+    lines = []
+    for user_name, status, platforms, _, recent in rows:
+        line = f"{STATUS_EMOJI.get(status, '')} {user_name}"
+        if platforms:
+            line += f" — {platforms}"
+        if recent:
+            line += f" — {recent} thanks in the last {HELPER_SCORE_DAYS} days"
+        lines.append(line)
+    title = f"**Available helpers for {proper_name}" + (f" on {platform}" if platform else "") + ":**"
+    await interaction.response.send_message(title + "\n" + "\n".join(lines))
+
+
+# Driven by thanks_totals, which has a row for everyone ever thanked: each
+# (guild, helper) pair is one range seek on idx_thanks_guild_thanked for the
+# window. Grouping thanks directly scans the whole index unless ANALYZE has run.
+# MATERIALIZED so each count runs once, not again for the > 0 filter.
+SQL_HELPER_SCORES = '''
+    WITH recent AS MATERIALIZED (
+        SELECT s.guild_id, s.user_id,
+               (SELECT COUNT(*) FROM thanks t
+                WHERE t.guild_id = s.guild_id AND t.thanked_user_id = s.user_id
+                  AND t.timestamp >= datetime('now', :window)) AS recent_thanks
+        FROM thanks_totals s
+        WHERE s.total > 0
+    )
+    INSERT INTO helper_scores (guild_id, user_id, recent_thanks)
+    SELECT guild_id, user_id, recent_thanks FROM recent WHERE recent_thanks > 0
+'''
+
+def _refresh_helper_scores():
+    # Own connection: runs in a worker thread
+    db = sqlite3.connect(DB_PATH, timeout=30)
+    try:
+        with db:
+            db.execute("DELETE FROM helper_scores")
+            db.execute(SQL_HELPER_SCORES, {"window": f"-{HELPER_SCORE_DAYS} days"})
+    finally:
+        db.close()
+
+@tasks.loop(hours=1)
+async def helper_score_task():
+    await asyncio.to_thread(_refresh_helper_scores)
 
 
 # Command: Show bot version and information
@@ -888,8 +1820,12 @@ def build_help_embed(section: str, is_admin: bool) -> discord.Embed:
         " `/updateurl \"name\" \"url\"`\n\n"
         "• Rename an existing game entry if its title changes:\n"
         " `/renamegame \"old\" \"new\"`\n\n"
+        "• See the other names a game can be found by (e.g. BO4):\n"
+        " `/aliases \"name\"`\n\n"
         "• Join or leave as a helper for a game:\n"
         " `/addme \"name\"` or `/removeme \"name\"`\n\n"
+        "• Join or leave several games at once (pick from a search or paste a list):\n"
+        " `/addmemany [search]` or `/removememany [search]`\n\n"
         "• Set your availability status so others know when you can help:\n"
         " `/setstatus green|amber|red`\n\n"
         "• Remove a game listing you own (if you’re the only helper or Tide44):\n"
@@ -907,6 +1843,8 @@ def build_help_embed(section: str, is_admin: bool) -> discord.Embed:
             " `/showuser @user` or `/showuserdescription @user`\n\n"
             "• View helpers and guide info for a specific game:\n"
             " `/showgame \"name\"`\n\n"
+            "• Find the best available helpers for a game (optionally on your platform):\n"
+            " `/findhelper \"name\" [platform]`\n\n"
             "• Browse all games by letter range:\n"
             " `/gameswithhelp`\n\n"
             "• View every game with helpers (full list):\n"
@@ -934,8 +1872,12 @@ def build_help_embed(section: str, is_admin: bool) -> discord.Embed:
             " `/mostthankedfull`\n\n"
             "• Display a graphical table of top thanked users:\n"
             " `/mostthankedtable [month] [year]`\n\n"
+            "• Chart thanks over time for the server, a helper or a game:\n"
+            " `/thankstrend [day|week|month] [days] [@user] [game]`\n\n"
             "• View the latest feedback and thanks received by a user:\n"
-            " `/showfeedback @user`"
+            " `/showfeedback @user`\n\n"
+            "• Search what people were thanked for, across the server:\n"
+            " `/searchfeedback words or \"a phrase\"`"
         )
 
         return e
@@ -946,9 +1888,7 @@ def build_help_embed(section: str, is_admin: bool) -> discord.Embed:
             "• Check the bot version and GitHub repository:\n"
             " `/botversion`\n\n"
             "• Run a quick system health check and uptime test:\n"
-            " `/healthcheck`\n\n"
-            "• Sync a user’s stored name across all helper and thanks records:\n"
-            " `/syncname @user`"
+            " `/healthcheck`"
         )
         return e
 
@@ -964,7 +1904,15 @@ def build_help_embed(section: str, is_admin: bool) -> discord.Embed:
         e.title = "Admin"
         e.description = (
             "• `/deleteuser @user`\n"
-            "• `/deleteusermanual \"username#discrim\"`\n\n"
+            "• `/deleteusermanual \"username#discrim\"`\n"
+            "• `/importdata games|helpers <file>` — bulk load CSV / JSON Lines\n"
+            "• `/exportdata games|helpers [csv|jsonl]`\n"
+            "• `/exportthanks [start] [end]` — thanks history as gzip CSV\n"
+            "• `/backup [status|now]`\n"
+            "• `/addalias \"game\" \"alias\"` / `/removealias \"alias\"`\n"
+            "• `/mergegame \"duplicate\" \"into\"`\n"
+            "• `/usage [days]` — command counts and response times\n"
+            "• `/profile [seconds] [cprofile|sample]` — profile the bot live\n\n"
             f"{base_note}"
         )
         return e
@@ -983,6 +1931,7 @@ async def help_command(interaction: discord.Interaction):
 
 
 # Shared logic stays here
+@write_limited
 async def _process_give_thanks(interaction: discord.Interaction, thanked_member: discord.Member, game: str | None, message: str | None):
     thanking_user_id = str(interaction.user.id)
     thanked_user_id  = str(thanked_member.id)
@@ -991,15 +1940,15 @@ async def _process_give_thanks(interaction: discord.Interaction, thanked_member:
         await interaction.response.send_message("You can't thank yourself!", ephemeral=True)
         return
 
-    before_count = conn.execute(
-        "SELECT COUNT(*) FROM thanks WHERE thanked_user_id = ?", (thanked_user_id,)
-    ).fetchone()[0]
-
     conn.execute(
-        '''INSERT INTO thanks (thanked_user_id, thanked_user_name, thanking_user_id, thanking_user_name, game, message)
-           VALUES (?, ?, ?, ?, ?, ?)''',
-        (thanked_user_id, str(thanked_member), thanking_user_id, str(interaction.user), game, message)
+        '''INSERT INTO thanks (guild_id, thanked_user_id, thanked_user_name, thanking_user_id, thanking_user_name, game, message)
+           VALUES (?, ?, ?, ?, ?, ?, ?)''',
+        (interaction.guild_id, thanked_user_id, str(thanked_member), thanking_user_id, str(interaction.user), game, message)
     )
+    # Commit now: an open write transaction would hold the lock every other shard process waits on
+    conn.commit()
+    # Milestones are checked by milestone_task, off the response path
+    thanks_events.put_nowait((interaction.guild, interaction.channel, thanked_user_id))
 
     resp = f"{interaction.user.mention} thanked {thanked_member.mention}!"
     if game: resp += f"\n**Game:** {game}"
@@ -1010,22 +1959,114 @@ async def _process_give_thanks(interaction: discord.Interaction, thanked_member:
     else:
         await interaction.response.send_message(resp)
 
-    after_count = before_count + 1
-    MILESTONES = {15: "The Pathfinder 🗺️", 50: "Haven's Guardian 🛡️", 100: "The Apex Hunter 🏹"}
-    crossed = next((m for m in MILESTONES if before_count < m <= after_count), None)
-    if crossed is not None:
-        MOD_ROLE_ID = 1314735241360834640
-        guild = interaction.guild
-        mod_role = guild.get_role(MOD_ROLE_ID) if guild else None
+
+# ---------- Milestone announcements ----------
+# Thanks inserts publish (guild, channel, thanked user id) here; milestone_task drains
+# the queue every few seconds, checks thanks_totals and posts one message per channel.
+# A milestone is only marked announced once its message is posted; one that couldn't
+# be posted is tried again with the helper's next thanks, or when the bot restarts.
+thanks_events: asyncio.Queue = asyncio.Queue()
+MILESTONE_CHECK_SECONDS = float(os.getenv("MILESTONE_CHECK_SECONDS", "5"))
+milestone_log = logging.getLogger("havenshelper.milestones")
+
+def _pending_milestones(guild_id: int, user_id: str) -> list[int]:
+    """The milestones user_id has reached but not had announced."""
+    row = conn.execute(
+        "SELECT total, milestone FROM thanks_totals WHERE guild_id = ? AND user_id = ?", (guild_id, user_id)
+    ).fetchone()
+    if not row:
+        return []
+    total, announced = row
+    return sorted(m for m in THANKS_MILESTONES if announced < m <= total)
+
+def _mark_announced(guild_id: int, user_id: str, milestone: int):
+    # Conditional: never moves backwards if another process announced a higher one meanwhile
+    conn.execute(
+        "UPDATE thanks_totals SET milestone = ? WHERE guild_id = ? AND user_id = ? AND milestone < ?",
+        (milestone, guild_id, user_id, milestone)
+    )
+    conn.commit()
+
+def _queue_pending_milestones() -> int:
+    """Queues this process's guilds' unannounced milestones (e.g. events lost in a restart)."""
+    if not THANKS_MILESTONES:
+        return 0
+    reached = " OR ".join(f"(milestone < {m} AND total >= {m})" for m in sorted(THANKS_MILESTONES))
+    queued = 0
+    for guild_id, user_id in conn.execute(f"SELECT guild_id, user_id FROM thanks_totals WHERE {reached}").fetchall():
+        guild = bot.get_guild(guild_id)
+        if guild:
+            thanks_events.put_nowait((guild, None, user_id))
+            queued += 1
+    return queued
+
+def _can_post(guild, channel) -> bool:
+    me = guild.me
+    return me is None or channel.permissions_for(me).send_messages
+
+def _fallback_channel(guild, exclude=None):
+    """The system channel, else the first text channel the bot may post in."""
+    for channel in [guild.system_channel, *guild.text_channels]:
+        if channel is not None and channel is not exclude and _can_post(guild, channel):
+            return channel
+    return None
+
+async def announce_milestones():
+    """Drains thanks_events and announces the milestones they reached, batched per channel."""
+    latest = {}     # (guild id, user id) -> (guild, channel) of the newest thanks
+    while not thanks_events.empty():
+        guild, channel, user_id = thanks_events.get_nowait()
+        if channel is None and (guild.id, user_id) in latest:
+            continue    # a queued thanks already says where to post
+        latest[(guild.id, user_id)] = (guild, channel)
+
+    by_channel = {}     # channel id -> (guild, channel, [(user id, milestone, line)])
+    for (guild_id, user_id), (guild, channel) in latest.items():
+        reached = _pending_milestones(guild_id, user_id)
+        if not reached:
+            continue
+        if channel is None or not _can_post(guild, channel):
+            channel = _fallback_channel(guild) or channel
+        if channel is None:
+            milestone_log.warning("No channel to announce milestones in guild %s", guild_id)
+            continue
+        entries = by_channel.setdefault(channel.id, (guild, channel, []))[2]
+        for milestone in reached:
+            entries.append((user_id, milestone,
+                            f"🎉 <@{user_id}> just hit **{milestone} thanks** and earned **{THANKS_MILESTONES[milestone]}**!"))
+
+    for guild, channel, entries in by_channel.values():
+        mod_role = guild.get_role(MOD_ROLE_ID)
         role_mention = mod_role.mention if mod_role else f"<@&{MOD_ROLE_ID}>"
-        congrats = (
-            f"🎉 {thanked_member.mention} just hit **{crossed} thanks** and earned **{MILESTONES[crossed]}**!\n"
-            f"{role_mention} please award this role in recognition of their support."
-        )
-        await interaction.followup.send(
-            congrats,
-            allowed_mentions=discord.AllowedMentions(roles=True, users=True, everyone=False)
-        )
+        closing = f"{role_mention} please award {'this role' if len(entries) == 1 else 'these roles'} in recognition of their support."
+        # Stay under Discord's 2000 character message limit
+        chunk = []
+        for i, entry in enumerate(entries):
+            extra = len(entry[2]) + 1 + (len(closing) + 1 if i == len(entries) - 1 else 0)
+            if chunk and sum(len(e[2]) + 1 for e in chunk) + extra > 2000:
+                await _send_announcement(guild, channel, chunk)
+                chunk = []
+            chunk.append(entry)
+        await _send_announcement(guild, channel, chunk, closing)
+
+async def _send_announcement(guild, channel, entries: list[tuple[str, int, str]], closing: str | None = None):
+    content = "\n".join([e[2] for e in entries] + ([closing] if closing else []))
+    for target in (channel, _fallback_channel(guild, exclude=channel)):
+        if target is None:
+            continue
+        try:
+            await target.send(content, allowed_mentions=discord.AllowedMentions(roles=True, users=True, everyone=False))
+        except discord.HTTPException:
+            milestone_log.exception("Could not post milestone announcement in channel %s of guild %s", target.id, guild.id)
+            continue
+        for user_id, milestone, _ in entries:
+            _mark_announced(guild.id, user_id, milestone)
+        return
+    milestone_log.warning("Milestone announcement not posted in guild %s; will retry with the next thanks or restart", guild.id)
+
+@tasks.loop(seconds=MILESTONE_CHECK_SECONDS)
+async def milestone_task():
+    await announce_milestones()
 
 # Slash command (works on mobile & desktop)
 @bot.tree.command(name="givethanks", description="Give thanks to another user for their help.")
@@ -1052,16 +2093,18 @@ async def give_thanks_context(interaction: discord.Interaction, user: discord.Me
 @bot.tree.command(name="mostthanked", description="Shows the most thanked users.")
 async def most_thanked(interaction: discord.Interaction, month: int = None, year: int = None):
     # Build the SQL query dynamically based on optional parameters
-    query = '''SELECT thanked_user_name, COUNT(*) as thank_count
-               FROM thanks'''
-    params = []
+    query = '''SELECT u.user_name, COUNT(*) as thank_count
+               FROM thanks t
+               JOIN users u ON u.id = t.thanked_user_id
+               WHERE t.guild_id = ?'''
+    params = [interaction.guild_id]
 
     # Modify query if filtering by month and year
     if month and year:
-        query += ''' WHERE strftime('%m', timestamp) = ? AND strftime('%Y', timestamp) = ?'''
+        query += ''' AND strftime('%m', timestamp) = ? AND strftime('%Y', timestamp) = ?'''
         params.extend([f"{month:02d}", str(year)])
 
-    query += ''' GROUP BY thanked_user_id, thanked_user_name
+    query += ''' GROUP BY t.thanked_user_id
                  ORDER BY thank_count DESC
                  LIMIT 10'''
     
@@ -1086,12 +2129,14 @@ async def most_thanked(interaction: discord.Interaction, month: int = None, year
 @bot.tree.command(name="mostthankedfull", description="Shows the full all-time list of most thanked users.")
 async def most_thanked_full(interaction: discord.Interaction):
     # Query without date filters or LIMIT
-    query = '''SELECT thanked_user_name, COUNT(*) as thank_count
-               FROM thanks
-               GROUP BY thanked_user_id, thanked_user_name
+    query = '''SELECT u.user_name, COUNT(*) as thank_count
+               FROM thanks t
+               JOIN users u ON u.id = t.thanked_user_id
+               WHERE t.guild_id = ?
+               GROUP BY t.thanked_user_id
                ORDER BY thank_count DESC'''
     
-    c.execute(query)
+    c.execute(query, (interaction.guild_id,))
     results = c.fetchall()
 
     title = "Most Thanked Users (All-Time Full List):"
@@ -1108,11 +2153,12 @@ async def most_thanked_full(interaction: discord.Interaction):
 @bot.tree.command(name="showfeedback", description="Shows the last 10 feedback messages received by a user.")
 async def show_feedback(interaction: discord.Interaction, user: discord.Member):
     user_id = str(user.id)
-    c.execute('''SELECT thanking_user_name, game, message, timestamp
-                 FROM thanks
-                 WHERE thanked_user_id = ?
-                 ORDER BY timestamp DESC
-                 LIMIT 10''', (user_id,))
+    c.execute('''SELECT u.user_name, t.game, t.message, t.timestamp
+                 FROM thanks t
+                 JOIN users u ON u.id = t.thanking_user_id
+                 WHERE t.guild_id = ? AND t.thanked_user_id = ?
+                 ORDER BY t.timestamp DESC
+                 LIMIT 10''', (interaction.guild_id, user_id))
     feedback = c.fetchall()
 
     if feedback:
@@ -1124,13 +2170,88 @@ async def show_feedback(interaction: discord.Interaction, user: discord.Member):
     else:
         await interaction.response.send_message(f"No feedback found for {user.mention}.")
 
+def _feedback_match(guild_id: int, text: str) -> str | None:
+    """FTS5 query for a search box: "quoted phrases" and words, all required, in this guild.
+
+    Everything is passed as a quoted string, so FTS5 operators in the text are just words.
+    """
+    phrases = re.findall(r'"([^"]+)"', text)
+    words = re.findall(r"\w+", re.sub(r'"[^"]*"?', " ", text))
+    terms = [f'"{t}"' for t in phrases + words if re.search(r"\w", t)]
+    if not terms:
+        return None
+    return f'guild_id:"{guild_id}" AND {{game message}}: ({" ".join(terms)})'
+
+FEEDBACK_SEARCH_KEEP_DAYS = int(os.getenv("FEEDBACK_SEARCH_KEEP_DAYS", "7"))
+
+def _save_feedback_search(guild_id: int, query: str, match_expr: str) -> int:
+    search_id = conn.execute(
+        """INSERT INTO feedback_searches (guild_id, query, match_expr, searched_at) VALUES (?, ?, ?, datetime('now'))
+           ON CONFLICT (guild_id, query) DO UPDATE SET match_expr = excluded.match_expr, searched_at = excluded.searched_at
+           RETURNING id""",
+        (guild_id, query, match_expr)
+    ).fetchone()[0]
+    conn.commit()
+    return search_id
+
+def prune_feedback_searches(db: sqlite3.Connection) -> int:
+    """Drops saved searches nobody has run for FEEDBACK_SEARCH_KEEP_DAYS; their page buttons then show no results."""
+    with db:
+        return db.execute(
+            "DELETE FROM feedback_searches WHERE searched_at < datetime('now', ?)",
+            (f"-{FEEDBACK_SEARCH_KEEP_DAYS} days",)
+        ).rowcount
+
+# Ranking scores every candidate, so very common words are ranked among their newest
+# FEEDBACK_RANK_WINDOW matches only (found in rowid order, which FTS5 reads without
+# scoring). A search id from another guild matches nothing instead of failing.
+FEEDBACK_RANK_WINDOW = 5000
+_FEEDBACK_MATCH = """COALESCE((SELECT match_expr FROM feedback_searches WHERE id = :scope AND guild_id = :guild),
+                            'guild_id:"none"')"""
+_register_paged(PagedQuery(
+    "fs", 'Feedback matching "{name}"',
+    f"""SELECT COUNT(*) FROM (SELECT 1 FROM thanks_fts WHERE thanks_fts MATCH {_FEEDBACK_MATCH}
+                              LIMIT {FEEDBACK_RANK_WINDOW})""",
+    f"""SELECT COALESCE(u.user_name, t.thanked_user_name), t.thanking_user_name, t.timestamp,
+               highlight(thanks_fts, 1, '**', '**'), snippet(thanks_fts, 2, '**', '**', '…', 16)
+        FROM thanks_fts
+        JOIN thanks t ON t.id = thanks_fts.rowid
+        LEFT JOIN users u ON u.id = t.thanked_user_id
+        WHERE thanks_fts MATCH {_FEEDBACK_MATCH}
+          AND thanks_fts.rowid >= (SELECT MIN(rowid) FROM (
+                  SELECT rowid FROM thanks_fts WHERE thanks_fts MATCH {_FEEDBACK_MATCH}
+                  ORDER BY rowid DESC LIMIT {FEEDBACK_RANK_WINDOW}))
+        ORDER BY bm25(thanks_fts, 0.0, 2.0, 1.0), t.id DESC
+        LIMIT :limit OFFSET :offset""",
+    line=lambda r: f"**{r[0]}** from {r[1]} · {r[3] or 'no game'} · {str(r[2])[:10]}\n> {r[4] or '*no message*'}",
+    per_page=8, name_sql="SELECT query FROM feedback_searches WHERE id = ?",
+))
+
+@bot.tree.command(name="searchfeedback", description='Search what people were thanked for, e.g. Zetsubou or "boss fight".')
+@app_commands.describe(query='Words that must all appear (in the message or game); use "quotes" for a phrase')
+async def search_feedback(interaction: discord.Interaction, query: app_commands.Range[str, 2, 100]):
+    query = " ".join(query.split())
+    match_expr = _feedback_match(interaction.guild_id, query)
+    if match_expr is None:
+        await interaction.response.send_message("Search for at least one word.", ephemeral=True)
+        return
+    search_id = _save_feedback_search(interaction.guild_id, query, match_expr)
+    if not PAGED_QUERIES["fs"].count(interaction.guild_id, str(search_id)):
+        await interaction.response.send_message(f'No feedback matches "{query}".')
+        return
+    await send_paged(interaction, "fs", str(search_id))
+
 @bot.tree.command(name="deleteusermanual", description="Remove a user from all games using their username (Admin only)")
 @commands.has_permissions(administrator=True)
 async def remove_user_manual(interaction: discord.Interaction, username: str):
-    c.execute("DELETE FROM helpers WHERE user_name = ?", (username,))
+    c.execute(
+        """DELETE FROM helpers WHERE guild_id = ?
+           AND (user_name = ? OR user_id IN (SELECT id FROM users WHERE user_name = ?))""",
+        (interaction.guild_id, username, username)
+    )
     conn.commit()
-    c.execute("INSERT INTO logs (user, command, game_name) VALUES (?, ?, ?)", 
-              (str(interaction.user), "removeusermanual", f"Removed {username} from all games"))
+    c.execute("INSERT INTO logs (guild_id, user, command, game_name) VALUES (?, ?, ?, ?)", 
+              (interaction.guild_id, str(interaction.user), "removeusermanual", f"Removed {username} from all games"))
     conn.commit()
     await interaction.response.send_message(f"User '{username}' has been removed from all games.")
 
@@ -1138,13 +2259,123 @@ async def remove_user_manual(interaction: discord.Interaction, username: str):
 @commands.has_permissions(administrator=True)
 async def remove_user(interaction: discord.Interaction, user: discord.User):
     user_id = str(user.id)
-    c.execute("DELETE FROM helpers WHERE user_id = ?", (user_id,))
+    c.execute("DELETE FROM helpers WHERE guild_id = ? AND user_id = ?", (interaction.guild_id, user_id))
     conn.commit()
-    c.execute("INSERT INTO logs (user, command, game_name) VALUES (?, ?, ?)", 
-              (str(interaction.user), "removeuser", f"Removed {user} from all games"))
+    c.execute("INSERT INTO logs (guild_id, user, command, game_name) VALUES (?, ?, ?, ?)", 
+              (interaction.guild_id, str(interaction.user), "removeuser", f"Removed {user} from all games"))
     conn.commit()
     await interaction.response.send_message(f"User '{user}' has been removed from all games.")
-    
+
+# Game aliases (see game_key / _resolve_game)
+@bot.tree.command(name="addalias", description="Add another name a game can be found by, e.g. BO4 (Admin only).")
+@app_commands.autocomplete(game_name=_game_autocomplete)
+@app_commands.default_permissions(administrator=True)
+@app_commands.checks.has_permissions(administrator=True)
+async def add_alias(interaction: discord.Interaction, game_name: str, alias: str):
+    game = _resolve_game(interaction.guild_id, game_name)
+    if not game:
+        await interaction.response.send_message(f"Game '{game_name}' not found.", ephemeral=True)
+        return
+    key = game_key(alias)
+    if not key:
+        await interaction.response.send_message("An alias needs at least one letter or digit.", ephemeral=True)
+        return
+    game_id, game_name = game
+    taken = conn.execute(
+        """SELECT g.game_name FROM game_aliases a JOIN games g ON g.id = a.game_id
+           WHERE a.guild_id = ? AND a.alias_key = ? AND a.kind = 'name' AND a.game_id <> ?""",
+        (interaction.guild_id, key, game_id)
+    ).fetchone()
+    if taken:
+        await interaction.response.send_message(f"'{alias}' already means the game '{taken[0]}'.", ephemeral=True)
+        return
+    conn.execute(
+        """INSERT INTO game_aliases (guild_id, alias_key, game_id, alias, kind) VALUES (?, ?, ?, ?, 'alias')
+           ON CONFLICT(guild_id, alias_key) DO UPDATE SET game_id = excluded.game_id, alias = excluded.alias, kind = 'alias'
+           WHERE game_aliases.kind <> 'name'""",
+        (interaction.guild_id, key, game_id, alias)
+    )
+    conn.execute("INSERT INTO logs (guild_id, user, command, game_name) VALUES (?, ?, ?, ?)",
+                 (interaction.guild_id, str(interaction.user), "addalias", f"{alias} -> {game_name}"))
+    conn.commit()
+    await interaction.response.send_message(f"'{alias}' now finds '{game_name}'.", ephemeral=True)
+
+@bot.tree.command(name="removealias", description="Remove a game alias or abbreviation (Admin only).")
+@app_commands.default_permissions(administrator=True)
+@app_commands.checks.has_permissions(administrator=True)
+async def remove_alias(interaction: discord.Interaction, alias: str):
+    # A game's own name can't be removed this way; rename the game instead
+    c.execute("DELETE FROM game_aliases WHERE guild_id = ? AND alias_key = ? AND kind <> 'name'",
+              (interaction.guild_id, game_key(alias)))
+    if c.rowcount > 0:
+        c.execute("INSERT INTO logs (guild_id, user, command, game_name) VALUES (?, ?, ?, ?)",
+                  (interaction.guild_id, str(interaction.user), "removealias", alias))
+        conn.commit()
+        await interaction.response.send_message(f"Alias '{alias}' removed.", ephemeral=True)
+    else:
+        await interaction.response.send_message(f"No alias '{alias}' found.", ephemeral=True)
+
+@bot.tree.command(name="aliases", description="List the aliases and abbreviations a game can be found by.")
+@app_commands.autocomplete(game_name=_game_autocomplete)
+async def list_aliases(interaction: discord.Interaction, game_name: str):
+    game = _resolve_game(interaction.guild_id, game_name)
+    if not game:
+        await interaction.response.send_message(f"Game '{game_name}' not found.", ephemeral=True)
+        return
+    rows = conn.execute(
+        "SELECT alias, kind, alias_key FROM game_aliases WHERE game_id = ? AND kind <> 'name' ORDER BY kind, alias_key",
+        (game[0],)
+    ).fetchall()
+    if not rows:
+        await interaction.response.send_message(f"'{game[1]}' has no aliases.", ephemeral=True)
+        return
+    lines = [f"• {key}" if kind == "abbrev" else f"• {alias}" for alias, kind, key in rows]
+    await interaction.response.send_message(f"**'{game[1]}' can also be found as:**\n" + "\n".join(lines), ephemeral=True)
+
+@bot.tree.command(name="mergegame", description="Merge a duplicate game into another one (Admin only).")
+@app_commands.autocomplete(duplicate=_game_autocomplete, into=_game_autocomplete)
+@app_commands.default_permissions(administrator=True)
+@app_commands.checks.has_permissions(administrator=True)
+async def merge_game(interaction: discord.Interaction, duplicate: str, into: str):
+    source, target = _resolve_game(interaction.guild_id, duplicate), _resolve_game(interaction.guild_id, into)
+    if not source or not target:
+        await interaction.response.send_message(f"Game '{into if source else duplicate}' not found.", ephemeral=True)
+        return
+    if source[0] == target[0]:
+        await interaction.response.send_message("Those are the same game.", ephemeral=True)
+        return
+    (source_id, source_name), (target_id, target_name) = source, target
+
+    # Helpers move over (dropping ones already listed for the target), thanks follow the name,
+    # and the duplicate's name and aliases keep working as aliases of the target
+    conn.execute("UPDATE OR IGNORE helpers SET game_id = ? WHERE game_id = ?", (target_id, source_id))
+    conn.execute("DELETE FROM helpers WHERE game_id = ?", (source_id,))
+    conn.execute("UPDATE thanks SET game = ? WHERE guild_id = ? AND game = ?", (target_name, interaction.guild_id, source_name))
+    # Rolled-up trend days move to the target; left behind, the delete below would file them under the old name
+    conn.execute(
+        """INSERT INTO thanks_daily_games (guild_id, day, game_id, game, thanks)
+           SELECT guild_id, day, ?, '', thanks FROM thanks_daily_games WHERE game_id = ?
+           ON CONFLICT(guild_id, day, game_id, game) DO UPDATE SET thanks = thanks + excluded.thanks""",
+        (target_id, source_id)
+    )
+    conn.execute("DELETE FROM thanks_daily_games WHERE game_id = ?", (source_id,))
+    conn.execute(
+        """UPDATE OR IGNORE game_aliases SET game_id = ?, kind = CASE kind WHEN 'name' THEN 'alias' ELSE kind END
+           WHERE game_id = ?""",
+        (target_id, source_id)
+    )
+    conn.execute(
+        """UPDATE games SET description = COALESCE(description, (SELECT description FROM games WHERE id = :source)),
+                            guide_url = COALESCE(guide_url, (SELECT guide_url FROM games WHERE id = :source))
+           WHERE id = :target""",
+        {"source": source_id, "target": target_id}
+    )
+    conn.execute("DELETE FROM games WHERE id = ?", (source_id,))
+    conn.execute("INSERT INTO logs (guild_id, user, command, game_name) VALUES (?, ?, ?, ?)",
+                 (interaction.guild_id, str(interaction.user), "mergegame", f"{source_name} -> {target_name}"))
+    conn.commit()
+    await interaction.response.send_message(f"Merged '{source_name}' into '{target_name}'.")
+
 @bot.tree.command(name="healthcheck", description="Checks the bot's status and health.")
 async def health_check(interaction: discord.Interaction):
     try:
@@ -1168,20 +2399,423 @@ async def health_check(interaction: discord.Interaction):
         f"- **Database:** {db_status}\n"
         f"- **Registered Commands:** {command_count}\n"
     )
+    if SHARD_COUNT:
+        latencies = ", ".join(f"{sid}: {lat * 1000:.0f}ms" for sid, lat in sorted(bot.latencies))
+        health_report += f"- **Shards:** {bot.shard_count} total, this process runs {latencies or 'none yet'}\n"
+    health_report += f"- **Event loop:** {loop_watchdog.report()}\n"
+    health_report += (f"- **Caches:** showgame {showgame_cache.stats()}; "
+                      f"leaderboard {leaderboard_cache.stats()}\n")
+    if IS_PRIMARY:
+        health_report += f"- **Maintenance:** {_maintenance_report(last_maintenance)}\n"
     
     await interaction.response.send_message(health_report)
 
-@bot.tree.command(name="syncname", description="Sync a member's display name across stored records.")
-async def sync_name(interaction: discord.Interaction, user: discord.Member):
-    uid = str(user.id)
-    uname = str(user)  # e.g., "fatjay4lisa#1234" or display name depending on your needs
-    # thanks table (both sides)
-    c.execute("UPDATE thanks SET thanked_user_name = ? WHERE thanked_user_id = ?", (uname, uid))
-    c.execute("UPDATE thanks SET thanking_user_name = ? WHERE thanking_user_id = ?", (uname, uid))
-    # helpers table too (optional but handy)
-    c.execute("UPDATE helpers SET user_name = ? WHERE user_id = ?", (uname, uid))
-    conn.commit()
-    await interaction.response.send_message(f"Synced names for {user.mention}.")
+# ---------- Automatic name syncing (gateway events -> users table) ----------
+NAME_SYNC_DELAY = float(os.getenv("NAME_SYNC_DELAY", "30"))  # seconds to collect changes before writing
+
+class NameSyncQueue:
+    """Coalesces name changes per user and writes them in one batched transaction."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.pending: dict[str, str] = {}   # user_id -> latest name (later changes overwrite earlier ones)
+        self._task: asyncio.Task | None = None
+
+    def push(self, user_id: int, user_name: str):
+        self.pending[str(user_id)] = user_name
+        # First change in a quiet period schedules the flush; later ones just coalesce into it
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.delay)
+        self.flush()
+
+    def flush(self) -> int:
+        if not self.pending:
+            return 0
+        batch = [(name, uid, name) for uid, name in self.pending.items()]
+        self.pending.clear()
+        # Only users we already store and whose name really changed; every other guild member
+        # is ignored by the WHERE
+        conn.executemany(
+            "UPDATE users SET user_name = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ? AND user_name IS NOT ?",
+            batch
+        )
+        conn.commit()
+        return len(batch)
+
+
+name_sync = NameSyncQueue(NAME_SYNC_DELAY)
+
+@bot.event
+async def on_member_update(before: discord.Member, after: discord.Member):
+    if str(before) != str(after):
+        name_sync.push(after.id, str(after))
+
+@bot.event
+async def on_user_update(before: discord.User, after: discord.User):
+    if str(before) != str(after):
+        name_sync.push(after.id, str(after))
+
+# ---------- Member lookups (bounded LRU instead of discord.py's member cache) ----------
+MEMBER_CACHE_SIZE = int(os.getenv("MEMBER_CACHE_SIZE", "5000"))
+MEMBER_CACHE_TTL = float(os.getenv("MEMBER_CACHE_TTL", "3600"))   # seconds
+
+class MemberCache:
+    """(guild, user) -> Member, or None for users who left, kept for `ttl` seconds.
+
+    Only members the bot actually shows (leaderboard avatars) are held; a miss asks
+    discord.py's cache (populated under INTENTS_PROFILE=full) and then the API. The
+    dict is kept in LRU order like TokenBuckets.
+    """
+
+    def __init__(self, size: int, ttl: float):
+        self.size = size
+        self.ttl = ttl
+        self.entries: dict[tuple[int, int], tuple[float, discord.Member | None]] = {}
+
+    async def get(self, guild: discord.Guild, user_id: int) -> discord.Member | None:
+        key = (guild.id, user_id)
+        now = time.monotonic()
+        hit = self.entries.pop(key, None)
+        if hit is not None and now - hit[0] < self.ttl:
+            self.entries[key] = hit
+            return hit[1]
+        member = guild.get_member(user_id)
+        if member is None:
+            try:
+                member = await guild.fetch_member(user_id)
+            except discord.NotFound:
+                member = None
+            except Exception:
+                return None   # transient failure: ask again next time
+        self.entries[key] = (now, member)
+        if len(self.entries) > self.size:
+            del self.entries[next(iter(self.entries))]
+        return member
+
+    def forget(self, guild_id: int, user_id: int):
+        self.entries.pop((guild_id, user_id), None)
+
+
+member_cache = MemberCache(MEMBER_CACHE_SIZE, MEMBER_CACHE_TTL)
+
+def _payload_user_name(user: dict) -> str:
+    """str(discord.User) for a gateway user payload: the username, or "name#1234" for a legacy tag."""
+    discriminator = user.get("discriminator") or "0"
+    return user["username"] if discriminator == "0" else f"{user['username']}#{discriminator}"
+
+def _on_raw_member_update(parse):
+    # Without a member cache discord.py drops GUILD_MEMBER_UPDATE for uncached members
+    # before on_member_update/on_user_update fire, so read the new name from the payload
+    def handler(data):
+        user = data.get("user") or {}
+        if "id" in user and "username" in user:
+            name_sync.push(int(user["id"]), _payload_user_name(user))
+            member_cache.forget(int(data["guild_id"]), int(user["id"]))
+        parse(data)
+    return handler
+
+if intents.members and not member_cache_flags.joined:
+    parsers = getattr(bot._connection, "parsers", {})
+    if "GUILD_MEMBER_UPDATE" in parsers:
+        parsers["GUILD_MEMBER_UPDATE"] = _on_raw_member_update(parsers["GUILD_MEMBER_UPDATE"])
+    else:
+        print(f"discord.py {discord.__version__} has no GUILD_MEMBER_UPDATE parser; name changes "
+              "won't be synced. Use INTENTS_PROFILE=full or discord.py 2.7.")
+
+
+# ---------- Command usage analytics ----------
+USAGE_FLUSH_SECONDS = float(os.getenv("USAGE_FLUSH_SECONDS", "15"))
+USAGE_KEEP_DAYS = int(os.getenv("USAGE_KEEP_DAYS", "7"))    # raw rows kept after they are rolled up
+
+class UsageLog:
+    """Buffers one (command, duration) row per invocation and writes them in batches.
+
+    GuildOnlyTree.interaction_check stamps the start time; completion, errors and
+    autocomplete record the row. Nothing touches the database on the command's path.
+    """
+
+    def __init__(self, delay: float, max_pending: int = 500):
+        self.delay = delay
+        self.max_pending = max_pending
+        self.pending: list[tuple] = []
+        self._task: asyncio.Task | None = None
+
+    def record(self, interaction: discord.Interaction, ok: bool, prefix: str = ""):
+        started = interaction.extras.get("started_at")
+        if started is None or interaction.command is None or interaction.guild_id is None:
+            return
+        self.pending.append((
+            interaction.guild_id, prefix + interaction.command.qualified_name, str(interaction.user.id),
+            (time.perf_counter() - started) * 1000, int(ok),
+            datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+        ))
+        if len(self.pending) >= self.max_pending:
+            self.flush()
+        elif self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.delay)
+        self.flush()
+
+    def flush(self) -> int:
+        if not self.pending:
+            return 0
+        batch, self.pending = self.pending, []
+        conn.executemany(
+            "INSERT INTO command_usage (guild_id, command, user_id, duration_ms, ok, ran_at) VALUES (?, ?, ?, ?, ?, ?)",
+            batch
+        )
+        conn.commit()
+        return len(batch)
+
+
+usage_log = UsageLog(USAGE_FLUSH_SECONDS)
+
+@bot.event
+async def on_app_command_completion(interaction: discord.Interaction, command):
+    usage_log.record(interaction, ok=True)
+
+USAGE_ROLLUP_SQL = [
+    """INSERT INTO command_usage_hourly (guild_id, hour, command, calls, errors, total_ms, max_ms)
+       SELECT guild_id, substr(ran_at, 1, 13) || ':00', command, COUNT(*), SUM(ok = 0), SUM(duration_ms), MAX(duration_ms)
+       FROM command_usage
+       WHERE id > :last AND id <= :upto
+       GROUP BY guild_id, substr(ran_at, 1, 13), command
+       ON CONFLICT(guild_id, hour, command) DO UPDATE SET
+           calls = calls + excluded.calls, errors = errors + excluded.errors,
+           total_ms = total_ms + excluded.total_ms, max_ms = MAX(max_ms, excluded.max_ms)""",
+]
+
+def roll_up_usage(db: sqlite3.Connection) -> int:
+    """Rolls command_usage into command_usage_hourly, then prunes raw rows that are rolled up and old."""
+    done = _roll_up(db, "usage", "command_usage", USAGE_ROLLUP_SQL)
+    with db:
+        db.execute(
+            """DELETE FROM command_usage
+               WHERE id <= IFNULL((SELECT last_id FROM rollup_state WHERE name = 'usage'), 0)
+                 AND ran_at < datetime('now', ?)""",
+            (f"-{USAGE_KEEP_DAYS} days",)
+        )
+    return done
+
+@bot.tree.command(name="usage", description="Command usage and response times for this server (Admin only).")
+@app_commands.default_permissions(administrator=True)
+@app_commands.checks.has_permissions(administrator=True)
+async def usage_report(interaction: discord.Interaction, days: app_commands.Range[int, 1, 90] = 7):
+    await interaction.response.defer(thinking=True, ephemeral=True)
+    usage_log.flush()
+    await asyncio.to_thread(_run_rollups)
+
+    since = (datetime.now(timezone.utc) - timedelta(days=days)).strftime("%Y-%m-%d %H:00")
+    rows = conn.execute(
+        """SELECT command, SUM(calls), SUM(errors), SUM(total_ms), MAX(max_ms)
+           FROM command_usage_hourly
+           WHERE guild_id = ? AND hour >= ?
+           GROUP BY command
+           ORDER BY SUM(total_ms) DESC
+           LIMIT 25""",
+        (interaction.guild_id, since)
+    ).fetchall()
+    if not rows:
+        await interaction.followup.send(f"No commands recorded in the last {days} days.", ephemeral=True)
+        return
+
+    # Sorted by total time spent, so the hot paths worth optimizing come first
+    lines = [f"{'command':<32}{'calls':>7}{'err':>5}{'avg ms':>9}{'max ms':>9}"]
+    for command, calls, errors, total_ms, max_ms in rows:
+        lines.append(f"{command[:31]:<32}{calls:>7}{errors:>5}{total_ms / calls:>9.1f}{max_ms:>9.0f}")
+    await interaction.followup.send(
+        f"**Command usage — last {days} days**\n```\n" + "\n".join(lines) + "\n```", ephemeral=True
+    )
+
+# ---------- Event-loop watchdog (lag sampling + blocking-call attribution) ----------
+LOOP_SAMPLE_SECONDS = float(os.getenv("LOOP_SAMPLE_SECONDS", "0.1"))
+BLOCKING_THRESHOLD_MS = float(os.getenv("BLOCKING_THRESHOLD_MS", "250"))
+BLOCKING_LOG = os.getenv("BLOCKING_LOG", "blocking.log")
+
+class LoopWatchdog:
+    """Samples event-loop lag and catches callbacks that block it.
+
+    A heartbeat task sleeps LOOP_SAMPLE_SECONDS and records how late it woke. A
+    daemon thread checks the heartbeat; once it is overdue by the threshold, the
+    loop is stuck inside a callback, so the thread snapshots the loop thread's
+    stack and finds the Interaction being handled in it. The heartbeat closes the
+    stall with its full length when it finally runs. Cost: one wake-up per sample
+    on the loop and one on the thread; stacks are only taken during a stall.
+    """
+
+    def __init__(self, interval: float, threshold_ms: float, log_path: str):
+        self.interval = interval
+        self.threshold = threshold_ms / 1000
+        self.lags = collections.deque(maxlen=max(1, int(60 / interval)))   # last minute, in ms
+        self.by_command: dict[str, list] = {}   # command -> [count, total ms, max ms]
+        self.due = 0.0
+        self._caught = None                     # (command, stack) seen by the thread for the open stall
+        self._loop_thread = None
+        self._task = None
+        self.log = logging.getLogger("havenshelper.blocking")
+        self.log.propagate = False
+        self.log_path = log_path
+
+    def start(self):
+        if self._task is not None and not self._task.done():
+            return
+        if not self.log.handlers:
+            handler = logging.handlers.RotatingFileHandler(self.log_path, maxBytes=1_000_000, backupCount=3, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            self.log.addHandler(handler)
+            self.log.setLevel(logging.INFO)
+        self._loop_thread = threading.get_ident()
+        self.due = time.perf_counter() + self.interval
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        threading.Thread(target=self._watch, name="loop-watchdog", daemon=True).start()
+
+    async def _heartbeat(self):
+        while True:
+            self.due = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = time.perf_counter() - self.due
+            self.lags.append(lag * 1000)
+            if lag >= self.threshold:
+                self._close_stall(lag)
+
+    def _watch(self):
+        while self._task is not None and not self._task.done():
+            time.sleep(self.threshold / 2)
+            if self._caught is None and time.perf_counter() - self.due >= self.threshold:
+                frame = sys._current_frames().get(self._loop_thread)
+                if frame is not None:
+                    self._caught = (self._command_in(frame), "".join(traceback.format_stack(frame, limit=12)))
+
+    @staticmethod
+    def _command_in(frame) -> str:
+        # Innermost frame holding the Interaction being handled (handlers and helpers take it as `interaction`)
+        while frame is not None:
+            interaction = frame.f_locals.get("interaction")
+            if hasattr(interaction, "command") and hasattr(interaction, "extras"):
+                command = interaction.command
+                return "/" + (command.qualified_name if command else str((interaction.data or {}).get("name", "?")))
+            frame = frame.f_back
+        return "(no command)"
+
+    def _close_stall(self, lag: float):
+        command, stack = self._caught or ("(not caught)", "")
+        self._caught = None
+        ms = lag * 1000
+        stats = self.by_command.setdefault(command, [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += ms
+        stats[2] = max(stats[2], ms)
+        self.log.warning("event loop blocked %.0fms in %s\n%s", ms, command, stack)
+
+    def report(self) -> str:
+        if not self.lags:
+            return "not sampled yet"
+        lags = sorted(self.lags)
+        p = lambda q: lags[min(len(lags) - 1, int(q * len(lags)))]
+        line = f"lag p50 {p(0.5):.1f}ms, p99 {p(0.99):.1f}ms, max {lags[-1]:.0f}ms (last {len(lags) * self.interval:.0f}s)"
+        if not self.by_command:
+            return line + f"; no blocks over {self.threshold * 1000:.0f}ms"
+        worst = sorted(self.by_command.items(), key=lambda kv: kv[1][1], reverse=True)[:3]
+        blocks = ", ".join(f"{cmd} {n}× max {mx:.0f}ms" for cmd, (n, _, mx) in worst)
+        return line + f"; {sum(v[0] for v in self.by_command.values())} blocks over {self.threshold * 1000:.0f}ms: {blocks}"
+
+
+loop_watchdog = LoopWatchdog(LOOP_SAMPLE_SECONDS, BLOCKING_THRESHOLD_MS, BLOCKING_LOG)
+
+# ---------- On-demand profiling (/profile) ----------
+# Nothing is installed until an admin asks: cProfile hooks the event-loop thread for
+# the window, the sampler is a thread reading the loop thread's stack every few ms.
+PROFILE_SAMPLE_SECONDS = 0.005
+PROFILE_TOP = 15
+profile_lock = asyncio.Lock()
+
+def _is_loop_machinery(filename: str, func: str) -> bool:
+    # asyncio's own frames (and the poll the loop idles in) sit above every handler
+    return (f"{os.sep}asyncio{os.sep}" in filename or filename.endswith("selectors.py")
+            or func in ("<module>", "run_until_complete", "run_forever", "_run_once", "_run")
+            or "_contextvars" in func or "poll" in func or "select" in func)
+
+def _short_func(filename: str, line: int, func: str) -> str:
+    return f"{func} ({os.path.basename(filename)}:{line})" if filename != "~" else func
+
+async def _cprofile(seconds: int):
+    prof = cProfile.Profile()
+    prof.enable()   # profiles the whole thread, so every handler the loop runs meanwhile
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        prof.disable()
+    prof.create_stats()
+    rows = sorted(prof.stats.items(), key=lambda kv: kv[1][3], reverse=True)
+    idle = sum(tt for (filename, _, func), (_, _, tt, _, _) in prof.stats.items() if filename == "~" and "poll" in func)
+    lines = [f"{'cum ms':>8}{'own ms':>8}{'calls':>8}  function"]
+    for (filename, line, func), (_, calls, tt, ct, _) in rows:
+        if _is_loop_machinery(filename, func):
+            continue
+        lines.append(f"{ct * 1000:>8.0f}{tt * 1000:>8.0f}{calls:>8}  {_short_func(filename, line, func)[:60]}")
+        if len(lines) > PROFILE_TOP:
+            break
+    summary = f"loop idle {idle / seconds:.0%} of {seconds}s"
+    # The same marshalled dict cProfile.dump_stats writes: open with pstats, snakeviz, flameprof...
+    return summary, lines, marshal.dumps(prof.stats), "pstats"
+
+def _sample_stacks(thread_id: int, seconds: int) -> collections.Counter:
+    stacks = collections.Counter()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        frame = sys._current_frames().get(thread_id)
+        chain = []
+        while frame is not None:
+            code = frame.f_code
+            chain.append((code.co_filename, code.co_firstlineno, code.co_name))
+            frame = frame.f_back
+        stacks[tuple(reversed(chain))] += 1
+        time.sleep(PROFILE_SAMPLE_SECONDS)
+    return stacks
+
+async def _sample_profile(seconds: int):
+    stacks = await asyncio.to_thread(_sample_stacks, threading.get_ident(), seconds)
+    total = sum(stacks.values()) or 1
+    inclusive = collections.Counter()
+    for stack, n in stacks.items():
+        for frame in set(stack):
+            inclusive[frame] += n
+    idle = sum(n for stack, n in stacks.items() if stack and stack[-1][0].endswith("selectors.py"))
+    lines = [f"{'samples':>8}{'share':>8}  function"]
+    for (filename, line, func), n in inclusive.most_common():
+        if _is_loop_machinery(filename, func) or filename.startswith("<"):
+            continue
+        lines.append(f"{n:>8}{n / total:>8.1%}  {_short_func(filename, line, func)[:60]}")
+        if len(lines) > PROFILE_TOP:
+            break
+    # Collapsed stacks, one "outer;...;inner count" line each: flamegraph.pl and speedscope read this
+    folded = "\n".join(";".join(_short_func(*f) for f in stack) + f" {n}" for stack, n in stacks.items())
+    summary = f"loop idle {idle / total:.0%} of {total} samples over {seconds}s"
+    return summary, lines, folded.encode("utf-8"), "folded"
+
+@bot.tree.command(name="profile", description="Profiles the bot for a few seconds and reports the hot spots (Admin only).")
+@app_commands.default_permissions(administrator=True)
+@app_commands.checks.has_permissions(administrator=True)
+async def profile_command(interaction: discord.Interaction, seconds: app_commands.Range[int, 5, 120] = 30,
+                          mode: Literal["cprofile", "sample"] = "cprofile"):
+    if profile_lock.locked():
+        await interaction.response.send_message("A profile is already running, try again when it finishes.", ephemeral=True)
+        return
+    async with profile_lock:
+        await interaction.response.defer(thinking=True, ephemeral=True)
+        summary, lines, data, ext = await (_cprofile(seconds) if mode == "cprofile" else _sample_profile(seconds))
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+        scope = f", this process only (shards {', '.join(map(str, sorted(bot.shards)))})" if SHARD_COUNT else ""
+        await interaction.followup.send(
+            f"**Profile ({mode}) — {summary}{scope}**\n```\n" + "\n".join(lines) + "\n```",
+            file=discord.File(io.BytesIO(data), filename=f"profile-{stamp}.{ext}"),
+            ephemeral=True
+        )
 
 
 
@@ -1195,10 +2829,19 @@ def _range_label(scope: str, month: int | None, year: int | None) -> str:
     return "All-time"
 
 # Compute WHERE clause + params for the chosen scope
-def _thanks_where(scope: str, month: int | None, year: int | None):
-    where = []
-    params = []
-    if scope == "last30":
+def _thanks_where(guild_id: int, scope: str, month: int | None, year: int | None,
+                  start: datetime | None = None, end: datetime | None = None):
+    where = ["guild_id = ?"]
+    params = [guild_id]
+    if start or end:
+        # explicit [start, end) range, either side may be open
+        if start:
+            where.append("timestamp >= ?")
+            params.append(start.strftime("%Y-%m-%d %H:%M:%S"))
+        if end:
+            where.append("timestamp < ?")
+            params.append(end.strftime("%Y-%m-%d %H:%M:%S"))
+    elif scope == "last30":
         # last 30 days rolling
         dt_to = datetime.now(timezone.utc)
         dt_from = dt_to - timedelta(days=30)
@@ -1214,130 +2857,125 @@ def _thanks_where(scope: str, month: int | None, year: int | None):
             end = datetime(year, month + 1, 1, tzinfo=timezone.utc)
         where.append("timestamp >= ? AND timestamp < ?")
         params.extend([start.strftime("%Y-%m-%d %H:%M:%S"), end.strftime("%Y-%m-%d %H:%M:%S")])
-    # else all-time → no filter
-    return (" WHERE " + " AND ".join(where)) if where else "", params
+    # else all-time → guild filter only
+    return " WHERE " + " AND ".join(where), params
 
-def _query_top_thanked_paginated(limit: int, offset: int, scope: str, month: int | None, year: int | None):
-    where_sql, params = _thanks_where(scope, month, year)
+def _query_top_thanked_paginated(guild_id: int, limit: int, offset: int, scope: str, month: int | None, year: int | None):
+    where_sql, params = _thanks_where(guild_id, scope, month, year)
+    # Aggregate first, then join only the page's users for their current names
     sql = f"""
-        SELECT thanked_user_id AS user_id,
-               MAX(thanked_user_name) AS name,
-               COUNT(*) AS thank_count
-        FROM thanks
-        {where_sql}
-        GROUP BY thanked_user_id
-        ORDER BY thank_count DESC
-        LIMIT ? OFFSET ?
+        SELECT t.user_id, u.user_name AS name, t.thank_count
+        FROM (
+            SELECT thanked_user_id AS user_id, COUNT(*) AS thank_count
+            FROM thanks
+            {where_sql}
+            GROUP BY thanked_user_id
+            ORDER BY thank_count DESC
+            LIMIT ? OFFSET ?
+        ) t
+        JOIN users u ON u.id = t.user_id
+        ORDER BY t.thank_count DESC
     """
     cur = conn.execute(sql, (*params, limit, offset))
     rows = cur.fetchall()
     return [{"user_id": r[0], "name": r[1], "thank_count": r[2]} for r in rows]
 
-def _count_distinct_thanked(scope: str, month: int | None, year: int | None) -> int:
-    where_sql, params = _thanks_where(scope, month, year)
+def _count_distinct_thanked(guild_id: int, scope: str, month: int | None, year: int | None) -> int:
+    where_sql, params = _thanks_where(guild_id, scope, month, year)
     sql = f"SELECT COUNT(DISTINCT thanked_user_id) FROM thanks {where_sql}"
     return int(conn.execute(sql, params).fetchone()[0])
 
 # ===== View (buttons + select), only in all-time mode =========================
+# Scope and page live in the custom_ids; clicks re-query that one page.
 
 class MostThankedView(discord.ui.View):
-    def __init__(self, guild: discord.Guild, scope: str = "all", page: int = 0):
-        super().__init__(timeout=300)
-        self.guild = guild
-        self.scope = scope            # "all" or "last30"
-        self.page = page              # 0-based
-        # Only show components in ALL-TIME mode
-        if self.scope in ("all", "last30"):
-            self._wire_components()
-
-    def _wire_components(self):
-        # Quick range select (only in all-time view)
-        self.add_item(self.RangeSelect(self))
-        # Prev/Next buttons (only useful in all-time/all-range modes)
-        self.add_item(self.PrevButton(self))
-        self.add_item(self.NextButton(self))
-
-    def _sync_controls(self, total_users: int, limit: int, offset: int, rows_len: int):
-        # Prev/Next enable/disable
-        for item in self.children:
-            if isinstance(item, MostThankedView.PrevButton):
-                item.disabled = (self.page == 0)
-            if isinstance(item, MostThankedView.NextButton):
-                item.disabled = (offset + rows_len >= total_users)
-
-        # Update select defaults + placeholder to match current scope
-        for item in self.children:
-            if isinstance(item, MostThankedView.RangeSelect):
-                for opt in item.options:
-                    opt.default = (opt.value == self.scope)
-                item.placeholder = "Last 30 days" if self.scope == "last30" else "All-time"
-
-    # -- Components ------------------------------------------------------------
-
-    class RangeSelect(discord.ui.Select):
-        def __init__(self, parent: "MostThankedView"):
-            self.parent = parent
-            options = [
-                discord.SelectOption(label="All-time", value="all", default=(parent.scope == "all")),
-                discord.SelectOption(label="Last 30 days", value="last30", default=(parent.scope == "last30")),
-            ]
-            super().__init__(placeholder="All-time", min_values=1, max_values=1, options=options)
-
-        async def callback(self, interaction: discord.Interaction):
-            await interaction.response.defer(thinking=True)
-            self.parent.scope = self.values[0]
-            self.parent.page = 0  # reset to first page
-            await self.parent._rerender(interaction)
-
-    class PrevButton(discord.ui.Button):
-        def __init__(self, parent: "MostThankedView"):
-            super().__init__(label="Prev", style=discord.ButtonStyle.secondary)
-            self.parent = parent
-
-        async def callback(self, interaction: discord.Interaction):
-            if self.parent.page > 0:
-                await interaction.response.defer(thinking=True)
-                self.parent.page -= 1
-                await self.parent._rerender(interaction)
-
-    class NextButton(discord.ui.Button):
-        def __init__(self, parent: "MostThankedView"):
-            super().__init__(label="Next", style=discord.ButtonStyle.secondary)
-            self.parent = parent
-
-        async def callback(self, interaction: discord.Interaction):
-            await interaction.response.defer(thinking=True)
-            self.parent.page += 1
-            await self.parent._rerender(interaction)
-
-    # -- Rerender --------------------------------------------------------------
-
-    async def _rerender(self, interaction: discord.Interaction):
-        limit = 10
-        offset = self.page * limit
-        total_users = _count_distinct_thanked(scope=self.scope, month=None, year=None)
-        rows = _query_top_thanked_paginated(limit, offset, scope=self.scope, month=None, year=None)
-
-        self._sync_controls(total_users=total_users, limit=limit, offset=offset, rows_len=len(rows))
-
-        # Disable buttons if needed
-        start_index = offset + 1
-        end_index = offset + len(rows)
-        # Find our buttons in the view
-        for item in self.children:
-            if isinstance(item, MostThankedView.PrevButton):
-                item.disabled = (self.page == 0)
-            if isinstance(item, MostThankedView.NextButton):
-                item.disabled = (end_index >= total_users)
-
-        title = f"Most thanked — {_range_label(self.scope, None, None)}"
-        offset = self.page * limit
-        rows = _query_top_thanked_paginated(limit, offset, scope=self.scope, month=None, year=None)
-        file = await render_most_thanked_table(self.guild, rows,title_text=title, start_rank=offset + 1)
-        #file = await render_most_thanked_table(self.guild, rows, title_text=title)
-
-        embed = discord.Embed(color=discord.Color.teal()).set_image(url="attachment://mostthanked.png")
-        await interaction.edit_original_response(embed=embed, attachments=[file], view=self)
+    def __init__(self, scope: str = "all", page: int = 0, last_page: int = 0):
+        super().__init__(timeout=None)
+        # Quick range select + Prev/Next (all-time / last 30 days modes only)
+        self.add_item(MostThankedRange(scope))
+        self.add_item(MostThankedPage(scope, max(page - 1, 0), "p", disabled=(page <= 0)))
+        self.add_item(MostThankedPage(scope, min(page + 1, last_page), "n", disabled=(page >= last_page)))
+
+
+# Rendered pages (PNG bytes): the query + PIL render is the most expensive thing a
+# click does, and the same page is usually requested many times between thanks.
+# Keyed (guild id, scope, page) and versioned by the guild's thanks_versions row;
+# the TTL covers "last 30 days" moving on and avatar changes.
+def _thanks_version(key):
+    row = conn.execute("SELECT version FROM thanks_versions WHERE guild_id = ?", (key[0],)).fetchone()
+    return row[0] if row else None
+
+leaderboard_cache = GenerationCache(size=64, ttl=300, version=_thanks_version)
+
+async def _most_thanked_page(guild: discord.Guild, scope: str, page: int):
+    limit = 10
+    key = (guild.id, scope, page)
+    cached = leaderboard_cache.get(key)
+    if cached is None:
+        total_users = _count_distinct_thanked(guild.id, scope=scope, month=None, year=None)
+        last_page = max(0, math.ceil(total_users / limit) - 1)
+        page = max(0, min(page, last_page))
+        offset = page * limit
+        rows = _query_top_thanked_paginated(guild.id, limit, offset, scope=scope, month=None, year=None)
+
+        title = f"Most thanked — {_range_label(scope, None, None)}"
+        file = await render_most_thanked_table(guild, rows, title_text=title, start_rank=offset + 1)
+        cached = (file.fp.getvalue(), page, last_page)
+        leaderboard_cache.put(key, cached)
+
+    png, page, last_page = cached
+    file = discord.File(io.BytesIO(png), filename="mostthanked.png")
+    embed = discord.Embed(color=discord.Color.teal()).set_image(url="attachment://mostthanked.png")
+    return embed, file, MostThankedView(scope, page, last_page)
+
+
+class MostThankedRange(discord.ui.DynamicItem[discord.ui.Select], template=r"mt:range"):
+    def __init__(self, scope: str = "all"):
+        options = [
+            discord.SelectOption(label="All-time", value="all", default=(scope == "all")),
+            discord.SelectOption(label="Last 30 days", value="last30", default=(scope == "last30")),
+        ]
+        super().__init__(discord.ui.Select(
+            placeholder="Last 30 days" if scope == "last30" else "All-time",
+            min_values=1, max_values=1, options=options, custom_id="mt:range",
+        ))
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Select, match):
+        return cls()
+
+    async def callback(self, interaction: discord.Interaction):
+        scope = (interaction.data.get("values") or ["all"])[0]
+        scope = scope if scope in ("all", "last30") else "all"
+        await interaction.response.defer(thinking=True)
+        embed, file, view = await _most_thanked_page(interaction.guild, scope, 0)  # reset to first page
+        await interaction.edit_original_response(embed=embed, attachments=[file], view=view)
+
+
+class MostThankedPage(discord.ui.DynamicItem[discord.ui.Button],
+                      template=r"mt:(?P<scope>all|last30):(?P<page>\d+):(?P<dir>[pn])"):
+    def __init__(self, scope: str, page: int, direction: str, disabled: bool = False):
+        super().__init__(discord.ui.Button(
+            label="Prev" if direction == "p" else "Next",
+            style=discord.ButtonStyle.secondary,
+            custom_id=f"mt:{scope}:{page}:{direction}",
+            disabled=disabled,
+        ))
+        self.scope = scope
+        self.page = page
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(match["scope"], int(match["page"]), match["dir"])
+
+    async def callback(self, interaction: discord.Interaction):
+        await interaction.response.defer(thinking=True)
+        embed, file, view = await _most_thanked_page(interaction.guild, self.scope, self.page)
+        await interaction.edit_original_response(embed=embed, attachments=[file], view=view)
+
+
+# Persistent components: any click on these custom_ids is routed here, even after a restart
+bot.add_dynamic_items(PageButton, GameGroupButton, MostThankedRange, MostThankedPage)
 
 
 # ---------- tiny font helper (tries DejaVu, falls back to default) ----------
@@ -1386,12 +3024,7 @@ async def render_most_thanked_table(guild: discord.Guild, rows: list[dict], titl
     async with aiohttp.ClientSession() as session:
         avatar_bytes: list[bytes | None] = []
         for r in rows[:rows_to_draw]:
-            member = guild.get_member(int(r["user_id"]))
-            if member is None:
-                try:
-                    member = await guild.fetch_member(int(r["user_id"]))
-                except Exception:
-                    member = None
+            member = await member_cache.get(guild, int(r["user_id"]))
             if member:
                 try:
                     async with session.get(str(member.display_avatar.url)) as resp:
@@ -1413,13 +3046,8 @@ async def render_most_thanked_table(guild: discord.Guild, rows: list[dict], titl
         user_id = int(r["user_id"])
         count = int(r["thank_count"])
 
-        member = guild.get_member(user_id)
-        if member is None:
-            try:
-                member = await guild.fetch_member(user_id)
-            except Exception:
-                member = None
-        display = member.display_name if member else (r.get("name") or f"User {user_id}")
+        # Name comes from the users table (kept current by the name-sync listeners)
+        display = r.get("name") or f"User {user_id}"
 
         # Avatar
         if avatar_bytes[j]:
@@ -1454,17 +3082,21 @@ async def render_most_thanked_table(guild: discord.Guild, rows: list[dict], titl
 
 
 # ---------- DB query helper ----------
-def _query_top_thanked(limit: int = 10):
+def _query_top_thanked(guild_id: int, limit: int = 10):
     sql = """
-        SELECT thanked_user_id AS user_id,
-               MAX(thanked_user_name) AS name,
-               COUNT(*) AS thank_count
-        FROM thanks
-        GROUP BY thanked_user_id
-        ORDER BY thank_count DESC
-        LIMIT ?
+        SELECT t.user_id, u.user_name AS name, t.thank_count
+        FROM (
+            SELECT thanked_user_id AS user_id, COUNT(*) AS thank_count
+            FROM thanks
+            WHERE guild_id = ?
+            GROUP BY thanked_user_id
+            ORDER BY thank_count DESC
+            LIMIT ?
+        ) t
+        JOIN users u ON u.id = t.user_id
+        ORDER BY t.thank_count DESC
     """
-    cur = conn.execute(sql, (limit,))
+    cur = conn.execute(sql, (guild_id, limit))
     rows = cur.fetchall()
     return [{"user_id": r[0], "name": r[1], "thank_count": r[2]} for r in rows]
 
@@ -1485,7 +3117,7 @@ async def most_thanked_table(interaction: discord.Interaction, month: int | None
     if month and year:
         # Specific month view (no components)
         scope = "month"
-        rows = _query_top_thanked_paginated(limit=10, offset=0, scope=scope, month=month, year=year)
+        rows = _query_top_thanked_paginated(interaction.guild_id, limit=10, offset=0, scope=scope, month=month, year=year)
         if not rows:
             label = _range_label(scope, month, year)
             await interaction.followup.send(f"No thanks recorded for **{label}**.", ephemeral=True)
@@ -1497,28 +3129,800 @@ async def most_thanked_table(interaction: discord.Interaction, month: int | None
         await interaction.followup.send(embed=embed, file=file)
 
     else:
-        # All-time view with components (dropdown + pagination)
-        view = MostThankedView(interaction.guild, scope="all", page=0)
-        # Prime the first render via the same code path used by callbacks
-        # (so buttons are properly enabled/disabled)
-        limit = 10
-        rows = _query_top_thanked_paginated(limit=limit, offset=0, scope="all", month=None, year=None)
-        if not rows:
+        # All-time view with components (dropdown + pagination), same code path as the clicks
+        if not _count_distinct_thanked(interaction.guild_id, scope="all", month=None, year=None):
             await interaction.followup.send("No thanks recorded yet.", ephemeral=True)
             return
-        total = _count_distinct_thanked(scope="all", month=None, year=None)
-        # Set initial disable state
-        for item in view.children:
-            if isinstance(item, MostThankedView.PrevButton):
-                item.disabled = True
-            if isinstance(item, MostThankedView.NextButton):
-                item.disabled = (len(rows) >= total and len(rows) <= 10)
-
-        title = f"Most thanked — {_range_label('all', None, None)}"
-        file = await render_most_thanked_table(interaction.guild, rows, title_text=title)
-        embed = discord.Embed(color=discord.Color.teal()).set_image(url="attachment://mostthanked.png")
+        embed, file, view = await _most_thanked_page(interaction.guild, "all", 0)
         await interaction.followup.send(embed=embed, file=file, view=view)
 
+# ---------- Daily thanks rollups + trend chart ----------
+ROLLUP_INTERVAL_MINUTES = float(os.getenv("ROLLUP_INTERVAL_MINUTES", "10"))
+ROLLUP_BATCH = 50_000      # thanks rows per transaction, so the write lock is only held briefly
+
+# Each statement folds the thanks rows with last_id < id <= upto into one rollup.
+# Game names go through the alias keys, so "bo4" and "Black Ops 4" count as one game id.
+ROLLUP_SQL = [
+    """INSERT INTO thanks_daily (guild_id, day, thanks)
+       SELECT guild_id, substr(timestamp, 1, 10), COUNT(*) FROM thanks
+       WHERE id > :last AND id <= :upto
+       GROUP BY guild_id, substr(timestamp, 1, 10)
+       ON CONFLICT(guild_id, day) DO UPDATE SET thanks = thanks + excluded.thanks""",
+    """INSERT INTO thanks_daily_users (guild_id, day, user_id, thanks)
+       SELECT guild_id, substr(timestamp, 1, 10), thanked_user_id, COUNT(*) FROM thanks
+       WHERE id > :last AND id <= :upto
+       GROUP BY guild_id, substr(timestamp, 1, 10), thanked_user_id
+       ON CONFLICT(guild_id, day, user_id) DO UPDATE SET thanks = thanks + excluded.thanks""",
+    """INSERT INTO thanks_daily_games (guild_id, day, game_id, game, thanks)
+       SELECT guild_id, day, game_id, CASE game_id WHEN 0 THEN name ELSE '' END AS game, COUNT(*)
+       FROM (
+           SELECT t.guild_id, substr(t.timestamp, 1, 10) AS day, TRIM(t.game) AS name,
+                  IFNULL((SELECT a.game_id FROM game_aliases a
+                          WHERE a.guild_id = t.guild_id AND a.alias_key = game_key(t.game)), 0) AS game_id
+           FROM thanks t
+           WHERE t.id > :last AND t.id <= :upto AND TRIM(IFNULL(t.game, '')) <> ''
+       )
+       WHERE true
+       GROUP BY guild_id, day, game_id, game
+       ON CONFLICT(guild_id, day, game_id, game) DO UPDATE SET thanks = thanks + excluded.thanks""",
+]
+
+def _roll_up(db: sqlite3.Connection, name: str, source: str, statements: list[str]) -> int:
+    """Runs `statements` over the rows of `source` past rollup_state[name]; returns how many rows it read."""
+    done = 0
+    while True:
+        # IMMEDIATE: no other writer can slip a lower id in between reading the mark and moving it
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute("SELECT last_id FROM rollup_state WHERE name = ?", (name,)).fetchone()
+            last = row[0] if row else 0
+            upto, count = db.execute(
+                f"SELECT MAX(id), COUNT(*) FROM (SELECT id FROM {source} WHERE id > ? ORDER BY id LIMIT ?)",
+                (last, ROLLUP_BATCH)
+            ).fetchone()
+            if not count:
+                db.rollback()
+                return done
+            for sql in statements:
+                db.execute(sql, {"last": last, "upto": upto})
+            db.execute(
+                "INSERT INTO rollup_state (name, last_id) VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET last_id = excluded.last_id",
+                (name, upto)
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        done += count
+
+def roll_up_thanks(db: sqlite3.Connection) -> int:
+    """Rolls thanks past the high-water mark into the daily tables."""
+    db.create_function("game_key", 1, game_key, deterministic=True)
+    return _roll_up(db, "thanks", "thanks", ROLLUP_SQL)
+
+def _run_rollups():
+    # Own connection: runs in a worker thread
+    db = sqlite3.connect(DB_PATH, timeout=30)
+    try:
+        roll_up_thanks(db)
+        roll_up_usage(db)
+        prune_feedback_searches(db)
+    finally:
+        db.close()
+
+@tasks.loop(minutes=ROLLUP_INTERVAL_MINUTES)
+async def rollup_task():
+    await asyncio.to_thread(_run_rollups)
+
+def _trend_bucket(day: str, by: str) -> str:
+    d = datetime.strptime(day, "%Y-%m-%d")
+    if by == "week":
+        d -= timedelta(days=d.weekday())     # weeks start on Monday
+    elif by == "month":
+        d = d.replace(day=1)
+    return d.strftime("%Y-%m-%d")
+
+def _query_thanks_trend(guild_id: int, since: str, user_id: str | None = None,
+                        game_id: int | None = None, game: str | None = None) -> list[tuple[str, int]]:
+    """(day, thanks) rows from the rollups, one per day with thanks.
+
+    A game is given by id, or by `game` (as typed) when the name matches no game.
+    """
+    if user_id:
+        sql, params = "SELECT day, thanks FROM thanks_daily_users WHERE guild_id = ? AND user_id = ? AND day >= ?", (guild_id, user_id, since)
+    elif game_id or game:
+        sql, params = ("SELECT day, thanks FROM thanks_daily_games WHERE guild_id = ? AND game_id = ? AND game = ? AND day >= ?",
+                       (guild_id, game_id or 0, "" if game_id else game, since))
+    else:
+        sql, params = "SELECT day, thanks FROM thanks_daily WHERE guild_id = ? AND day >= ?", (guild_id, since)
+    return conn.execute(sql + " ORDER BY day", params).fetchall()
+
+def _query_trend_leaders(guild_id: int, since: str, limit: int = 3):
+    """Top helpers and games over the range, from the rollups."""
+    helpers = conn.execute(
+        """SELECT u.user_name, t.total FROM (
+               SELECT user_id, SUM(thanks) AS total FROM thanks_daily_users
+               WHERE guild_id = ? AND day >= ? GROUP BY user_id ORDER BY total DESC LIMIT ?
+           ) t JOIN users u ON u.id = t.user_id ORDER BY t.total DESC""",
+        (guild_id, since, limit)
+    ).fetchall()
+    games = conn.execute(
+        """SELECT IFNULL(g.game_name, t.game), t.total FROM (
+               SELECT game_id, game, SUM(thanks) AS total FROM thanks_daily_games
+               WHERE guild_id = ? AND day >= ? GROUP BY game_id, game ORDER BY total DESC LIMIT ?
+           ) t LEFT JOIN games g ON g.id = t.game_id ORDER BY t.total DESC""",
+        (guild_id, since, limit)
+    ).fetchall()
+    return helpers, games
+
+def render_thanks_trend(title_text: str, buckets: list[tuple[str, int]]) -> discord.File:
+    W, H = 900, 420
+    left, right, top, bottom = 70, 30, 80, 60
+
+    bg = (22, 27, 34)
+    accent = (0, 200, 180)
+    sub = (170, 180, 190)
+
+    im = Image.new("RGB", (W, H), bg)
+    draw = ImageDraw.Draw(im)
+    title_font = _load_font(32, bold=True)
+    small_font = _load_font(18, bold=False)
+
+    draw.text((40, 22), title_text, font=title_font, fill=(210, 240, 240))
+
+    max_count = max((n for _, n in buckets), default=0) or 1
+    plot_w, plot_h = W - left - right, H - top - bottom
+    draw.line([left, top + plot_h, W - right, top + plot_h], fill=(60, 70, 80), width=2)
+    draw.text((10, top - 8), str(max_count), font=small_font, fill=sub)
+    draw.text((10, top + plot_h - 12), "0", font=small_font, fill=sub)
+
+    slot = plot_w / max(len(buckets), 1)
+    label_every = max(1, math.ceil(len(buckets) / 8))     # at most ~8 date labels
+    for i, (label, count) in enumerate(buckets):
+        x0 = left + i * slot + slot * 0.15
+        x1 = left + (i + 1) * slot - slot * 0.15
+        bar_h = plot_h * count / max_count
+        if count:
+            draw.rectangle([x0, top + plot_h - bar_h, max(x1, x0 + 1), top + plot_h], fill=accent)
+        if i % label_every == 0:
+            draw.text((x0, top + plot_h + 10), label[5:] if len(buckets) > 12 else label, font=small_font, fill=sub)
+
+    buf = io.BytesIO()
+    im.save(buf, format="PNG")
+    buf.seek(0)
+    return discord.File(buf, filename="thankstrend.png")
+
+@bot.tree.command(name="thankstrend", description="Chart of thanks over time, for the server, a helper or a game.")
+@app_commands.describe(by="Bar size", days="How far back to go", user="Only thanks to this helper", game="Only thanks for this game")
+@app_commands.autocomplete(game=_game_autocomplete)
+async def thanks_trend(interaction: discord.Interaction, by: Literal["day", "week", "month"] = "week",
+                       days: app_commands.Range[int, 7, 1095] = 365,
+                       user: discord.Member = None, game: str = None):
+    await interaction.response.defer(thinking=True)
+
+    today = datetime.now(timezone.utc).date()
+    since = (today - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+    subject = interaction.guild.name
+    game_id = None
+    if game:
+        resolved = _resolve_game(interaction.guild_id, game)
+        game_id, game = resolved if resolved else (None, game.strip())
+        subject = game
+    if user:
+        subject = user.display_name
+    rows = _query_thanks_trend(interaction.guild_id, since, str(user.id) if user else None, game_id, game)
+
+    # Every bucket in the range, including empty ones
+    counts = {}
+    d = datetime.strptime(since, "%Y-%m-%d").date()
+    while d <= today:
+        counts.setdefault(_trend_bucket(d.strftime("%Y-%m-%d"), by), 0)
+        d += timedelta(days=1)
+    for day, n in rows:
+        counts[_trend_bucket(day, by)] = counts.get(_trend_bucket(day, by), 0) + n
+    buckets = sorted(counts.items())
+    total = sum(n for _, n in buckets)
+
+    file = render_thanks_trend(f"Thanks per {by} — {subject}", buckets)
+    embed = discord.Embed(color=discord.Color.teal()).set_image(url="attachment://thankstrend.png")
+    embed.description = f"**{total}** thanks in the last {days} days."
+    if not (user or game):
+        helpers, games = _query_trend_leaders(interaction.guild_id, since)
+        if helpers:
+            embed.add_field(name="Most thanked", value="\n".join(f"{name} ({n})" for name, n in helpers))
+        if games:
+            embed.add_field(name="Top games", value="\n".join(f"{name} ({n})" for name, n in games))
+    embed.set_footer(text=f"Updated every {ROLLUP_INTERVAL_MINUTES:g} minutes")
+    await interaction.followup.send(embed=embed, file=file)
+
+# ---------- Bulk import / export (games catalog + helper roster) ----------
+BULK_BATCH_SIZE = 500
+EXPORT_PART_BYTES = 8 * 1024 * 1024   # split exports so each attachment stays under Discord's upload limit
+PLATFORMS = ("Xbox", "PC", "PlayStation")
+
+BULK_FIELDS = {
+    "games":   ["game_name", "description", "guide_url"],
+    "helpers": ["user_id", "user_name", "game_name", "platform", "status"],
+}
+
+def _format_for(path: str) -> str:
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+def _iter_records(stream, fmt: str):
+    """Yields (line_no, record) one row at a time; record is an error string if the row can't be parsed."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    # JSON Lines; a JSON array written one object per line is accepted too
+    for line_no, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line or line in ("[", "]"):
+            continue
+        try:
+            record = json.loads(line.rstrip(","))
+        except json.JSONDecodeError as e:
+            yield line_no, f"invalid JSON ({e.msg})"
+            continue
+        yield line_no, record if isinstance(record, dict) else "expected a JSON object"
+
+def _clean(record: dict, key: str) -> str | None:
+    value = record.get(key)
+    value = str(value).strip() if value is not None else ""
+    return value or None
+
+def _flush_games(db: sqlite3.Connection, guild_id: int, batch: list[tuple]) -> int:
+    db.executemany(
+        """INSERT INTO games (guild_id, game_name, description, guide_url) VALUES (?, ?, ?, ?)
+           ON CONFLICT(guild_id, game_name) DO UPDATE SET
+               description = COALESCE(excluded.description, games.description),
+               guide_url   = COALESCE(excluded.guide_url, games.guide_url)""",
+        [(guild_id, *row) for row in batch]
+    )
+    names = sorted({row[0] for row in batch})
+    marks = ",".join("?" * len(names))
+    _index_game_names(db, db.execute(
+        f"SELECT guild_id, id, game_name FROM games WHERE guild_id = ? AND game_name IN ({marks})", (guild_id, *names)
+    ).fetchall())
+    return len(batch)
+
+def _resolve_game_ids(db: sqlite3.Connection, guild_id: int, names) -> dict[str, int]:
+    """_resolve_game for many names in one query; returns {name: game id} for those found."""
+    rows = db.execute(
+        '''SELECT j.key, COALESCE(
+               (SELECT id FROM games WHERE guild_id = :guild_id AND game_name = j.key COLLATE NOCASE),
+               (SELECT game_id FROM game_aliases WHERE guild_id = :guild_id AND alias_key = j.value))
+           FROM json_each(:names) j''',
+        {"guild_id": guild_id, "names": json.dumps({name: game_key(name) for name in names})}
+    ).fetchall()
+    return {name: game_id for name, game_id in rows if game_id is not None}
+
+def _flush_helpers(db: sqlite3.Connection, guild_id: int, batch: list[tuple], errors: list[str]) -> int:
+    # One lookup per batch resolves every game name in it, the same way commands do
+    game_ids = _resolve_game_ids(db, guild_id, {row[3] for row in batch})
+
+    rows, statuses = [], []
+    for line_no, user_id, user_name, game_name, platform, status in batch:
+        game_id = game_ids.get(game_name)
+        if game_id is None:
+            errors.append(f"line {line_no}: unknown game '{game_name}'")
+            continue
+        rows.append((guild_id, user_id, user_name, game_id, platform))
+        if status:
+            statuses.append((status, user_id))
+    cur = db.executemany(
+        "INSERT INTO helpers (guild_id, user_id, user_name, game_id, platform) VALUES (?, ?, ?, ?, ?) ON CONFLICT DO NOTHING",
+        rows
+    )
+    if statuses:
+        db.executemany("UPDATE users SET status = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?", statuses)
+    return max(cur.rowcount, 0)
+
+def bulk_import(db: sqlite3.Connection, guild_id: int, kind: str, stream, fmt: str, progress=None) -> dict:
+    """Streams CSV / JSON Lines rows into one guild's games or helpers.
+
+    Rows are validated one at a time and written with executemany in batches of
+    BULK_BATCH_SIZE, each batch in its own transaction so the write lock is only
+    held briefly. Bad rows are skipped and reported instead of aborting the run.
+    """
+    stats = {"read": 0, "written": 0, "errors": []}
+    batch: list[tuple] = []
+
+    def flush():
+        if not batch:
+            return
+        try:
+            if kind == "games":
+                stats["written"] += _flush_games(db, guild_id, batch)
+            else:
+                stats["written"] += _flush_helpers(db, guild_id, batch, stats["errors"])
+            db.commit()
+        except sqlite3.DatabaseError:
+            db.rollback()
+            raise
+        batch.clear()
+        if progress:
+            progress(stats)
+
+    for line_no, record in _iter_records(stream, fmt):
+        stats["read"] += 1
+        if isinstance(record, str):
+            stats["errors"].append(f"line {line_no}: {record}")
+            continue
+
+        game_name = _clean(record, "game_name")
+        if not game_name:
+            stats["errors"].append(f"line {line_no}: missing game_name")
+            continue
+
+        if kind == "games":
+            batch.append((game_name, _clean(record, "description"), _clean(record, "guide_url")))
+        else:
+            user_id = _clean(record, "user_id")
+            platform = _clean(record, "platform")
+            status = (_clean(record, "status") or "").lower() or None
+            if not user_id or not user_id.isdigit():
+                stats["errors"].append(f"line {line_no}: user_id must be a Discord user id")
+                continue
+            if platform and platform not in PLATFORMS:
+                stats["errors"].append(f"line {line_no}: platform must be one of {', '.join(PLATFORMS)}")
+                continue
+            if status and status not in ("green", "amber", "red"):
+                stats["errors"].append(f"line {line_no}: status must be green, amber or red")
+                continue
+            batch.append((line_no, user_id, _clean(record, "user_name") or user_id, game_name, platform, status))
+
+        if len(batch) >= BULK_BATCH_SIZE:
+            flush()
+    flush()
+    return stats
+
+def _export_rows(db: sqlite3.Connection, guild_id: int, kind: str):
+    """Yields export rows straight off the cursor (never materialises the table)."""
+    if kind == "games":
+        cur = db.execute(
+            "SELECT game_name, description, guide_url FROM games WHERE guild_id = ? ORDER BY game_name COLLATE NOCASE",
+            (guild_id,)
+        )
+    else:
+        cur = db.execute("""
+            SELECT h.user_id, u.user_name, g.game_name, h.platform, u.status
+            FROM games g
+            JOIN helpers h ON h.game_id = g.id
+            JOIN users u ON u.id = h.user_id
+            WHERE g.guild_id = ?
+            ORDER BY g.game_name COLLATE NOCASE, u.user_name COLLATE NOCASE
+        """, (guild_id,))
+    yield from cur
+
+def _csv_lines(header: list[str], rows):
+    """Yields CSV text one line at a time, header first, without building the file in memory."""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    def line(values):
+        writer.writerow(values)
+        text = out.getvalue()
+        out.seek(0)
+        out.truncate()
+        return text
+    yield line(header)
+    for row in rows:
+        yield line(row)
+
+def _export_lines(db: sqlite3.Connection, guild_id: int, kind: str, fmt: str):
+    """Yields the export one line at a time; for CSV the first line is the header."""
+    fields = BULK_FIELDS[kind]
+    if fmt == "csv":
+        yield from _csv_lines(fields, _export_rows(db, guild_id, kind))
+    else:
+        for row in _export_rows(db, guild_id, kind):
+            yield json.dumps(dict(zip(fields, row)), ensure_ascii=False) + "\n"
+
+def bulk_export(db: sqlite3.Connection, guild_id: int, kind: str, fmt: str,
+                part_bytes: int = EXPORT_PART_BYTES) -> tuple[list, int]:
+    """Streams the export into temp files of at most part_bytes each (CSV parts repeat the header)."""
+    lines = _export_lines(db, guild_id, kind, fmt)
+    header = next(lines).encode("utf-8") if fmt == "csv" else b""
+    parts, rows = [], 0
+    current = None
+    for line in lines:
+        data = line.encode("utf-8")
+        if current is None or current.tell() + len(data) > part_bytes:
+            current = tempfile.TemporaryFile()
+            current.write(header)
+            parts.append(current)
+        current.write(data)
+        rows += 1
+    for part in parts:
+        part.seek(0)
+    return parts, rows
+
+
+@bot.tree.command(name="importdata", description="Bulk import games or helpers from a CSV / JSON Lines file (Admin only).")
+@app_commands.describe(kind="What the file contains", file="CSV with a header row, or JSON Lines (one object per line)")
+@app_commands.default_permissions(administrator=True)
+@app_commands.checks.has_permissions(administrator=True)
+async def import_data(interaction: discord.Interaction, kind: Literal["games", "helpers"], file: discord.Attachment):
+    await interaction.response.defer(thinking=True, ephemeral=True)
+    fmt = _format_for(file.filename)
+
+    # Stream the upload to a temp file instead of holding it in memory
+    spool = tempfile.TemporaryFile()
+    async with aiohttp.ClientSession() as session:
+        async with session.get(file.url) as resp:
+            async for chunk in resp.content.iter_chunked(64 * 1024):
+                spool.write(chunk)
+    spool.seek(0)
+
+    loop = asyncio.get_running_loop()
+    last_report = [0.0]
+
+    def progress(stats):
+        now = time.monotonic()
+        if now - last_report[0] >= 2:
+            last_report[0] = now
+            asyncio.run_coroutine_threadsafe(
+                interaction.edit_original_response(content=f"Importing {kind}… {stats['read']} rows read, {stats['written']} written."),
+                loop
+            )
+
+    def run():
+        # Own connection: this runs in a worker thread
+        db = sqlite3.connect(DB_PATH, timeout=30)
+        try:
+            with io.TextIOWrapper(spool, encoding="utf-8-sig", newline="") as text:
+                return bulk_import(db, interaction.guild_id, kind, text, fmt, progress=progress)
+        finally:
+            db.close()
+
+    stats = await asyncio.to_thread(run)
+
+    summary = f"✅ Imported {kind}: {stats['read']} rows read, {stats['written']} written, {len(stats['errors'])} rejected."
+    files = []
+    if stats["errors"]:
+        files.append(discord.File(io.BytesIO("\n".join(stats["errors"]).encode("utf-8")), filename=f"{kind}_import_errors.txt"))
+        summary += "\n" + "\n".join(stats["errors"][:5])
+    await interaction.edit_original_response(content=summary[:1900], attachments=files)
+    c.execute("INSERT INTO logs (guild_id, user, command, game_name) VALUES (?, ?, ?, ?)",
+              (interaction.guild_id, str(interaction.user), "importdata", f"{kind}: {stats['written']} rows"))
+    conn.commit()
+
+
+@bot.tree.command(name="exportdata", description="Export the games catalog or helper roster as CSV / JSON Lines (Admin only).")
+@app_commands.default_permissions(administrator=True)
+@app_commands.checks.has_permissions(administrator=True)
+async def export_data(interaction: discord.Interaction, kind: Literal["games", "helpers"], fmt: Literal["csv", "jsonl"] = "csv"):
+    await interaction.response.defer(thinking=True, ephemeral=True)
+
+    def run():
+        db = sqlite3.connect(DB_PATH, timeout=30)
+        try:
+            return bulk_export(db, interaction.guild_id, kind, fmt)
+        finally:
+            db.close()
+
+    parts, rows = await asyncio.to_thread(run)
+    if rows == 0:
+        await interaction.followup.send(f"No {kind} to export.", ephemeral=True)
+        return
+
+    # Discord allows 10 attachments per message
+    for start in range(0, len(parts), 10):
+        chunk = parts[start:start + 10]
+        files = [
+            discord.File(fp, filename=f"{kind}{'' if len(parts) == 1 else f'_part{start + i + 1}'}.{fmt}")
+            for i, fp in enumerate(chunk)
+        ]
+        content = f"📦 Exported {rows} {kind} rows." if start == 0 else None
+        await interaction.followup.send(content=content, files=files, ephemeral=True)
+
+# ---------- Thanks history export (award reviews) ----------
+THANKS_EXPORT_FIELDS = ["id", "timestamp", "thanked_user_id", "thanked_user_name",
+                        "thanking_user_id", "thanking_user_name", "game", "message"]
+
+def _parse_day(value: str | None) -> datetime | None:
+    return datetime.strptime(value.strip(), "%Y-%m-%d").replace(tzinfo=timezone.utc) if value else None
+
+def _thanks_export_lines(db: sqlite3.Connection, guild_id: int, start: datetime | None, end: datetime | None):
+    """CSV lines of the guild's thanks in [start, end), oldest first, read in idx_thanks_guild_time order."""
+    where_sql, params = _thanks_where(guild_id, "all", None, None, start=start, end=end)
+    cur = db.execute(f"SELECT {', '.join(THANKS_EXPORT_FIELDS)} FROM thanks{where_sql} ORDER BY timestamp, id", params)
+    return _csv_lines(THANKS_EXPORT_FIELDS, cur)
+
+def thanks_export_gzip(db: sqlite3.Connection, guild_id: int, start: datetime | None, end: datetime | None,
+                       part_bytes: int = EXPORT_PART_BYTES) -> tuple[list, int]:
+    """Streams the thanks CSV from the cursor straight into gzip temp files of about part_bytes
+    (compressed) each, every part with the header, so memory stays flat however long the range."""
+    lines = _thanks_export_lines(db, guild_id, start, end)
+    header = next(lines).encode("utf-8")
+    parts, rows = [], 0
+    raw = gz = None
+    for line in lines:
+        if gz is None or raw.tell() >= part_bytes:
+            if gz is not None:
+                gz.close()   # finishes the gzip stream; the temp file stays open
+            raw = tempfile.TemporaryFile()
+            gz = gzip.GzipFile(fileobj=raw, mode="wb")
+            gz.write(header)
+            parts.append(raw)
+        gz.write(line.encode("utf-8"))
+        rows += 1
+    if gz is not None:
+        gz.close()
+    for part in parts:
+        part.seek(0)
+    return parts, rows
+
+
+@bot.tree.command(name="exportthanks", description="Export the thanks history for a date range as gzip CSV (Admin only).")
+@app_commands.describe(start="First day, YYYY-MM-DD (default: the first thanks)", end="Last day, YYYY-MM-DD (default: today)")
+@app_commands.default_permissions(administrator=True)
+@app_commands.checks.has_permissions(administrator=True)
+async def export_thanks(interaction: discord.Interaction, start: str | None = None, end: str | None = None):
+    try:
+        since = _parse_day(start)
+        until = _parse_day(end) + timedelta(days=1) if end else None   # the end day is included
+    except ValueError:
+        await interaction.response.send_message("Dates must look like 2025-01-31.", ephemeral=True)
+        return
+    await interaction.response.defer(thinking=True, ephemeral=True)
+
+    def run():
+        db = sqlite3.connect(DB_PATH, timeout=30)
+        try:
+            return thanks_export_gzip(db, interaction.guild_id, since, until)
+        finally:
+            db.close()
+
+    parts, rows = await asyncio.to_thread(run)
+    if rows == 0:
+        await interaction.followup.send("No thanks in that range.", ephemeral=True)
+        return
+
+    label = f"{start or 'start'}_to_{end or 'today'}"
+    for first in range(0, len(parts), 10):
+        files = [
+            discord.File(fp, filename=f"thanks_{label}{'' if len(parts) == 1 else f'_part{first + i + 1}'}.csv.gz")
+            for i, fp in enumerate(parts[first:first + 10])
+        ]
+        content = f"📦 Exported {rows} thanks." if first == 0 else None
+        await interaction.followup.send(content=content, files=files, ephemeral=True)
+
+
+# ---------- Online backups (SQLite backup API, off the event loop) ----------
+BACKUP_DIR = os.getenv("BACKUP_DIR", "backups")
+BACKUP_INTERVAL_HOURS = float(os.getenv("BACKUP_INTERVAL_HOURS", "6"))
+BACKUP_KEEP = int(os.getenv("BACKUP_KEEP", "14"))           # compressed snapshots kept on disk
+BACKUP_PAGES_PER_STEP = int(os.getenv("BACKUP_PAGES_PER_STEP", "256"))
+BACKUP_STEP_PAUSE = 0.02       # seconds between steps so writers can get in
+BACKUP_MAX_RESTARTS = 3        # after this many restarts (source changed mid-copy) finish in one step
+
+backup_lock = asyncio.Lock()
+last_backup: dict = {}
+
+class _BackupRestarting(Exception):
+    pass
+
+def _copy_database(target_path: str) -> dict:
+    """Copies DB_PATH into target_path in small page steps.
+
+    The source lock is only held inside each step; the pause between steps
+    runs in this worker thread, never on the event loop. If the bot keeps
+    writing and the copy keeps restarting, the remainder is taken in a single
+    step (under WAL that is one read snapshot, which does not block writers).
+    """
+    stats = {"steps": 0, "restarts": 0, "held": 0.0}
+    step_started = [time.perf_counter()]
+    last_remaining = [None]
+
+    def progress(status, remaining, total):
+        now = time.perf_counter()
+        stats["steps"] += 1
+        stats["held"] += now - step_started[0]
+        if last_remaining[0] is not None and remaining > last_remaining[0]:
+            stats["restarts"] += 1
+            if stats["restarts"] > BACKUP_MAX_RESTARTS:
+                raise _BackupRestarting()
+        last_remaining[0] = remaining
+        time.sleep(BACKUP_STEP_PAUSE)
+        step_started[0] = time.perf_counter()
+
+    src = sqlite3.connect(DB_PATH, timeout=30)
+    dst = sqlite3.connect(target_path)
+    try:
+        try:
+            src.backup(dst, pages=BACKUP_PAGES_PER_STEP, progress=progress)
+        except _BackupRestarting:
+            started = time.perf_counter()
+            src.backup(dst, pages=-1)
+            stats["steps"] += 1
+            stats["held"] += time.perf_counter() - started
+    finally:
+        dst.close()
+        src.close()
+    return stats
+
+def _run_backup() -> dict:
+    """Snapshot → integrity check → gzip → rotate. Runs in a worker thread."""
+    os.makedirs(BACKUP_DIR, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+    raw_path = os.path.join(BACKUP_DIR, f"helpers-{stamp}.db")
+    gz_path = raw_path + ".gz"
+
+    started = time.perf_counter()
+    result = _copy_database(raw_path)
+
+    check = sqlite3.connect(raw_path)
+    try:
+        integrity = check.execute("PRAGMA integrity_check").fetchone()[0]
+    finally:
+        check.close()
+
+    raw_size = os.path.getsize(raw_path)
+    if integrity == "ok":
+        with open(raw_path, "rb") as f_in, gzip.open(gz_path, "wb") as f_out:
+            shutil.copyfileobj(f_in, f_out, 1024 * 1024)
+        os.remove(raw_path)
+    else:
+        # Keep the failed copy uncompressed for inspection; it doesn't enter the rotation
+        gz_path = None
+
+    snapshots = sorted(glob.glob(os.path.join(BACKUP_DIR, "helpers-*.db.gz")))
+    for old in snapshots[:-BACKUP_KEEP] if BACKUP_KEEP > 0 else []:
+        os.remove(old)
+
+    result.update({
+        "finished_at": datetime.now(timezone.utc),
+        "duration": time.perf_counter() - started,
+        "integrity": integrity,
+        "path": gz_path or raw_path,
+        "size": raw_size,
+        "compressed_size": os.path.getsize(gz_path) if gz_path else None,
+        "kept": min(len(snapshots), BACKUP_KEEP),
+    })
+    return result
+
+async def run_backup() -> dict:
+    async with backup_lock:
+        try:
+            result = await asyncio.to_thread(_run_backup)
+        except Exception as e:
+            result = {"finished_at": datetime.now(timezone.utc), "error": str(e)}
+        last_backup.clear()
+        last_backup.update(result)
+        return result
+
+@tasks.loop(hours=BACKUP_INTERVAL_HOURS)
+async def backup_task():
+    await run_backup()
+
+def _backup_report(result: dict) -> str:
+    if not result:
+        return "No backup has run since the bot started."
+    when = result["finished_at"].strftime("%Y-%m-%d %H:%M UTC")
+    if "error" in result:
+        return f"❌ Last backup failed at {when}: {result['error']}"
+    status = "✅" if result["integrity"] == "ok" else "⚠️"
+    size_mb = result["size"] / (1024 * 1024)
+    packed = f" → {result['compressed_size'] / (1024 * 1024):.1f} MB gz" if result["compressed_size"] else ""
+    restarts = f", {result['restarts']} restart(s)" if result["restarts"] else ""
+    return (
+        f"{status} **Last backup:** {when}\n"
+        f"- **Duration:** {result['duration']:.2f}s\n"
+        f"- **Writers held up:** {result['held'] * 1000:.0f} ms over {result['steps']} step(s){restarts}\n"
+        f"- **Size:** {size_mb:.1f} MB{packed}\n"
+        f"- **Integrity check:** {result['integrity']}\n"
+        f"- **Snapshots kept:** {result['kept']} (every {BACKUP_INTERVAL_HOURS:g}h, keep {BACKUP_KEEP})"
+    )
+
+@bot.tree.command(name="backup", description="Show the last database backup, or run one now (Admin only).")
+@app_commands.default_permissions(administrator=True)
+@app_commands.checks.has_permissions(administrator=True)
+async def backup_command(interaction: discord.Interaction, action: Literal["status", "now"] = "status"):
+    if action == "status":
+        await interaction.response.send_message(_backup_report(last_backup), ephemeral=True)
+        return
+    if backup_lock.locked():
+        await interaction.response.send_message("A backup is already running.", ephemeral=True)
+        return
+    await interaction.response.defer(thinking=True, ephemeral=True)
+    result = await run_backup()
+    await interaction.followup.send(_backup_report(result), ephemeral=True)
+
+
+# ---------- Database maintenance (quiet hours, off the event loop) ----------
+MAINTENANCE_HOURS = os.getenv("MAINTENANCE_HOURS", "3-5")            # UTC hours, start inclusive, end exclusive
+ANALYZE_EVERY_DAYS = float(os.getenv("ANALYZE_EVERY_DAYS", "7"))
+VACUUM_PAGES_PER_STEP = 1000    # incremental_vacuum pages per transaction, so writers can get in between
+
+last_maintenance: dict = {}
+
+def _in_quiet_hours(now: datetime) -> bool:
+    start, _, end = MAINTENANCE_HOURS.partition("-")
+    start, end = int(start), int(end or int(start) + 1)
+    return start <= now.hour < end if start <= end else (now.hour >= start or now.hour < end)
+
+def _run_maintenance(analyze: bool) -> dict:
+    """optimize → (ANALYZE) → incremental vacuum → WAL checkpoint. Runs in a worker thread."""
+    db = sqlite3.connect(DB_PATH, timeout=30)
+    steps = {}
+
+    def step(name, fn):
+        t0 = time.perf_counter()
+        steps[name] = {"seconds": 0.0, "detail": fn()}
+        steps[name]["seconds"] = time.perf_counter() - t0
+
+    try:
+        page_size = db.execute("PRAGMA page_size").fetchone()[0]
+        step("optimize", lambda: db.execute("PRAGMA optimize").fetchall() and None)
+        if analyze:
+            step("analyze", lambda: db.execute("ANALYZE") and None)
+
+        def vacuum():
+            start = free = db.execute("PRAGMA freelist_count").fetchone()[0]
+            # Without INCREMENTAL auto-vacuum (a file the migration didn't rebuild) the pragma is a no-op
+            if db.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                return 0
+            while free:
+                # executescript steps the pragma to completion; execute() would free a single page
+                db.executescript(f"PRAGMA incremental_vacuum({VACUUM_PAGES_PER_STEP})")
+                left = db.execute("PRAGMA freelist_count").fetchone()[0]
+                if left >= free:
+                    break
+                free = left
+                time.sleep(0.01)
+            return (start - free) * page_size
+        step("vacuum", vacuum)
+
+        def checkpoint():
+            wal = DB_PATH + "-wal"
+            before = os.path.getsize(wal) if os.path.exists(wal) else 0
+            busy = db.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()[0]
+            after = os.path.getsize(wal) if os.path.exists(wal) else 0
+            return {"busy": bool(busy), "reclaimed": before - after}
+        step("checkpoint", checkpoint)
+    finally:
+        db.close()
+
+    return {
+        "finished_at": datetime.now(timezone.utc),
+        "steps": steps,
+        "reclaimed": steps["vacuum"]["detail"] + steps["checkpoint"]["detail"]["reclaimed"],
+        "size": os.path.getsize(DB_PATH),
+    }
+
+@tasks.loop(minutes=30)
+async def maintenance_task():
+    now = datetime.now(timezone.utc)
+    last = last_maintenance.get("finished_at")
+    if not _in_quiet_hours(now) or (last and now - last < timedelta(hours=12)):
+        return
+    last_analyze = last_maintenance.get("analyzed_at")
+    analyze = last_analyze is None or now - last_analyze >= timedelta(days=ANALYZE_EVERY_DAYS)
+    try:
+        result = await asyncio.to_thread(_run_maintenance, analyze)
+    except Exception as e:
+        result = {"finished_at": datetime.now(timezone.utc), "error": str(e)}
+    if analyze and "error" not in result:
+        result["analyzed_at"] = result["finished_at"]
+    elif last_analyze:
+        result["analyzed_at"] = last_analyze
+    last_maintenance.clear()
+    last_maintenance.update(result)
+
+def _maintenance_report(result: dict) -> str:
+    if not result:
+        return f"not run since start (quiet hours {MAINTENANCE_HOURS} UTC)"
+    when = result["finished_at"].strftime("%Y-%m-%d %H:%M UTC")
+    if "error" in result:
+        return f"❌ failed at {when}: {result['error']}"
+    timings = ", ".join(f"{name} {s['seconds'] * 1000:.0f}ms" for name, s in result["steps"].items())
+    busy = " (checkpoint blocked by readers)" if result["steps"]["checkpoint"]["detail"]["busy"] else ""
+    return (f"{when} — {timings}; reclaimed {result['reclaimed'] / (1024 * 1024):.1f} MB, "
+            f"database {result['size'] / (1024 * 1024):.1f} MB{busy}")
+
+
 import random
 
 @bot.tree.command(name="removetide44", description="Attempts the impossible... remove Tide44.")
@@ -1541,5 +3945,106 @@ async def remove_tide44(interaction: discord.Interaction):
 
 # --- Delete to here
 
-token = os.getenv('DISCORD_TOKEN')
-bot.run(token)
+def _run_shard_processes(shard_count: int, processes: int):
+    """Starts one bot process per group of shards and waits for them.
+
+    This process has already run the schema migrations on import, so the
+    children start against an up-to-date database. Shards are dealt out round
+    robin; starts are staggered because Discord allows one IDENTIFY per 5s.
+    """
+    import subprocess
+    processes = max(1, min(processes, shard_count))
+    groups = [list(range(shard_count))[i::processes] for i in range(processes)]
+    children = []
+    try:
+        for ids in groups:
+            env = {**os.environ, "SHARD_COUNT": str(shard_count), "SHARD_IDS": ",".join(map(str, ids))}
+            children.append(subprocess.Popen([sys.executable, os.path.abspath(__file__)], env=env))
+            print(f"Started shards {ids} as pid {children[-1].pid}")
+            if ids is not groups[-1]:
+                time.sleep(5 * len(ids))
+        for child in children:
+            child.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for child in children:
+            if child.poll() is None:
+                child.terminate()
+
+def _cli(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Haven's Helper bot. Runs the bot when no command is given.")
+    sub = parser.add_subparsers(dest="cmd")
+
+    p_import = sub.add_parser("import", help="Bulk import games or helpers (offline)")
+    p_import.add_argument("kind", choices=["games", "helpers"])
+    p_import.add_argument("path", help="CSV or JSON Lines file, '-' for stdin")
+    p_import.add_argument("--format", choices=["csv", "jsonl"])
+    p_import.add_argument("--guild", type=int, default=HOME_GUILD_ID, help="Guild id the rows belong to (default: HOME_GUILD_ID)")
+
+    p_export = sub.add_parser("export", help="Export games or helpers (offline)")
+    p_export.add_argument("kind", choices=["games", "helpers"])
+    p_export.add_argument("path", help="Output file, '-' for stdout")
+    p_export.add_argument("--format", choices=["csv", "jsonl"])
+    p_export.add_argument("--guild", type=int, default=HOME_GUILD_ID, help="Guild id to export (default: HOME_GUILD_ID)")
+
+    p_thanks = sub.add_parser("exportthanks", help="Export the thanks history as CSV (offline; gzip if the path ends in .gz)")
+    p_thanks.add_argument("path", help="Output file, '-' for stdout")
+    p_thanks.add_argument("--from", dest="start", type=_parse_day, help="First day, YYYY-MM-DD")
+    p_thanks.add_argument("--to", dest="end", type=_parse_day, help="Last day, YYYY-MM-DD (included)")
+    p_thanks.add_argument("--guild", type=int, default=HOME_GUILD_ID, help="Guild id to export (default: HOME_GUILD_ID)")
+
+    p_shards = sub.add_parser("shards", help="Run the bot as several shard processes sharing the database")
+    p_shards.add_argument("--shards", type=int, required=True, help="Total shard count")
+    p_shards.add_argument("--processes", type=int, default=1, help="Processes to spread the shards over")
+
+    args = parser.parse_args(argv)
+
+    if args.cmd == "shards":
+        _run_shard_processes(args.shards, args.processes)
+        return
+
+    if args.cmd == "import":
+        fmt = args.format or _format_for(args.path)
+        def progress(stats):
+            print(f"\r{stats['read']} read, {stats['written']} written, {len(stats['errors'])} rejected",
+                  end="", file=sys.stderr, flush=True)
+        stream = sys.stdin if args.path == "-" else open(args.path, encoding="utf-8-sig", newline="")
+        with stream:
+            stats = bulk_import(conn, args.guild, args.kind, stream, fmt, progress=progress)
+        print(file=sys.stderr)
+        for err in stats["errors"]:
+            print(err, file=sys.stderr)
+        print(f"{stats['read']} rows read, {stats['written']} written, {len(stats['errors'])} rejected.")
+        return
+
+    if args.cmd == "export":
+        fmt = args.format or _format_for(args.path)
+        out = sys.stdout if args.path == "-" else open(args.path, "w", encoding="utf-8", newline="")
+        with out:
+            for chunk in _export_lines(conn, args.guild, args.kind, fmt):
+                out.write(chunk)
+        return
+
+    if args.cmd == "exportthanks":
+        end = args.end + timedelta(days=1) if args.end else None
+        if args.path == "-":
+            out = sys.stdout
+        elif args.path.endswith(".gz"):
+            out = gzip.open(args.path, "wt", encoding="utf-8", newline="")
+        else:
+            out = open(args.path, "w", encoding="utf-8", newline="")
+        rows = -1   # header
+        with out:
+            for line in _thanks_export_lines(conn, args.guild, args.start, end):
+                out.write(line)
+                rows += 1
+        print(f"{rows} thanks exported.", file=sys.stderr)
+        return
+
+    token = os.getenv('DISCORD_TOKEN')
+    bot.run(token)
+
+
+if __name__ == "__main__":
+    _cli()
@@ -0,0 +1,44 @@
+"""main.py opens its database and runs the migrations on import, so point it at a
+fresh file before any test imports it."""
+import asyncio
+import itertools
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ["HELPERS_DB"] = os.path.join(tempfile.mkdtemp(prefix="havenshelper-tests-"), "helpers.db")
+os.environ.setdefault("BLOCKING_LOG", os.path.join(os.path.dirname(os.environ["HELPERS_DB"]), "blocking.log"))
+
+import main  # noqa: E402
+from loadtest import FakeChannel, FakeGuild, FakeInteraction, FakeUser  # noqa: E402
+
+_guild_ids = itertools.count(1000)
+
+
+@pytest.fixture
+def guild_id():
+    """A guild no other test has written to, so tests can share the one database."""
+    return next(_guild_ids)
+
+
+def interact(guild_id: int, user_id: int = 42, name: str = "tester") -> FakeInteraction:
+    return FakeInteraction(FakeUser(user_id, name), FakeGuild(guild_id), FakeChannel())
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def add_game(guild_id: int, name: str, description: str | None = None, guide_url: str | None = None) -> int:
+    """Inserts a game the way /addgame does (row plus lookup keys) and returns its id."""
+    game_id = main.conn.execute(
+        "INSERT INTO games (guild_id, game_name, description, guide_url) VALUES (?, ?, ?, ?) RETURNING id",
+        (guild_id, name, description, guide_url)
+    ).fetchone()[0]
+    main._index_game_names(main.conn, [(guild_id, game_id, name)])
+    main.conn.commit()
+    return game_id
@@ -0,0 +1,55 @@
+"""/addmemany and /removememany: a pasted list is resolved like single-game
+commands, applied in one transaction and summarised in one ephemeral reply."""
+import main
+from conftest import add_game, interact, run
+
+USER = 9201
+
+
+def paste(guild_id: int, mode: str, text: str) -> str:
+    """What submitting the paste-a-list modal does."""
+    interaction = interact(guild_id, USER, "batcher")
+    games, unknown = main._resolve_games(guild_id, main._split_game_list(text))
+    run(main._process_games_batch(interaction, mode, games, unknown))
+    assert interaction._original.kwargs.get("ephemeral") is True
+    return interaction._original.content
+
+
+def helping(guild_id: int) -> set[int]:
+    return {row[0] for row in main.conn.execute(
+        "SELECT game_id FROM helpers WHERE guild_id = ? AND user_id = ?", (guild_id, str(USER))
+    )}
+
+
+def test_mixed_batch(guild_id):
+    elden = add_game(guild_id, "Elden Ring")
+    hades = add_game(guild_id, "Hades")
+    paste(guild_id, "add", "Hades")
+
+    summary = paste(guild_id, "add", "elden ring\nHADES\nNot A Game\nhades")
+    assert summary.splitlines() == [
+        "✅ Added (1): 'Elden Ring'",
+        "☑️ Already listed (1): 'Hades'",
+        "❓ Not found (1): 'Not A Game'",
+    ]
+    assert helping(guild_id) == {elden, hades}
+
+    summary = paste(guild_id, "remove", "Elden Ring; Hades; Celeste")
+    assert "✅ Removed (2)" in summary and "❓ Not found (1): 'Celeste'" in summary
+    assert helping(guild_id) == set()
+
+
+def test_summary_is_truncated_to_one_message(guild_id):
+    names = "\n".join(f"Unknown game number {i} " + "x" * 80 for i in range(main.BATCH_SUMMARY_NAMES + 5))
+    summary = paste(guild_id, "add", names)
+    assert len(summary) == 2000
+    assert summary.endswith("…")
+
+
+def test_search_offers_matching_games(guild_id):
+    add_game(guild_id, "Elden Ring")
+    add_game(guild_id, "Hades")
+    interaction = interact(guild_id, USER, "batcher")
+    run(main.add_me_many.callback(interaction, "elden"))
+    view = interaction._original.kwargs["view"]
+    assert [option.label for option in view.select.options] == ["Elden Ring"]
@@ -0,0 +1,26 @@
+"""/importdata helpers resolves game names the way commands do: case-insensitively,
+then through game_aliases (subtitles, abbreviations), in one query per batch."""
+import io
+
+import main
+from conftest import add_game
+
+
+def test_helper_rows_resolve_like_commands(guild_id):
+    elden = add_game(guild_id, "Elden Ring")
+    black_ops = add_game(guild_id, "Call of Duty: Black Ops 4")
+    csv_text = "\n".join([
+        "user_id,user_name,game_name",
+        "8001,exact,Elden Ring",
+        "8002,lower,elden ring",
+        "8003,subtitle,black ops 4",
+        "8004,nobody,Not A Game",
+    ])
+    stats = main.bulk_import(main.conn, guild_id, "helpers", io.StringIO(csv_text), "csv")
+
+    assert stats["written"] == 3
+    assert stats["errors"] == ["line 5: unknown game 'Not A Game'"]
+    rows = main.conn.execute(
+        "SELECT user_id, game_id FROM helpers WHERE guild_id = ? ORDER BY user_id", (guild_id,)
+    ).fetchall()
+    assert rows == [("8001", elden), ("8002", elden), ("8003", black_ops)]
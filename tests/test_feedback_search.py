@@ -0,0 +1,39 @@
+import main
+
+
+def _age(search_id: int, days: int):
+    main.conn.execute("UPDATE feedback_searches SET searched_at = datetime('now', ?) WHERE id = ?", (f"-{days} days", search_id))
+    main.conn.commit()
+
+
+def _exists(search_id: int) -> bool:
+    return bool(main.conn.execute("SELECT 1 FROM feedback_searches WHERE id = ?", (search_id,)).fetchone())
+
+
+def _save(guild_id: int, query: str) -> int:
+    return main._save_feedback_search(guild_id, query, main._feedback_match(guild_id, query))
+
+
+def test_old_searches_are_pruned(guild_id):
+    old, recent = _save(guild_id, "zetsubou"), _save(guild_id, "boss fight")
+    _age(old, main.FEEDBACK_SEARCH_KEEP_DAYS + 1)
+    _age(recent, main.FEEDBACK_SEARCH_KEEP_DAYS - 1)
+    main._run_rollups()
+    assert not _exists(old)
+    assert _exists(recent)
+
+
+def test_repeating_a_search_keeps_it(guild_id):
+    search_id = _save(guild_id, "easter egg")
+    _age(search_id, main.FEEDBACK_SEARCH_KEEP_DAYS + 1)
+    assert _save(guild_id, "easter egg") == search_id
+    main._run_rollups()
+    assert _exists(search_id)
+
+
+def test_pruned_search_pages_are_empty(guild_id):
+    search_id = _save(guild_id, "raid")
+    _age(search_id, main.FEEDBACK_SEARCH_KEEP_DAYS + 1)
+    main._run_rollups()
+    content, _ = main.PAGED_QUERIES["fs"].render(guild_id, str(search_id), 0)
+    assert "*(no results)*" in content
@@ -0,0 +1,31 @@
+import main
+from conftest import add_game
+
+
+def test_readme_examples_resolve(guild_id):
+    game_id = add_game(guild_id, "Call of Duty: Black Ops 4")
+    for name in ("Call of Duty: Black Ops 4", "call of duty: black ops 4", "black ops 4", "Black-Ops 4", "codbo4", "BO4"):
+        assert main._resolve_game(guild_id, name) == (game_id, "Call of Duty: Black Ops 4"), name
+
+
+def test_subtitle_key_never_replaces_a_name(guild_id):
+    black_ops = add_game(guild_id, "Black Ops 4")
+    add_game(guild_id, "Call of Duty: Black Ops 4")
+    assert main._resolve_game(guild_id, "black ops 4") == (black_ops, "Black Ops 4")
+
+
+def test_subtitle_keys_are_backfilled(guild_id):
+    # A game indexed before subtitles had their own key
+    game_id = add_game(guild_id, "Dark Souls: Remastered")
+    main.conn.execute("DELETE FROM game_aliases WHERE game_id = ? AND alias_key = 'remastered'", (game_id,))
+    main.conn.commit()
+    assert main._resolve_game(guild_id, "remastered") is None
+
+    main._index_subtitles(main.conn)
+    assert main._resolve_game(guild_id, "remastered") == (game_id, "Dark Souls: Remastered")
+
+
+def test_abbreviations():
+    assert main._game_abbreviations("Call of Duty: Black Ops 4") == {"blackops4", "codbo4", "bo4"}
+    assert main._game_abbreviations("Dark Souls III") == {"dsiii"}
+    assert main._game_abbreviations("Halo") == set()
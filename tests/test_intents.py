@@ -0,0 +1,37 @@
+"""The lean intents profile reads name changes from discord.py's GUILD_MEMBER_UPDATE
+parser, which is not public API. These tests fail if a discord.py upgrade removes or
+renames it, instead of name sync silently stopping."""
+import asyncio
+
+import discord
+import pytest
+
+import main
+
+
+def test_parser_table_has_member_updates():
+    assert hasattr(discord.state.ConnectionState, "parse_guild_member_update"), discord.__version__
+    assert "GUILD_MEMBER_UPDATE" in main.bot._connection.parsers
+
+
+@pytest.mark.skipif(main.INTENTS_PROFILE != "lean", reason="the hook is only installed for INTENTS_PROFILE=lean")
+def test_lean_profile_syncs_names_from_raw_updates():
+    handler = main.bot._connection.parsers["GUILD_MEMBER_UPDATE"]
+    assert "_on_raw_member_update" in handler.__qualname__
+    assert not main.member_cache_flags.joined
+
+    async def update():
+        # An uncached guild: discord.py itself discards the event
+        handler({"guild_id": "123", "user": {"id": "456", "username": "renamed", "discriminator": "0"}, "roles": []})
+        pending = dict(main.name_sync.pending)
+        main.name_sync.pending.clear()
+        main.name_sync._task.cancel()
+        return pending
+
+    assert asyncio.run(update()) == {"456": "renamed"}
+
+
+@pytest.mark.parametrize("discriminator", ["0", "1234"])
+def test_payload_name_matches_discord_user(discriminator):
+    payload = {"id": "456", "username": "helper", "discriminator": discriminator, "avatar": None}
+    assert main._payload_user_name(payload) == str(discord.User(state=main.bot._connection, data=payload))
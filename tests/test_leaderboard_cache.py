@@ -0,0 +1,54 @@
+"""Cached /mostthanked pages stay valid across unrelated commits (usage rows, helpers)
+and are invalidated by the guild's thanks and the names shown."""
+import main
+from conftest import add_game, interact, run
+from loadtest import FakeGuild
+
+
+def page(guild_id: int) -> bool:
+    """Renders page 0; True when it came from the cache."""
+    hits = main.leaderboard_cache.hits
+    run(main._most_thanked_page(FakeGuild(guild_id), "all", 0))
+    return main.leaderboard_cache.hits == hits + 1
+
+
+def thank(guild_id: int, user_id: str = "901"):
+    main.conn.execute(
+        """INSERT INTO thanks (guild_id, thanked_user_id, thanked_user_name, thanking_user_id, thanking_user_name)
+           VALUES (?, ?, 'leader', '902', 'thanker')""",
+        (guild_id, user_id)
+    )
+    main.conn.commit()
+
+
+def test_usage_and_helper_writes_keep_the_page(guild_id):
+    thank(guild_id)
+    page(guild_id)
+    assert page(guild_id)
+    main.conn.execute(
+        "INSERT INTO command_usage (guild_id, command, user_id, duration_ms, ok, ran_at) VALUES (?, 'x', '1', 1, 1, datetime('now'))",
+        (guild_id,)
+    )
+    main.conn.commit()
+    add_game(guild_id, "Unrelated Game")
+    run(main.add_me.callback(interact(guild_id, 903, "someone"), "Unrelated Game"))
+    assert page(guild_id)
+
+
+def test_thanks_invalidate_only_their_guild(guild_id):
+    other = guild_id + 100_000
+    thank(guild_id)
+    thank(other)
+    page(guild_id)
+    page(other)
+    thank(guild_id)
+    assert not page(guild_id)
+    assert page(other)
+
+
+def test_name_change_invalidates(guild_id):
+    thank(guild_id)
+    page(guild_id)
+    main.name_sync.pending["901"] = "leader_renamed"
+    main.name_sync.flush()
+    assert not page(guild_id)
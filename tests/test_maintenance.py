@@ -0,0 +1,50 @@
+import sqlite3
+import threading
+
+import pytest
+
+import main
+
+
+def _db_with_free_pages(path, auto_vacuum: str) -> int:
+    db = sqlite3.connect(path)
+    db.execute(f"PRAGMA auto_vacuum = {auto_vacuum}")
+    db.execute("PRAGMA journal_mode = WAL")
+    db.execute("CREATE TABLE filler (blob BLOB)")
+    db.executemany("INSERT INTO filler VALUES (randomblob(4000))", [()] * 500)
+    db.commit()
+    db.execute("DELETE FROM filler")
+    db.commit()
+    free = db.execute("PRAGMA freelist_count").fetchone()[0]
+    db.close()
+    return free
+
+
+def _maintain(monkeypatch, path) -> dict:
+    monkeypatch.setattr(main, "DB_PATH", str(path))
+    result = {}
+    worker = threading.Thread(target=lambda: result.update(main._run_maintenance(analyze=False)), daemon=True)
+    worker.start()
+    worker.join(timeout=30)
+    assert not worker.is_alive(), "maintenance did not finish"
+    return result
+
+
+@pytest.mark.parametrize("mode", ["NONE", "FULL"])
+def test_vacuum_finishes_without_incremental_auto_vacuum(tmp_path, monkeypatch, mode):
+    path = tmp_path / "old.db"
+    free = _db_with_free_pages(path, mode)
+    result = _maintain(monkeypatch, path)
+    assert result["steps"]["vacuum"]["detail"] == 0
+    if mode == "NONE":
+        assert free > 0
+        assert sqlite3.connect(path).execute("PRAGMA freelist_count").fetchone()[0] == free
+
+
+def test_incremental_vacuum_reclaims_free_pages(tmp_path, monkeypatch):
+    path = tmp_path / "incremental.db"
+    free = _db_with_free_pages(path, "INCREMENTAL")
+    page_size = sqlite3.connect(path).execute("PRAGMA page_size").fetchone()[0]
+    result = _maintain(monkeypatch, path)
+    assert result["steps"]["vacuum"]["detail"] == free * page_size
+    assert sqlite3.connect(path).execute("PRAGMA freelist_count").fetchone()[0] == 0
@@ -0,0 +1,101 @@
+"""Milestones are marked announced only after their message is posted."""
+from types import SimpleNamespace
+
+import discord
+
+import main
+from conftest import run
+from loadtest import FakeGuild
+
+USER = "801"
+
+
+class Channel:
+    def __init__(self, channel_id: int, can_send: bool = True, fails: bool = False):
+        self.id = channel_id
+        self.can_send = can_send
+        self.fails = fails
+        self.sent = []
+
+    def permissions_for(self, member):
+        return SimpleNamespace(send_messages=self.can_send)
+
+    async def send(self, content, **kwargs):
+        if self.fails:
+            raise discord.Forbidden(SimpleNamespace(status=403, reason="Forbidden"), "Missing Permissions")
+        self.sent.append(content)
+
+
+def guild_with(guild_id: int, *channels, system=None) -> FakeGuild:
+    guild = FakeGuild(guild_id)
+    guild.me = object()
+    guild.system_channel = system
+    guild.text_channels = list(channels)
+    return guild
+
+
+def reach(guild_id: int, total: int = 15):
+    main.conn.execute(
+        "INSERT INTO thanks_totals (guild_id, user_id, total) VALUES (?, ?, ?) ON CONFLICT DO UPDATE SET total = excluded.total",
+        (guild_id, USER, total)
+    )
+    main.conn.commit()
+
+
+def announced(guild_id: int) -> int:
+    return main.conn.execute(
+        "SELECT milestone FROM thanks_totals WHERE guild_id = ? AND user_id = ?", (guild_id, USER)
+    ).fetchone()[0]
+
+
+def announce(guild, channel):
+    main.thanks_events.put_nowait((guild, channel, USER))
+    run(main.announce_milestones())
+
+
+def test_posted_in_the_thanks_channel(guild_id):
+    channel = Channel(1)
+    reach(guild_id)
+    announce(guild_with(guild_id, channel), channel)
+    assert len(channel.sent) == 1 and "**15 thanks**" in channel.sent[0]
+    assert announced(guild_id) == 15
+    announce(guild_with(guild_id, channel), channel)
+    assert len(channel.sent) == 1
+
+
+def test_falls_back_when_the_channel_refuses(guild_id):
+    refusing, system = Channel(1, fails=True), Channel(2)
+    reach(guild_id)
+    announce(guild_with(guild_id, refusing, system=system), refusing)
+    assert len(system.sent) == 1
+    assert announced(guild_id) == 15
+
+
+def test_skips_a_channel_without_send_permission(guild_id):
+    muted, other = Channel(1, can_send=False, fails=True), Channel(2)
+    reach(guild_id)
+    announce(guild_with(guild_id, muted, other), muted)
+    assert other.sent and announced(guild_id) == 15
+
+
+def test_failed_post_is_kept_for_the_next_thanks(guild_id):
+    channel = Channel(1, fails=True)
+    reach(guild_id)
+    announce(guild_with(guild_id, channel), channel)
+    assert announced(guild_id) == 0
+
+    channel.fails = False
+    reach(guild_id, 16)
+    announce(guild_with(guild_id, channel), channel)
+    assert len(channel.sent) == 1 and announced(guild_id) == 15
+
+
+def test_unannounced_milestones_are_queued_on_startup(guild_id, monkeypatch):
+    system = Channel(2)
+    guild = guild_with(guild_id, system=system)
+    reach(guild_id, 50)
+    monkeypatch.setattr(main.bot, "get_guild", lambda gid: guild if gid == guild_id else None)
+    assert main._queue_pending_milestones() == 1
+    run(main.announce_milestones())
+    assert "**15 thanks**" in system.sent[0] and "**50 thanks**" in system.sent[0]
+    assert announced(guild_id) == 50
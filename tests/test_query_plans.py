@@ -0,0 +1,51 @@
+"""The /nothelped, /gameswithhelp and /gameswithguides listings must stay on their
+partial indexes: a plan that falls back to scanning games costs a full table read
+per page on a big catalog. The hourly helper-score refresh must likewise read only
+the recent window of thanks."""
+import pytest
+
+import main
+
+EXPECTED_INDEX = {
+    "nh": "idx_games_not_helped",
+    "gh": "idx_games_with_helpers",
+    "gg": "idx_games_with_guide",
+}
+PARAMS = {"guild": 1, "scope": "", "limit": 10, "offset": 0}
+
+
+def _plan(sql: str) -> list[str]:
+    return [row[3] for row in main.conn.execute(f"EXPLAIN QUERY PLAN {sql}", PARAMS)]
+
+
+@pytest.mark.parametrize("key", sorted(EXPECTED_INDEX))
+@pytest.mark.parametrize("part", ["count_sql", "page_sql"])
+def test_listing_uses_partial_index(key, part):
+    plan = _plan(getattr(main.PAGED_QUERIES[key], part))
+    assert any(EXPECTED_INDEX[key] in step for step in plan), plan
+    assert not any(step.startswith("SCAN games") and "USING" not in step for step in plan), plan
+    # ORDER BY game_name COLLATE NOCASE comes from the index, not a sort
+    assert not any("TEMP B-TREE" in step for step in plan), plan
+
+
+def test_helper_scores_seek_the_window_per_helper():
+    """One range seek per (guild, helper) pair, with or without ANALYZE statistics."""
+    plan = [row[3] for row in main.conn.execute(f"EXPLAIN QUERY PLAN {main.SQL_HELPER_SCORES}", {"window": "-30 days"})]
+    assert any("idx_thanks_guild_thanked (guild_id=? AND thanked_user_id=? AND timestamp>?)" in step
+               for step in plan), plan
+    assert not any(step.startswith("SCAN t") or step.startswith("SCAN thanks") for step in plan), plan
+
+
+def test_helper_scores_count_the_window_only(guild_id):
+    rows = [("7001", "-1 days"), ("7001", "-2 days"), ("7001", "-90 days"), ("7002", "-90 days")]
+    main.conn.executemany(
+        """INSERT INTO thanks (guild_id, thanked_user_id, thanked_user_name, thanking_user_id, thanking_user_name, timestamp)
+           VALUES (?, ?, 'helper', '1', 'thanker', datetime('now', ?))""",
+        [(guild_id, user, age) for user, age in rows]
+    )
+    main.conn.commit()
+    main._refresh_helper_scores()
+    scores = main.conn.execute(
+        "SELECT user_id, recent_thanks FROM helper_scores WHERE guild_id = ?", (guild_id,)
+    ).fetchall()
+    assert scores == [("7001", 2)]
@@ -0,0 +1,31 @@
+from datetime import datetime, timezone
+
+import main
+
+
+def _usage_calls(guild_id: int) -> int:
+    return main.conn.execute("SELECT IFNULL(SUM(calls), 0) FROM command_usage_hourly WHERE guild_id = ?", (guild_id,)).fetchone()[0]
+
+
+def test_adopting_old_thanks_does_not_roll_usage_up_twice(guild_id):
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    main.conn.executemany(
+        "INSERT INTO command_usage (guild_id, command, user_id, duration_ms, ok, ran_at) VALUES (?, 'showgame', '1', 5, 1, ?)",
+        [(guild_id, now)] * 3
+    )
+    main.conn.execute(
+        """INSERT INTO thanks (guild_id, thanked_user_id, thanked_user_name, thanking_user_id, thanking_user_name, timestamp)
+           VALUES (0, '701', 'helper', '702', 'thanker', ?)""",
+        (now,)
+    )
+    main.conn.commit()
+    main._run_rollups()
+    assert _usage_calls(guild_id) == 3
+
+    assert main._adopt_unassigned_rows(guild_id)
+    main._run_rollups()
+    assert _usage_calls(guild_id) == 3
+    # The thanks rollups were rebuilt, with the adopted thanks under the guild
+    assert main.conn.execute("SELECT SUM(thanks) FROM thanks_daily").fetchone()[0] == \
+        main.conn.execute("SELECT COUNT(*) FROM thanks").fetchone()[0]
+    assert main.conn.execute("SELECT SUM(thanks) FROM thanks_daily WHERE guild_id = ?", (guild_id,)).fetchone()[0] == 1
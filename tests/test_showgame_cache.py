@@ -0,0 +1,135 @@
+"""/showgame replies are cached per game and invalidated by games.version, which the
+database triggers bump. Each test reads the reply (so it is cached), applies one
+write through the bot's own code path and reads again: the second reply must show
+the write, never the cached copy."""
+import pytest
+
+import main
+from conftest import add_game, interact, run
+
+HELPER = 501
+
+
+def show(guild_id: int, name: str) -> str:
+    interaction = interact(guild_id)
+    run(main.show_game.callback(interaction, name))
+    return interaction._original.content
+
+
+def cached(guild_id: int, name: str) -> str:
+    """Reads twice and checks the second read was served from the cache."""
+    first = show(guild_id, name)
+    hits = main.showgame_cache.hits
+    assert show(guild_id, name) == first
+    assert main.showgame_cache.hits == hits + 1
+    return first
+
+
+@pytest.fixture
+def game(guild_id):
+    add_game(guild_id, "Elden Ring", description="Boss help")
+    run(main.add_me.callback(interact(guild_id, HELPER, "helper_one"), "Elden Ring"))
+    return "Elden Ring"
+
+
+def test_addme(guild_id, game):
+    assert "newcomer" not in cached(guild_id, game)
+    run(main.add_me.callback(interact(guild_id, 502, "newcomer"), game))
+    assert "newcomer" in show(guild_id, game)
+
+
+def test_removeme(guild_id, game):
+    assert "helper_one" in cached(guild_id, game)
+    run(main.remove_me.callback(interact(guild_id, HELPER, "helper_one"), game))
+    assert "helper_one" not in show(guild_id, game)
+
+
+def test_batch_add_and_remove(guild_id, game):
+    cached(guild_id, game)
+    run(main._process_games_batch(interact(guild_id, 503, "batcher"), "add", {main._resolve_game(guild_id, game)[0]: game}, []))
+    assert "batcher" in show(guild_id, game)
+    cached(guild_id, game)
+    run(main._process_games_batch(interact(guild_id, 503, "batcher"), "remove", {main._resolve_game(guild_id, game)[0]: game}, []))
+    assert "batcher" not in show(guild_id, game)
+
+
+def test_platform_change(guild_id, game):
+    assert "console_player" not in cached(guild_id, game)
+    run(main.process_platform(interact(guild_id, 504, "console_player"), game, "Xbox"))
+    assert "console_player" in show(guild_id, game)
+
+
+def test_setstatus(guild_id, game):
+    assert "helper_one 🟢" in cached(guild_id, game)
+    run(main.set_status.callback(interact(guild_id, HELPER, "helper_one"), "red"))
+    reply = show(guild_id, game)
+    assert "helper_one 🔴" in reply and "🟢" not in reply
+    run(main.set_status.callback(interact(guild_id, HELPER, "helper_one"), "green"))
+
+
+def test_rename(guild_id, game):
+    cached(guild_id, game)
+    run(main.rename_game.callback(interact(guild_id, HELPER, "helper_one"), game, "Elden Ring: Nightreign"))
+    assert "**Game Name:** Elden Ring: Nightreign" in show(guild_id, game)   # old name is an alias now
+    assert "**Game Name:** Elden Ring: Nightreign" in show(guild_id, "nightreign")
+
+
+def test_update_description(guild_id):
+    add_game(guild_id, "Hades")
+    assert "Description" not in cached(guild_id, "Hades")
+    run(main.update_description.callback(interact(guild_id), "Hades", "Heat 32 runs"))
+    assert "**Description:** Heat 32 runs" in show(guild_id, "Hades")
+
+
+def test_update_url(guild_id, game):
+    assert "Guide" not in cached(guild_id, game)
+    run(main.update_url.callback(interact(guild_id), game, "https://guides.example/er"))
+    assert "(https://guides.example/er)" in show(guild_id, game)
+    cached(guild_id, game)
+    run(main.update_url.callback(interact(guild_id), game, "https://guides.example/er2"))
+    assert "(https://guides.example/er2)" in show(guild_id, game)
+
+
+def test_name_sync(guild_id, game):
+    assert "helper_one" in cached(guild_id, game)
+    main.name_sync.pending[str(HELPER)] = "helper_renamed"
+    main.name_sync.flush()
+    reply = show(guild_id, game)
+    assert "helper_renamed" in reply and "helper_one" not in reply
+    main.name_sync.pending[str(HELPER)] = "helper_one"
+    main.name_sync.flush()
+
+
+def test_game_removal(guild_id, game):
+    cached(guild_id, game)
+    run(main.remove_game.callback(interact(guild_id, HELPER, "helper_one"), game))
+    assert show(guild_id, game) == f"Couldn't find a game named **{game}**."
+    # A new game under the same name is a new row, not the cached one
+    add_game(guild_id, game, description="Fresh entry")
+    assert "**Description:** Fresh entry" in show(guild_id, game)
+
+
+def test_unrelated_write_keeps_entry(guild_id, game):
+    add_game(guild_id, "Hollow Knight")
+    cached(guild_id, game)
+    run(main.add_me.callback(interact(guild_id, 505, "elsewhere"), "Hollow Knight"))
+    hits = main.showgame_cache.hits
+    show(guild_id, game)
+    assert main.showgame_cache.hits == hits + 1
+
+
+def test_helpers_sharing_a_name_are_listed_separately(guild_id, game):
+    run(main.add_me.callback(interact(guild_id, 505, "helper_one"), game))
+    assert show(guild_id, game).count("helper_one") == 2
+
+
+def test_cache_hit_costs_one_query(guild_id, game):
+    show(guild_id, game)
+    statements = []
+    main.conn.set_trace_callback(statements.append)
+    try:
+        cached_reply = show(guild_id, game)
+    finally:
+        main.conn.set_trace_callback(None)
+    assert "helper_one" in cached_reply
+    assert len(statements) == 1, statements
@@ -0,0 +1,65 @@
+"""thanks_daily_games keys games by id: a rename or merge must not split a game's
+/thankstrend history, and a removed game keeps its thanks under its last name."""
+from datetime import datetime, timezone
+
+import main
+from conftest import add_game, interact, run
+
+TODAY = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+def thank(guild_id: int, game: str, times: int = 1):
+    main.conn.executemany(
+        """INSERT INTO thanks (guild_id, thanked_user_id, thanked_user_name, thanking_user_id, thanking_user_name, game, timestamp)
+           VALUES (?, '601', 'helper', '602', 'thanker', ?, ?)""",
+        [(guild_id, game, f"{TODAY} 12:00:00")] * times
+    )
+    main.conn.commit()
+    main._run_rollups()
+
+
+def trend_total(guild_id: int, game_id: int | None = None, game: str | None = None) -> int:
+    return sum(n for _, n in main._query_thanks_trend(guild_id, TODAY, game_id=game_id, game=game))
+
+
+def leaders(guild_id: int) -> dict[str, int]:
+    return dict(main._query_trend_leaders(guild_id, TODAY, limit=10)[1])
+
+
+def test_aliases_count_as_one_game(guild_id):
+    game_id = add_game(guild_id, "Call of Duty: Black Ops 4")
+    thank(guild_id, "bo4", 2)
+    thank(guild_id, "Call of Duty: Black Ops 4")
+    thank(guild_id, "Some Other Game")
+    assert trend_total(guild_id, game_id) == 3
+    assert trend_total(guild_id, game="Some Other Game") == 1
+    assert leaders(guild_id) == {"Call of Duty: Black Ops 4": 3, "Some Other Game": 1}
+
+
+def test_rename_keeps_one_history(guild_id):
+    game_id = add_game(guild_id, "Elden Ring")
+    thank(guild_id, "Elden Ring", 2)
+    run(main.rename_game.callback(interact(guild_id), "Elden Ring", "Elden Ring: Nightreign"))
+    thank(guild_id, "Elden Ring: Nightreign")
+    thank(guild_id, "Elden Ring")       # the old name is an alias now
+    assert trend_total(guild_id, game_id) == 4
+    assert leaders(guild_id) == {"Elden Ring: Nightreign": 4}
+
+
+def test_merge_folds_history_into_target(guild_id):
+    target = add_game(guild_id, "Hollow Knight")
+    add_game(guild_id, "Hollow Knigth")
+    thank(guild_id, "Hollow Knight", 2)
+    thank(guild_id, "Hollow Knigth", 3)
+    run(main.merge_game.callback(interact(guild_id), "Hollow Knigth", "Hollow Knight"))
+    assert trend_total(guild_id, target) == 5
+    assert leaders(guild_id) == {"Hollow Knight": 5}
+
+
+def test_removed_game_keeps_its_name(guild_id):
+    game_id = add_game(guild_id, "Hades")
+    thank(guild_id, "Hades", 2)
+    main.conn.execute("DELETE FROM games WHERE id = ?", (game_id,))
+    main.conn.commit()
+    assert leaders(guild_id) == {"Hades": 2}
+    assert trend_total(guild_id, game="Hades") == 2
@@ -0,0 +1,71 @@
+"""Write handlers are throttled per user and per guild by in-memory token buckets;
+a rejected request is answered without touching the database."""
+import time
+
+import main
+from conftest import add_game, interact, run
+
+
+def exhaust(buckets: main.TokenBuckets, key):
+    now = time.monotonic()
+    for _ in range(buckets.capacity):
+        buckets.take(key, now)
+
+
+def statements_during(coro) -> list[str]:
+    statements = []
+    main.conn.set_trace_callback(statements.append)
+    try:
+        run(coro)
+    finally:
+        main.conn.set_trace_callback(None)
+    return statements
+
+
+def test_user_over_budget_is_rejected_without_db_access(guild_id):
+    add_game(guild_id, "Elden Ring")
+    exhaust(main.user_write_buckets, 9101)
+    interaction = interact(guild_id, 9101, "spammer")
+
+    assert statements_during(main.process_platform(interaction, "Elden Ring", "PC")) == []
+    assert "too fast" in interaction._original.content
+    assert interaction._original.kwargs.get("ephemeral") is True
+
+
+def test_guild_over_budget_rejects_every_user(guild_id):
+    add_game(guild_id, "Elden Ring")
+    exhaust(main.guild_write_buckets, guild_id)
+    interaction = interact(guild_id, 9102, "bystander")
+
+    assert statements_during(main.process_platform(interaction, "Elden Ring", "PC")) == []
+    assert "too fast" in interaction._original.content
+
+
+def test_within_budget_reaches_the_handler(guild_id):
+    add_game(guild_id, "Elden Ring")
+    interaction = interact(guild_id, 9103, "regular")
+    run(main.process_platform(interaction, "Elden Ring", "PC"))
+    assert "too fast" not in interaction._original.content
+    assert main.conn.execute(
+        "SELECT 1 FROM helpers WHERE guild_id = ? AND user_id = '9103'", (guild_id,)
+    ).fetchone()
+
+
+def test_buckets_refill_over_time():
+    buckets = main.TokenBuckets(capacity=2, per=10)
+    buckets.take("a", 0.0)
+    buckets.take("a", 0.0)
+    assert buckets.wait("a", 0.0) == 5.0
+    assert buckets.wait("a", 5.0) == 0.0
+
+
+def test_least_recently_used_bucket_is_evicted():
+    buckets = main.TokenBuckets(capacity=1, per=60, size=2)
+    buckets.take("a", 0.0)
+    buckets.take("b", 0.0)
+    buckets.take("a", 1.0)      # "a" is now the most recently used
+    buckets.take("c", 2.0)
+    assert list(buckets.buckets) == ["a", "c"]
+    # An evicted key starts again from a full bucket
+    assert buckets.wait("b", 2.0) == 0.0
+    assert buckets.wait("a", 2.0) > 0